@@ -0,0 +1,227 @@
+import os
+import json
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import repo_cache
+import telemetry
+from jobs import EventLog, QueueFull, TERMINAL
+from clone_strategy import strategy_for
+
+# Batches document many repos with two stages on separate bounded pools:
+# CLONE_WORKERS threads fetch mirrors (network-bound) while REPO_WORKERS
+# threads check out, parse and summarize repos whose mirror is ready. Model
+# calls from every repo share the one llm_pool, so inference stays bounded by
+# DOCGEN_LLM_CONCURRENCY however many repos are in flight. Clones run at most
+# CLONE_WORKERS repos ahead of analysis, so prefetched mirrors are not evicted
+# from the repo cache before they are used.
+CLONE_WORKERS = int(os.getenv("DOCGEN_BATCH_CLONE_WORKERS", "4"))
+REPO_WORKERS = int(os.getenv("DOCGEN_BATCH_REPO_WORKERS", "2"))
+MAX_REPOS = int(os.getenv("DOCGEN_BATCH_MAX_REPOS", "500"))
+# Repos not yet finished, across all batches, beyond which submissions are rejected
+MAX_PENDING = int(os.getenv("DOCGEN_BATCH_MAX_PENDING", "1000"))
+BATCH_TTL = float(os.getenv("DOCGEN_BATCH_TTL", "3600"))
+
+BATCH_REPOS = telemetry.Counter("docgen_batch_repos_total", "Repos finished by batch runs", ["result"])
+
+
+def parse_manifest(text):
+    """Repo URLs listed in an org manifest.
+
+    Accepts a JSON list, or an object {"base_url": ..., "repos": [...]}, whose
+    entries are URLs, names relative to base_url, or {"url": ...} objects.
+    Anything that is not JSON is read as one URL per line; blank lines and
+    # comments are skipped.
+    """
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return [line.strip() for line in text.splitlines() if line.strip() and not line.strip().startswith("#")]
+    base = ""
+    if isinstance(data, dict):
+        base = (data.get("base_url") or "").rstrip("/")
+        data = data.get("repos", [])
+    if not isinstance(data, list):
+        raise ValueError("Manifest must be a list of repos or an object with a repos list")
+    urls = []
+    for entry in data:
+        url = entry.get("url") if isinstance(entry, dict) else entry
+        if not isinstance(url, str) or not url.strip():
+            raise ValueError(f"Invalid manifest entry: {entry!r}")
+        url = url.strip()
+        if base and "://" not in url and not url.startswith("git@"):
+            url = f"{base}/{url}"
+        urls.append(url)
+    return urls
+
+
+class RepoRun:
+    """State of one repo within a batch; result holds the generate_docs response."""
+
+    def __init__(self, index, repo_url):
+        self.index = index
+        self.repo_url = repo_url
+        self.status = "queued"
+        self.commit = None
+        self.progress = None
+        self.result = None
+        self.error = None
+        self.finished = None
+
+    def to_dict(self, include_result=False):
+        data = {
+            "index": self.index,
+            "repo_url": self.repo_url,
+            "status": self.status,
+            "commit": self.commit,
+            "progress": self.progress,
+            "finished": self.finished,
+        }
+        if self.error:
+            data["error"] = self.error
+        if include_result and self.result is not None:
+            data["result"] = self.result
+        return data
+
+
+class Batch(EventLog):
+    """Many repos documented together; emits one event per repo status change."""
+
+    def __init__(self, repo_urls, options):
+        super().__init__()
+        self.id = uuid.uuid4().hex
+        self.options = options
+        self.repos = [RepoRun(i, url) for i, url in enumerate(repo_urls)]
+
+    def update(self, run, status, **fields):
+        """Move one repo to status; the batch is done once every repo is."""
+        with self._cond:
+            run.status = status
+            for name, value in fields.items():
+                setattr(run, name, value)
+            if status in TERMINAL:
+                run.finished = time.time()
+            event = {"stage": "repo", "index": run.index, "repo_url": run.repo_url, "status": status}
+            if run.error:
+                event["error"] = run.error
+            self._append(event)
+            if status in TERMINAL and all(r.status in TERMINAL for r in self.repos):
+                self.status = "done"
+                self.finished = time.time()
+                self._append({"stage": "status", "status": "done", "counts": self.counts()})
+
+    def counts(self):
+        counts = {}
+        for run in self.repos:
+            counts[run.status] = counts.get(run.status, 0) + 1
+        return counts
+
+    def to_dict(self):
+        with self._cond:
+            return {
+                "batch_id": self.id,
+                "status": self.status,
+                "counts": self.counts(),
+                "created": self.created,
+                "finished": self.finished,
+                "repos": [run.to_dict() for run in self.repos],
+            }
+
+
+class BatchManager:
+    def __init__(self, clone_workers=CLONE_WORKERS, repo_workers=REPO_WORKERS,
+                 max_repos=MAX_REPOS, max_pending=MAX_PENDING, ttl=BATCH_TTL):
+        self.max_repos = max_repos
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._clones = ThreadPoolExecutor(max_workers=clone_workers, thread_name_prefix="docgen-batch-clone")
+        self._repos = ThreadPoolExecutor(max_workers=repo_workers, thread_name_prefix="docgen-batch-docs")
+        # Held from the start of a clone until the repo is documented
+        self._ahead = threading.BoundedSemaphore(clone_workers + repo_workers)
+        self._lock = threading.Lock()
+        self._batches = {}
+
+    def submit(self, repo_urls, clone_mode=None, incremental=False):
+        """Queue every repo (duplicates dropped, order kept) and return the batch."""
+        urls, seen = [], set()
+        for url in repo_urls:
+            key = repo_cache.normalize_url(url)
+            if key not in seen:
+                seen.add(key)
+                urls.append(url)
+        if not urls:
+            raise ValueError("No repositories given")
+        if len(urls) > self.max_repos:
+            raise ValueError(f"{len(urls)} repositories exceed the batch limit of {self.max_repos}")
+        with self._lock:
+            self._prune()
+            pending = sum(1 for b in self._batches.values() for r in b.repos if r.status not in TERMINAL)
+            if pending + len(urls) > self.max_pending:
+                raise QueueFull(f"{pending} batch repositories already pending")
+            batch = Batch(urls, {"clone_mode": clone_mode, "incremental": incremental})
+            self._batches[batch.id] = batch
+        batch.set_status("running", repos=len(urls))
+        for run in batch.repos:
+            self._clones.submit(self._clone, batch, run)
+        return batch
+
+    def get(self, batch_id):
+        with self._lock:
+            return self._batches.get(batch_id)
+
+    def _clone(self, batch, run):
+        from docgen_utils import CHECKOUT_EXTS, MAX_FILE_SIZE
+        self._ahead.acquire()
+        batch.update(run, "cloning")
+        try:
+            strategy = strategy_for("docs", CHECKOUT_EXTS, MAX_FILE_SIZE, mode=batch.options["clone_mode"])
+            _, commit = repo_cache.get_cache().ensure_mirror(run.repo_url, strategy)
+        except Exception as e:
+            self._ahead.release()
+            BATCH_REPOS.inc(result="failed")
+            batch.update(run, "failed", error=f"❌ Git clone failed: {e}")
+            return
+        batch.update(run, "cloned", commit=commit)
+        self._repos.submit(self._document, batch, run)
+
+    def _document(self, batch, run):
+        from docgen_utils import generate_docs
+
+        def progress(event):
+            if event["stage"] == "file":
+                run.progress = {"done": event["index"], "total": event["total"]}
+
+        batch.update(run, "running")
+        try:
+            # Checks out from the mirror fetched above; only a stale one is fetched again
+            result = generate_docs(run.repo_url, progress=progress, **batch.options)
+            if result.get("status") == "success":
+                BATCH_REPOS.inc(result="done")
+                batch.update(run, "done", result=result, commit=result.get("commit") or run.commit)
+            else:
+                BATCH_REPOS.inc(result="failed")
+                batch.update(run, "failed", error=result.get("message", "Documentation generation failed"))
+        except Exception as e:
+            BATCH_REPOS.inc(result="failed")
+            batch.update(run, "failed", error=str(e))
+        finally:
+            self._ahead.release()
+
+    def _prune(self):
+        now = time.time()
+        expired = [b.id for b in self._batches.values() if b.finished and now - b.finished > self.ttl]
+        for batch_id in expired:
+            del self._batches[batch_id]
+
+
+_manager = None
+_manager_guard = threading.Lock()
+
+
+def get_manager():
+    global _manager
+    with _manager_guard:
+        if _manager is None:
+            _manager = BatchManager()
+        return _manager
@@ -0,0 +1,88 @@
+import os
+import re
+
+# Token estimates use the usual ~4 characters per token rule of thumb; they only
+# need to be good enough to keep prompts inside the model's context window.
+CHARS_PER_TOKEN = 4
+# Code tokens allowed in one prompt, for a single file, a chunk or a batch.
+TOKEN_BUDGET = int(os.getenv("DOCGEN_LLM_TOKEN_BUDGET", "1500"))
+# Files at or below this size are packed together into batch prompts.
+SMALL_FILE_TOKENS = int(os.getenv("DOCGEN_SMALL_FILE_TOKENS", "300"))
+MAX_BATCH_FILES = int(os.getenv("DOCGEN_MAX_BATCH_FILES", "8"))
+
+FILE_HEADER = "### FILE: "
+_header_re = re.compile(r"^\s*#{2,4}\s*FILE:\s*`?(.+?)`?\s*$", re.MULTILINE)
+
+
+def estimate_tokens(text_or_size):
+    size = text_or_size if isinstance(text_or_size, int) else len(text_or_size)
+    return size // CHARS_PER_TOKEN + 1
+
+
+def plan_units(sized_paths, budget=TOKEN_BUDGET, small=SMALL_FILE_TOKENS, max_files=MAX_BATCH_FILES):
+    """Group (path, size in bytes) pairs into LLM work units.
+
+    Small files are packed greedily into batches that fit the token budget;
+    every other file is its own unit. Returns a list of path lists, in input
+    order of each unit's first file.
+    """
+    units = []
+    batch, batch_tokens = [], 0
+    for path, size in sized_paths:
+        tokens = estimate_tokens(size)
+        if tokens > small:
+            units.append([path])
+            continue
+        if batch and (batch_tokens + tokens > budget or len(batch) >= max_files):
+            units.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(path)
+        batch_tokens += tokens
+    if batch:
+        units.append(batch)
+    return units
+
+
+def chunk_code(code, budget=TOKEN_BUDGET):
+    """Split code on line boundaries into pieces of at most budget tokens."""
+    limit = budget * CHARS_PER_TOKEN
+    chunks, current, current_len = [], [], 0
+    for line in code.splitlines(keepends=True):
+        while len(line) > limit:
+            # A single overlong line (minified code, data blobs) is hard-split.
+            if current:
+                chunks.append("".join(current))
+                current, current_len = [], 0
+            chunks.append(line[:limit])
+            line = line[limit:]
+        if current_len + len(line) > limit and current:
+            chunks.append("".join(current))
+            current, current_len = [], 0
+        current.append(line)
+        current_len += len(line)
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def format_batch(named_code):
+    """Render (name, code) pairs as the sectioned body of a batch prompt."""
+    return "\n\n".join(f"{FILE_HEADER}{name}\n```\n{code}\n```" for name, code in named_code)
+
+
+def parse_batch(response, names):
+    """Split a batch response back into per-file summaries keyed by name.
+
+    Sections whose header names an unknown file are ignored; files the model
+    skipped are simply missing from the result.
+    """
+    wanted = set(names)
+    sections = {}
+    matches = list(_header_re.finditer(response or ""))
+    for i, match in enumerate(matches):
+        name = match.group(1).strip()
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(response)
+        body = response[match.end():end].strip()
+        if name in wanted and body:
+            sections[name] = body
+    return sections
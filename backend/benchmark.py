@@ -0,0 +1,379 @@
+"""Offline benchmark for the docs and diagram pipelines.
+
+Generates fixture git repos locally, swaps the model for the stub provider
+with a fixed latency and times every pipeline stage separately. Results are written as
+JSON; pass --baseline with an earlier result file to flag regressions.
+
+    python benchmark.py --fixtures small,medium --llm-latency 0.05
+    python benchmark.py --fixtures large --baseline last-release.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+from git import Repo
+import batching
+import diagram_engine
+import diagram_store
+import doc_state
+import docgen_utils
+import llm_cache
+import llm_pool
+import llm_provider
+import mermaid_gen
+import metadata_model
+import module_graph
+import parse_cache
+import repo_cache
+import symbol_index
+import telemetry
+import workspace
+from clone_strategy import strategy_for
+
+FIXTURE_VERSION = 2
+FIXTURES = {"small": 25, "medium": 500, "large": 10000}
+FIXTURE_DIR = os.path.join(tempfile.gettempdir(), "docgen_bench_fixtures")
+STAGES = ("clone", "walk", "blob_shas", "parse", "route", "llm", "diagram_docs",
+          "diagram_classes", "module_graph", "clean_mermaid_text", "serialize")
+# Imported only when a request needs them; loading any at startup is a regression
+HEAVY_MODULES = ("langchain", "langchain_core", "langchain_ollama", "matplotlib", "PIL", "requests", "git")
+STARTUP_MODULES = ("main", "symbol_index")
+
+
+# ---------- Fixture repos ----------
+
+def _python_module(rng, package, index, siblings):
+    """Source for one synthetic module: imports, classes, inheritance and calls."""
+    lines = ['"""Synthetic module for benchmarking."""', "import os", "import json"]
+    deps = rng.sample(siblings, min(len(siblings), rng.randint(0, 3)))
+    for dep in deps:
+        lines.append(f"from {package} import {dep}")
+    lines.append("")
+    for c in range(rng.randint(1, 3)):
+        name = f"Model{index}x{c}"
+        base = f"({deps[0]}.Model{deps[0][3:]}x0)" if deps and c == 0 else ""
+        lines.append(f"class {name}{base}:")
+        lines.append(f"    limit = {rng.randint(1, 100)}")
+        lines.append("")
+        lines.append("    def __init__(self, path, retries=3):")
+        lines.append("        self.path = path")
+        lines.append("        self.retries = retries")
+        for m in range(rng.randint(2, 6)):
+            lines.append("")
+            lines.append(f"    def step_{m}(self, value: int) -> int:")
+            if deps:
+                dep = rng.choice(deps)
+                lines.append(f"        value += {dep}.Model{dep[3:]}x0.step_0(self, value)")
+            lines.append("        return json.loads(json.dumps(value)) + len(os.sep)")
+        lines.append("")
+    lines.append("def main(argv=None):")
+    lines.append(f"    return Model{index}x0(os.getcwd()).step_0(1)")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def _write_fixture(path, files, seed):
+    rng = random.Random(seed)
+    py_files = int(files * 0.85)
+    per_package = 40
+    for i in range(py_files):
+        package = f"pkg{i // per_package}"
+        pkg_dir = os.path.join(path, package)
+        if i % per_package == 0:
+            os.makedirs(pkg_dir, exist_ok=True)
+            with open(os.path.join(pkg_dir, "__init__.py"), "w") as f:
+                f.write("")
+        start = i - i % per_package
+        siblings = [f"mod{j}" for j in range(start, i)]
+        with open(os.path.join(pkg_dir, f"mod{i}.py"), "w") as f:
+            f.write(_python_module(rng, package, i, siblings))
+    web_dir = os.path.join(path, "web")
+    os.makedirs(web_dir, exist_ok=True)
+    for i in range(files - py_files):
+        if i % 4 == 0:
+            with open(os.path.join(web_dir, f"config{i}.json"), "w") as f:
+                json.dump({f"key{k}": rng.randint(0, 1000) for k in range(rng.randint(3, 30))}, f, indent=2)
+        else:
+            body = "\n".join(f"export function handler{i}_{k}(req) {{ return req.body + {k}; }}"
+                             for k in range(rng.randint(3, 40)))
+            with open(os.path.join(web_dir, f"component{i}.js"), "w") as f:
+                f.write(f"import {{ api }} from './api';\n{body}\n")
+
+
+def ensure_fixture(name, root=FIXTURE_DIR):
+    """Path to the generated git repo for a fixture, creating it on first use."""
+    files = FIXTURES[name]
+    path = os.path.join(root, f"{name}-v{FIXTURE_VERSION}")
+    if os.path.isdir(os.path.join(path, ".git")):
+        return path
+    shutil.rmtree(path, ignore_errors=True)
+    print(f"🧪 Generating {name} fixture ({files} files)...")
+    os.makedirs(path)
+    _write_fixture(path, files, seed=FIXTURE_VERSION * 1000 + files)
+    repo = Repo.init(path)
+    repo.git.add("-A")
+    repo.git.execute(["git", "-c", "user.name=docgen-bench", "-c", "user.email=bench@localhost",
+                      "commit", "-q", "--no-gpg-sign", "-m", f"{name} fixture"])
+    return path
+
+
+# ---------- Runs ----------
+
+def _isolate(tmp):
+    """Point every cache at tmp so a run starts cold and leaves nothing behind."""
+    repo_cache._cache = repo_cache.RepoCache(root=os.path.join(tmp, "repos"))
+    llm_cache._cache = llm_cache.SummaryCache(path=os.path.join(tmp, "llm.sqlite3"))
+    parse_cache._cache = parse_cache.ParseCache(path=os.path.join(tmp, "parse.sqlite3"))
+    workspace._manager = workspace.WorkspaceManager(root=os.path.join(tmp, "workspaces"))
+    doc_state.STATE_DIR = os.path.join(tmp, "state")
+    diagram_store._store = diagram_store.DiagramStore(disk_dir=None)
+
+
+class _Timer:
+    def __init__(self):
+        self.stages = {}
+
+    def __call__(self, stage, fn, *args, **kwargs):
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.stages[stage] = self.stages.get(stage, 0.0) + time.perf_counter() - started
+        return result
+
+
+def run_stages(repo_url, stub):
+    """Run the pipeline one stage at a time, as generate_docs and mermaid_gen do."""
+    timer = _Timer()
+    counts = {}
+    with workspace.allocate("bench") as ws:
+        strategy = strategy_for("docs", docgen_utils.CHECKOUT_EXTS, docgen_utils.MAX_FILE_SIZE)
+        repo_dir = timer("clone", ws.checkout, repo_url, strategy)
+        blobs = timer("blob_shas", repo_cache.blob_shas, repo_dir)
+        files = timer("walk", docgen_utils.scan_files, repo_dir, list(blobs))
+        index = timer("parse", symbol_index.build_index, repo_dir, blob_shas=blobs)
+
+        routed = timer("route", lambda: [(path, size, docgen_utils.route_file(
+            path, os.path.relpath(path, repo_dir), index)) for path, size in files])
+        llm_files = [(path, size) for path, size, summary in routed if summary is None]
+
+        calls_before = stub.calls
+        units = batching.plan_units(llm_files)
+        pool = llm_pool.get_pool()
+        summaries = timer("llm", lambda: [r for unit in pool.map_unordered(docgen_utils.analyze_batch,
+                                                                  [(u, repo_dir) for u in units]) for r in unit])
+
+        metadata = timer("diagram_docs", docgen_utils.metadata_from_index, index)
+        docs_code = timer("diagram_docs", docgen_utils.generate_mermaid_class_diagram, metadata)
+        classes, method_calls = timer("diagram_classes", mermaid_gen.extract_classes_and_calls, index)
+        model = timer("diagram_classes", diagram_engine.build_model, index, method_calls, "bench")
+        page = timer("diagram_classes", diagram_engine.render, model)
+        graph = timer("module_graph", module_graph.build_graph, index)
+        timer("module_graph", module_graph.render_mermaid, graph)
+        cleaned = timer("clean_mermaid_text", docgen_utils.clean_mermaid_text, docs_code)
+        # What an API response and the on-disk state cost to encode
+        docs = {os.path.relpath(path, repo_dir): doc for path, doc in summaries if doc}
+        index_json = timer("serialize", metadata_model.dumps, metadata_model.index_rows(index))
+        docs_json = timer("serialize", metadata_model.dumps, {"status": "success", "docs": docs})
+        as_dicts = {p: entry.to_dict() for p, entry in index.items()}
+
+        counts.update({
+            "files_scanned": len(files),
+            "source_files": len(index),
+            "static_summaries": len(files) - len(llm_files),
+            "llm_units": len(units),
+            "llm_calls": stub.calls - calls_before,
+            "summaries": sum(1 for _, doc in summaries if doc) + len(files) - len(llm_files),
+            "classes": len(classes),
+            "method_calls": len(method_calls),
+            "docs_diagram_lines": cleaned.count("\n") + 1,
+            "class_diagram_lod": page["lod"],
+            "module_graph_edges": len(graph["reduced"]),
+            "index_bytes": metadata_model.deep_size(index),
+            "index_bytes_as_dicts": metadata_model.deep_size(as_dicts),
+            "index_json_bytes": len(index_json),
+            "index_json_bytes_as_dicts": len(json.dumps(as_dicts, separators=(",", ":"))),
+            "docs_json_bytes": len(docs_json),
+        })
+    return timer.stages, counts
+
+
+def run_end_to_end(repo_url):
+    timings = {}
+    started = time.perf_counter()
+    result = docgen_utils.generate_docs(repo_url)
+    timings["generate_docs"] = time.perf_counter() - started
+    if result.get("status") != "success":
+        raise RuntimeError(result.get("message"))
+    started = time.perf_counter()
+    mermaid_gen.generate_mermaid_from_repo(repo_url)
+    timings["generate_mermaid"] = time.perf_counter() - started
+    return timings
+
+
+def _summarize(samples):
+    return {"min": min(samples), "median": statistics.median(samples), "max": max(samples)}
+
+
+def benchmark_fixture(name, stub, repeat=1, end_to_end=True, fixture_dir=FIXTURE_DIR):
+    path = ensure_fixture(name, fixture_dir)
+    repo_url = f"file://{path}"
+    stage_samples, e2e_samples = {}, {}
+    counts = {}
+    for run in range(repeat):
+        print(f"⏱️ {name}: run {run + 1}/{repeat}")
+        tmp = tempfile.mkdtemp(prefix="docgen-bench-")
+        try:
+            _isolate(tmp)
+            stages, counts = run_stages(repo_url, stub)
+            for stage, seconds in stages.items():
+                stage_samples.setdefault(stage, []).append(seconds)
+            if end_to_end:
+                _isolate(os.path.join(tmp, "e2e"))
+                for key, seconds in run_end_to_end(repo_url).items():
+                    e2e_samples.setdefault(key, []).append(seconds)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+    return {
+        "fixture": name,
+        "files": FIXTURES[name],
+        "counts": counts,
+        "stages": {stage: _summarize(stage_samples[stage]) for stage in STAGES if stage in stage_samples},
+        "end_to_end": {key: _summarize(samples) for key, samples in e2e_samples.items()},
+    }
+
+
+def compare(results, baseline, tolerance, min_delta=0.01):
+    """Stages whose median got slower than baseline by more than tolerance (a fraction).
+
+    Slowdowns under min_delta seconds are treated as noise.
+    """
+    previous = {r["fixture"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results["results"]:
+        old = previous.get(result["fixture"])
+        if not old:
+            continue
+        for section in ("stages", "end_to_end"):
+            for key, timing in result[section].items():
+                before = old.get(section, {}).get(key)
+                if (before and timing["median"] > before["median"] * (1 + tolerance)
+                        and timing["median"] - before["median"] >= min_delta):
+                    regressions.append({
+                        "fixture": result["fixture"], "stage": key,
+                        "baseline": before["median"], "current": timing["median"],
+                    })
+    return regressions
+
+
+_STARTUP_PROBE = """
+import sys, json, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+heavy = sorted(m for m in {heavy!r} if m in sys.modules)
+print(json.dumps({{"seconds": elapsed, "heavy_modules": heavy}}))
+"""
+
+
+def measure_startup(modules=STARTUP_MODULES, runs=5):
+    """Import time of each module in a fresh interpreter, and heavy modules it pulled in."""
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    report = {}
+    for module in modules:
+        samples, heavy = [], set()
+        for _ in range(runs):
+            code = _STARTUP_PROBE.format(module=module, heavy=HEAVY_MODULES)
+            out = subprocess.run([sys.executable, "-c", code], cwd=backend_dir,
+                                 capture_output=True, text=True, check=True).stdout
+            data = json.loads(out.strip().splitlines()[-1])
+            samples.append(data["seconds"])
+            heavy.update(data["heavy_modules"])
+        report[module] = {"seconds": _summarize(samples), "heavy_modules": sorted(heavy)}
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark of the docgen pipeline")
+    parser.add_argument("--fixtures", default="small,medium", help=f"comma-separated, from {', '.join(FIXTURES)}")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="stub model seconds per call")
+    parser.add_argument("--llm-jitter", type=float, default=0.0, help="extra random seconds per call")
+    parser.add_argument("--no-end-to-end", action="store_true", help="skip full generate_docs/mermaid runs")
+    parser.add_argument("--fixture-dir", default=FIXTURE_DIR)
+    parser.add_argument("--out", default="benchmark-results.json", help="result file, or - for stdout")
+    parser.add_argument("--baseline", help="earlier result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before a stage counts as regressed")
+    parser.add_argument("--min-delta", type=float, default=0.01, help="ignore slowdowns below this many seconds")
+    parser.add_argument("--startup-budget", type=float, default=1.0, help="max median seconds to import the API")
+    parser.add_argument("--startup-runs", type=int, default=5)
+    parser.add_argument("--no-startup", action="store_true", help="skip the startup time check")
+    args = parser.parse_args(argv)
+
+    names = [n.strip() for n in args.fixtures.split(",") if n.strip()]
+    unknown = [n for n in names if n not in FIXTURES]
+    if unknown:
+        parser.error(f"unknown fixtures: {', '.join(unknown)}")
+
+    # Span log lines would drown the progress output; timings are collected here instead
+    telemetry.logger.setLevel("WARNING")
+    llm = llm_provider.make_llm("stub", latency=args.llm_latency, jitter=args.llm_jitter)
+    llm_provider.set_llm(llm)
+    stub = llm.provider
+
+    results = {
+        "benchmark_version": FIXTURE_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "config": {
+            "llm_latency": args.llm_latency,
+            "llm_jitter": args.llm_jitter,
+            "llm_concurrency": llm_pool.CONCURRENCY,
+            "repeat": args.repeat,
+        },
+        "results": [benchmark_fixture(n, stub, args.repeat, not args.no_end_to_end, args.fixture_dir)
+                    for n in names],
+    }
+    status = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            results["regressions"] = compare(results, json.load(f), args.tolerance, args.min_delta)
+        for r in results["regressions"]:
+            print(f"❌ {r['fixture']}/{r['stage']}: {r['baseline']:.3f}s -> {r['current']:.3f}s")
+        status = 1 if results["regressions"] else 0
+
+    if not args.no_startup:
+        print("⏱️ Measuring startup time")
+        startup = measure_startup(runs=args.startup_runs)
+        within = True
+        for module, report in startup.items():
+            median = report["seconds"]["median"]
+            if median > args.startup_budget:
+                print(f"❌ import {module}: {median:.3f}s exceeds the {args.startup_budget:.3f}s budget")
+                within = False
+            if report["heavy_modules"]:
+                print(f"❌ import {module} loads {', '.join(report['heavy_modules'])} at startup")
+                within = False
+        results["startup"] = dict(startup, budget=args.startup_budget, within_budget=within)
+        if not within:
+            status = 1
+
+    text = json.dumps(results, indent=2)
+    if args.out == "-":
+        print(text)
+    else:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"✅ Benchmark results written to {args.out}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+import os
+
+# Two-phase resolution of cross-class method calls over a symbol index:
+#   1. one pass over every file builds a global class table, so a call can
+#      target a class defined in any file regardless of parse order;
+#   2. one pass over every recorded call resolves its receiver through the
+#      calling file's import aliases and module-qualified names.
+# Both passes are linear in the number of classes and calls.
+
+# Files whose module is their directory, so relative imports in them
+# resolve against that directory itself
+PACKAGE_FILES = {"__init__.py", "index.js", "index.jsx", "index.mjs", "index.cjs", "index.ts", "index.tsx"}
+
+
+def _package(entry):
+    """Package a module's relative imports are resolved against."""
+    module = entry['module']
+    if os.path.basename(entry['path']) in PACKAGE_FILES:
+        return module
+    return module.rpartition(".")[0]
+
+
+def resolve_relative(entry, module, level):
+    """Absolute module name for a 'from <level dots><module> import ...'."""
+    if not level:
+        return module
+    parts = _package(entry).split(".") if _package(entry) else []
+    if level > 1:
+        parts = parts[:len(parts) - (level - 1)] if level - 1 <= len(parts) else []
+    if module:
+        parts.append(module)
+    return ".".join(parts)
+
+
+def build_class_table(index):
+    """Phase 1: qualified name -> class name, and class name -> qualified names."""
+    by_qualname = {}
+    by_name = {}
+    for entry in index.values():
+        for cls in entry['classes']:
+            qualname = f"{entry['module']}.{cls['name']}" if entry['module'] else cls['name']
+            by_qualname[qualname] = cls['name']
+            by_name.setdefault(cls['name'], []).append(qualname)
+    return by_qualname, by_name
+
+
+def import_aliases(entry):
+    """Local name -> fully qualified name bound by the file's imports."""
+    aliases = {}
+    for imp in entry['imports']:
+        if imp['name'] is None:
+            if imp['alias']:
+                # JS namespace imports (import * as ns from "./x") may be relative
+                aliases[imp['alias']] = resolve_relative(entry, imp['module'], imp['level'])
+            else:
+                top = imp['module'].split(".")[0]
+                aliases[top] = top
+        elif imp['name'] != "*":
+            base = resolve_relative(entry, imp['module'], imp['level'])
+            target = f"{base}.{imp['name']}" if base else imp['name']
+            aliases[imp['alias'] or imp['name']] = target
+    return aliases
+
+
+def _resolve(receiver, entry, aliases, by_qualname, by_name):
+    head, _, rest = receiver.partition(".")
+    if head in aliases:
+        qualname = aliases[head] + ("." + rest if rest else "")
+        if qualname in by_qualname:
+            return by_qualname[qualname]
+    local = f"{entry['module']}.{receiver}" if entry['module'] else receiver
+    if local in by_qualname:
+        return by_qualname[local]
+    if receiver in by_qualname:
+        return by_qualname[receiver]
+    # Bare names not bound by an import fall back to any project class of that name
+    if not rest and receiver in by_name and head not in aliases:
+        return receiver
+    return None
+
+
+def resolve_calls(index, table=None):
+    """Phase 2: set of (src_class, src_method, tgt_class, tgt_method) edges."""
+    by_qualname, by_name = table or build_class_table(index)
+    method_calls = set()
+    for entry in index.values():
+        if not entry['calls']:
+            continue
+        aliases = import_aliases(entry)
+        for src_class, src_method, receiver, tgt_method in entry['calls']:
+            tgt_class = _resolve(receiver, entry, aliases, by_qualname, by_name)
+            if tgt_class and tgt_class != src_class:
+                method_calls.add((src_class, src_method, tgt_class, tgt_method))
+    return method_calls
@@ -0,0 +1,67 @@
+import os
+
+# Named clone modes. Each endpoint picks a default and can be overridden with
+# DOCGEN_CLONE_MODE_<ENDPOINT>, e.g. DOCGEN_CLONE_MODE_DOCS=full.
+#   full     - complete history and every blob
+#   shallow  - latest commit only
+#   blobless - latest commit, blobs fetched lazily, sparse checkout of analyzed files
+#   sized    - as blobless, but blobs above the analyzer's size limit are never
+#              downloaded: they stay on the server and out of the checkout, so
+#              oversized source files are missing from the diagrams too
+MODES = ("full", "shallow", "blobless", "sized")
+
+# Every default gives the same files to the analyzers as a full clone
+DEFAULT_MODES = {
+    "docs": "blobless",
+    "mermaid": "blobless",
+}
+
+
+class CloneStrategy:
+    """How much of a repository to transfer and check out."""
+
+    def __init__(self, mode="full", depth=None, blob_filter=None, sparse_patterns=None, skip_oversized=False):
+        self.mode = mode
+        self.depth = depth
+        self.blob_filter = blob_filter
+        self.sparse_patterns = sparse_patterns or []
+        # Leave blobs the filter kept on the server out of the sparse checkout,
+        # instead of fetching them lazily when the worktree is populated
+        self.skip_oversized = skip_oversized
+
+    def clone_kwargs(self):
+        """Options for Repo.clone_from."""
+        kwargs = {}
+        if self.depth:
+            kwargs["depth"] = self.depth
+        if self.blob_filter:
+            kwargs["filter"] = self.blob_filter
+        return kwargs
+
+    def __repr__(self):
+        return f"CloneStrategy({self.mode!r}, depth={self.depth}, filter={self.blob_filter!r}, sparse={len(self.sparse_patterns)})"
+
+
+def sparse_patterns_for(extensions):
+    """Non-cone sparse-checkout patterns matching the given file extensions anywhere."""
+    return [f"*{ext}" for ext in extensions]
+
+
+def make_strategy(mode, extensions=(), max_blob_size=None):
+    if mode not in MODES:
+        raise ValueError(f"Unknown clone mode: {mode} (expected one of {', '.join(MODES)})")
+    if mode == "full":
+        return CloneStrategy(mode)
+    if mode == "shallow":
+        return CloneStrategy(mode, depth=1)
+    if mode == "blobless" or not max_blob_size:
+        return CloneStrategy(mode, depth=1, blob_filter="blob:none",
+                             sparse_patterns=sparse_patterns_for(extensions))
+    return CloneStrategy(mode, depth=1, blob_filter=f"blob:limit={max_blob_size}",
+                         sparse_patterns=sparse_patterns_for(extensions), skip_oversized=True)
+
+
+def strategy_for(endpoint, extensions=(), max_blob_size=None, mode=None):
+    """Strategy for an endpoint: explicit mode, then env override, then the endpoint default."""
+    mode = mode or os.getenv(f"DOCGEN_CLONE_MODE_{endpoint.upper()}") or DEFAULT_MODES.get(endpoint, "full")
+    return make_strategy(mode, extensions, max_blob_size)
@@ -0,0 +1,163 @@
+import re
+from collections import Counter
+
+# Renders class graphs at a chosen level of detail, grouped by package into
+# Mermaid namespaces, one page of packages at a time:
+#   packages - one node per package, edges aggregated between packages
+#   classes  - class names only, grouped by package, one edge per class pair
+#   full     - classes with attributes and methods, labeled call edges
+#   auto     - picks the most detailed level that stays renderable
+LODS = ("auto", "packages", "classes", "full")
+AUTO_FULL_MAX_CLASSES = 60
+AUTO_CLASSES_MAX_CLASSES = 400
+DEFAULT_PAGE_SIZE = 20
+ROOT_PACKAGE = "(root)"
+
+
+def _ident(name):
+    return re.sub(r"\W", "_", name) or "_"
+
+
+def package_of(module):
+    package = module.rpartition(".")[0]
+    return package or ROOT_PACKAGE
+
+
+def build_model(index, method_calls, project_name):
+    """Compact, JSON-serializable class graph derived from a symbol index.
+
+    Classes are identified by name, like the other diagram generators.
+    """
+    classes = {}
+    for entry in index.values():
+        for cls in entry['classes']:
+            classes[cls['name']] = {
+                "name": cls['name'],
+                "package": package_of(entry['module']),
+                "bases": cls['bases'],
+                "attrs": sorted(set(cls['attrs'])),
+                "methods": sorted({m['name'] for m in cls['methods']}),
+            }
+    return {
+        "project": project_name,
+        "classes": [classes[name] for name in sorted(classes)],
+        "calls": sorted(list(call) for call in method_calls),
+    }
+
+
+def package_summary(model):
+    counts = Counter(cls["package"] for cls in model["classes"])
+    return [{"name": name, "classes": counts[name]} for name in sorted(counts)]
+
+
+def _pick_lod(lod, class_count):
+    if lod not in LODS:
+        raise ValueError(f"Unknown level of detail: {lod} (expected one of {', '.join(LODS)})")
+    if lod != "auto":
+        return lod
+    if class_count <= AUTO_FULL_MAX_CLASSES:
+        return "full"
+    if class_count <= AUTO_CLASSES_MAX_CLASSES:
+        return "classes"
+    return "packages"
+
+
+def _in_scope(package, scope):
+    return scope is None or package == scope or package.startswith(scope + ".")
+
+
+def render(model, lod="auto", package=None, page=1, page_size=DEFAULT_PAGE_SIZE):
+    """Render one page of the model.
+
+    package restricts the view to a package and its subpackages (drill-down);
+    pages step through the remaining packages page_size at a time. Returns
+    the Mermaid code plus the paging and package info needed to navigate:
+    packages lists the packages on this page, all_packages every package in
+    the model, so any of them can be drilled into from any page.
+    """
+    scoped = [cls for cls in model["classes"] if _in_scope(cls["package"], package)]
+    packages = sorted({cls["package"] for cls in scoped})
+    lod = _pick_lod(lod, len(scoped))
+    pages = max(1, -(-len(packages) // page_size))
+    page = min(max(1, page), pages)
+    page_packages = set(packages[(page - 1) * page_size:page * page_size])
+    visible = {cls["name"]: cls for cls in scoped if cls["package"] in page_packages}
+    summary = package_summary(model)
+
+    if lod == "packages":
+        code, hidden = _render_packages(model, scoped, page_packages)
+    else:
+        code, hidden = _render_classes(model, visible, full=(lod == "full"))
+    return {
+        "mermaid_code": code,
+        "lod": lod,
+        "package": package,
+        "page": page,
+        "pages": pages,
+        "packages": [p for p in summary if p["name"] in page_packages],
+        "all_packages": summary,
+        "classes": len(visible),
+        "total_classes": len(model["classes"]),
+        "hidden_edges": hidden,
+    }
+
+
+def _render_packages(model, scoped, page_packages):
+    package_by_class = {cls["name"]: cls["package"] for cls in model["classes"]}
+    counts = Counter(cls["package"] for cls in scoped if cls["package"] in page_packages)
+    edges = Counter()
+    for cls in scoped:
+        for base in cls["bases"]:
+            if base in package_by_class:
+                edges[(cls["package"], package_by_class[base])] += 1
+    for src, _, tgt, _ in model["calls"]:
+        if src in package_by_class and tgt in package_by_class:
+            edges[(package_by_class[src], package_by_class[tgt])] += 1
+    lines = ["graph LR"]
+    for name in sorted(counts):
+        lines.append(f'    {_ident(name)}["{name} ({counts[name]} classes)"]')
+    hidden = 0
+    for (src, tgt), count in sorted(edges.items()):
+        if src == tgt:
+            continue
+        if src in counts and tgt in counts:
+            lines.append(f"    {_ident(src)} -->|{count}| {_ident(tgt)}")
+        else:
+            hidden += 1
+    return "\n".join(lines), hidden
+
+
+def _render_classes(model, visible, full):
+    lines = ["classDiagram", "direction TD"]
+    by_package = {}
+    for cls in visible.values():
+        by_package.setdefault(cls["package"], []).append(cls)
+    for package in sorted(by_package):
+        lines.append(f"namespace {_ident(package)} {{")
+        for cls in by_package[package]:
+            if full and (cls["attrs"] or cls["methods"]):
+                lines.append(f"  class {cls['name']} {{")
+                for attr in cls["attrs"]:
+                    lines.append(f"    +{attr}")
+                for method in cls["methods"]:
+                    lines.append(f"    +{method}()")
+                lines.append("  }")
+            else:
+                lines.append(f"  class {cls['name']}")
+        lines.append("}")
+    hidden = 0
+    for cls in visible.values():
+        for base in cls["bases"]:
+            if base in visible:
+                lines.append(f"{base} <|-- {cls['name']}")
+    seen = set()
+    for src, src_method, tgt, tgt_method in model["calls"]:
+        if src not in visible or tgt not in visible:
+            hidden += 1
+            continue
+        if full:
+            lines.append(f"{src} ..> {tgt} : {src_method}() calls {tgt_method}()")
+        elif (src, tgt) not in seen:
+            seen.add((src, tgt))
+            lines.append(f"{src} ..> {tgt}")
+    return "\n".join(lines), hidden
@@ -0,0 +1,114 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import repo_cache
+
+# Generated diagrams keyed by repo + commit + kind + content. Entries live in
+# an in-memory LRU; setting DOCGEN_DIAGRAM_DIR adds a disk tier that survives
+# restarts and is written off the request path.
+MAX_ENTRIES = int(os.getenv("DOCGEN_DIAGRAM_CACHE_ENTRIES", "256"))
+MAX_BYTES = int(os.getenv("DOCGEN_DIAGRAM_CACHE_BYTES", str(64 * 1024 ** 2)))
+DISK_DIR = os.getenv("DOCGEN_DIAGRAM_DIR")
+
+
+def diagram_id(repo_url, commit, kind, code):
+    """Id that only ever names one diagram, so clients may cache it for good.
+
+    The content is part of the key: clone modes, extractor versions or an
+    unknown commit can give one repo+commit+kind different diagrams.
+    """
+    content = hashlib.sha1(code.encode("utf-8")).hexdigest()
+    key = f"{repo_cache.normalize_url(repo_url)}\0{commit or ''}\0{kind}\0{content}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+
+
+def etag_for(code):
+    return '"' + hashlib.sha1(code.encode("utf-8")).hexdigest() + '"'
+
+
+class DiagramStore:
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES, disk_dir=DISK_DIR):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.latest_id = None
+        self._writer = None
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="docgen-diagram-writer")
+
+    def put(self, repo_url, commit, kind, code, latest=True):
+        """Store a diagram; returns its id.
+
+        latest=False stores data that is not Mermaid text (e.g. a class model),
+        which /get-mermaid-diagram without an id must never serve.
+        """
+        did = diagram_id(repo_url, commit, kind, code)
+        entry = (code, etag_for(code))
+        with self._lock:
+            old = self._entries.pop(did, None)
+            if old:
+                self._bytes -= len(old[0])
+            self._entries[did] = entry
+            self._bytes += len(code)
+            if latest:
+                self.latest_id = did
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+        if self._writer:
+            self._writer.submit(self._write, did, code)
+        return did
+
+    def get(self, did):
+        """(code, etag) for an id, or None."""
+        with self._lock:
+            entry = self._entries.get(did)
+            if entry:
+                self._entries.move_to_end(did)
+                return entry
+        code = self._read(did)
+        if code is None:
+            return None
+        entry = (code, etag_for(code))
+        with self._lock:
+            if did not in self._entries:
+                self._entries[did] = entry
+                self._bytes += len(code)
+        return entry
+
+    def _path(self, did):
+        return os.path.join(self.disk_dir, f"{did}.mmd")
+
+    def _write(self, did, code):
+        path = self._path(did)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(code)
+        os.replace(tmp_path, path)
+
+    def _read(self, did):
+        if not self.disk_dir or not all(c in "0123456789abcdef" for c in did):
+            return None
+        try:
+            with open(self._path(did), encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+
+_store = None
+_store_guard = threading.Lock()
+
+
+def get_store():
+    global _store
+    with _store_guard:
+        if _store is None:
+            _store = DiagramStore()
+        return _store
@@ -0,0 +1,44 @@
+import os
+import json
+import hashlib
+import tempfile
+from repo_cache import normalize_url
+
+# Last documented state per repo, used by incremental runs:
+#   commit   - HEAD sha that was documented
+#   files    - relative path -> blob sha of every successfully documented file
+#   docs     - relative path -> summary
+#   index    - relative path -> symbol_index entry for Python and JS/TS files,
+#              stored as a metadata_model row
+#   index_blobs - relative path -> blob sha each index entry was parsed from
+STATE_DIR = os.getenv("DOCGEN_STATE_DIR", os.path.join(tempfile.gettempdir(), "docgen_state"))
+
+
+def _state_path(repo_url):
+    key = hashlib.sha1(normalize_url(repo_url).encode("utf-8")).hexdigest()
+    return os.path.join(STATE_DIR, f"{key}.json")
+
+
+def load(repo_url):
+    try:
+        with open(_state_path(repo_url), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save(repo_url, state):
+    os.makedirs(STATE_DIR, exist_ok=True)
+    path = _state_path(repo_url)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def changed_files(state, blobs, paths):
+    """Subset of paths (relative) whose blob differs from the recorded state."""
+    if not state:
+        return set(paths)
+    previous = state.get("files", {})
+    return {p for p in paths if p not in previous or previous[p] != blobs.get(p)}
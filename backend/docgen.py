@@ -1,24 +1,14 @@
 import os
-import shutil
-import stat
-import time
-import ast
 import re
-from urllib.parse import urlparse
-from git import Repo
+import workspace
+import repo_cache
+import diagram_store
+from docgen_utils import extract_metadata
 from dotenv import load_dotenv
 
 load_dotenv()
 print("🧠 Environment loaded")
 
-def handle_remove_readonly(func, path, exc):
-    try:
-        os.chmod(path, stat.S_IWRITE)
-        func(path)
-    except PermissionError:
-        if path.endswith("index.lock"):
-            os.remove(path)
-
 def clean_mermaid_text(text):
     if not text:
         return "classDiagram\n    class Empty"
@@ -27,100 +17,6 @@ def clean_mermaid_text(text):
     text = text.replace('\r\n', '\n').replace('\r', '\n')
     return text.strip()
 
-def get_type_hint(arg):
-    """Returns the type hint as a string if present, else empty string."""
-    if hasattr(arg, 'annotation') and arg.annotation:
-        return ast.unparse(arg.annotation)
-    return ""
-
-def extract_metadata(repo_dir):
-    metadata = {}
-    for root, _, files in os.walk(repo_dir):
-        if any(skip in root for skip in ['.git', '__pycache__', 'node_modules', '.venv', 'venv']):
-            continue
-        for file in files:
-            if file.endswith('.py'):
-                path = os.path.join(root, file)
-                rel_path = os.path.relpath(path, repo_dir)
-                try:
-                    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                        source = f.read()
-                    if not source.strip():
-                        continue
-                    tree = ast.parse(source)
-                    file_info = {
-                        'classes': [],
-                        'functions': [],
-                        'imports': [],
-                        'inherits': []
-                    }
-                    # Extract imports
-                    for n in ast.walk(tree):
-                        if isinstance(n, ast.Import):
-                            for alias in n.names:
-                                file_info['imports'].append(alias.name.split('.')[0])
-                        elif isinstance(n, ast.ImportFrom) and n.module:
-                            file_info['imports'].append(n.module.split('.')[0])
-                    # Extract classes and their members
-                    for n in ast.iter_child_nodes(tree):
-                        if isinstance(n, ast.ClassDef):
-                            class_info = {
-                                'name': n.name,
-                                'methods': [],
-                                'properties': [],
-                                'inherits': [b.id for b in n.bases if isinstance(b, ast.Name)]
-                            }
-                            # Inheritance
-                            if class_info['inherits']:
-                                file_info['inherits'].append((n.name, class_info['inherits']))
-                            for body_item in n.body:
-                                if isinstance(body_item, ast.FunctionDef):
-                                    args = []
-                                    for a in body_item.args.args[1:]:  # skip 'self'
-                                        t = get_type_hint(a)
-                                        if t:
-                                            args.append(f"{a.arg}: {t}")
-                                        else:
-                                            args.append(a.arg)
-                                    # Return type
-                                    ret_type = ""
-                                    if body_item.returns:
-                                        ret_type = ast.unparse(body_item.returns)
-                                    class_info['methods'].append({
-                                        'name': body_item.name,
-                                        'args': args,
-                                        'ret': ret_type,
-                                        'private': body_item.name.startswith('_')
-                                    })
-                                elif isinstance(body_item, ast.Assign):
-                                    for target in body_item.targets:
-                                        if isinstance(target, ast.Name):
-                                            class_info['properties'].append({
-                                                'name': target.id,
-                                                'private': target.id.startswith('_')
-                                            })
-                            file_info['classes'].append(class_info)
-                        elif isinstance(n, ast.FunctionDef):
-                            args = []
-                            for a in n.args.args:
-                                t = get_type_hint(a)
-                                if t:
-                                    args.append(f"{a.arg}: {t}")
-                                else:
-                                    args.append(a.arg)
-                            ret_type = ""
-                            if n.returns:
-                                ret_type = ast.unparse(n.returns)
-                            file_info['functions'].append({
-                                'name': n.name,
-                                'args': args,
-                                'ret': ret_type
-                            })
-                    metadata[rel_path] = file_info
-                except Exception as e:
-                    print(f"⚠️ Could not parse {rel_path}: {str(e)}")
-    return metadata
-
 def generate_mermaid_class_diagram(metadata):
     lines = ["classDiagram"]
     # Classes and their methods/properties
@@ -159,54 +55,32 @@ def generate_mermaid_class_diagram(metadata):
     return "\n".join(lines)
 
 def generate_docs(repo_url):
-    repo_name = "D:/temp_repo"
-
-    # Clean up existing repo
-    if os.path.exists(repo_name):
-        time.sleep(1)
-        shutil.rmtree(repo_name, onerror=handle_remove_readonly)
-
-    # Handle GitHub token if available
-    github_token = os.getenv("GITHUB_TOKEN")
-    if github_token:
-        parsed = urlparse(repo_url)
-        clone_url = f"https://{github_token}@{parsed.netloc}{parsed.path}"
-    else:
-        clone_url = repo_url
-
-    # Clone repository
-    try:
-        print(f"🔄 Cloning repository: {repo_url}")
-        Repo.clone_from(clone_url, repo_name)
-        print("✅ Repository cloned successfully")
-    except Exception as e:
-        print(f"❌ Git clone failed: {str(e)}")
-        return
-
-    print("📊 Generating project structure class diagram...")
-    try:
-        metadata = extract_metadata(repo_name)
-        if metadata:
-            mermaid_code = generate_mermaid_class_diagram(metadata)
-            cleaned_mermaid = clean_mermaid_text(mermaid_code)
-            with open("diagram.mmd", "w", encoding="utf-8") as f:
-                f.write(cleaned_mermaid)
-            print("📝 Mermaid class diagram saved to diagram.mmd")
-        else:
-            with open("diagram.mmd", "w", encoding="utf-8") as f:
-                f.write("classDiagram\n    class Empty")
-            print("📝 No Python files found, empty diagram saved.")
+    # A private workspace per run; it and its checkout are removed on exit
+    with workspace.allocate("docgen") as ws:
+        try:
+            print(f"🔄 Preparing repository: {repo_url}")
+            repo_name = ws.checkout(repo_url)
+            print("✅ Repository checked out successfully")
+        except Exception as e:
+            print(f"❌ Git clone failed: {str(e)}")
+            return
 
-    except Exception as e:
-        print(f"❌ Mermaid generation failed: {e}")
+        print("📊 Generating project structure class diagram...")
+        try:
+            metadata = extract_metadata(repo_name)
+            if metadata:
+                cleaned_mermaid = clean_mermaid_text(generate_mermaid_class_diagram(metadata))
+            else:
+                cleaned_mermaid = "classDiagram\n    class Empty"
+                print("📝 No source files found, empty diagram stored.")
+            # Kept in diagram_store like every other diagram, not in a file shared by all runs
+            diagram_id = diagram_store.get_store().put(repo_url, repo_cache.head_sha(repo_name), "docs", cleaned_mermaid)
+            print(f"📝 Mermaid class diagram stored as {diagram_id}")
 
-    # Cleanup
-    try:
-        shutil.rmtree(repo_name, onerror=handle_remove_readonly)
-        print("🧹 Temporary files cleaned up")
-    except Exception as e:
-        print(f"⚠️ Cleanup warning: {e}")
+        except Exception as e:
+            print(f"❌ Mermaid generation failed: {e}")
 
+    print("🧹 Temporary files cleaned up")
     print(f"✅ Documentation generation completed!")
 
 if __name__ == "__main__":
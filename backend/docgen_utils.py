@@ -1,30 +1,45 @@
 import os
-import shutil
-import stat
-import time
-import ast
 import re
-from urllib.parse import urlparse
-from git import Repo
+import time
+import logging
+import repo_cache
+import llm_cache
+import doc_state
+import llm_pool
+import batching
+import symbol_index
+import metadata_model
+import static_summary
+import file_scan
+import module_graph
+import workspace
+import diagram_store
+import telemetry
+from clone_strategy import strategy_for
 from dotenv import load_dotenv
-from multiprocessing import Pool, cpu_count
 
-# LangChain + Ollama
-from langchain_ollama import OllamaLLM
-from langchain.prompts import PromptTemplate
 
 # Load environment variables
 load_dotenv()
 
-def handle_remove_readonly(func, path, exc):
-    try:
-        os.chmod(path, stat.S_IWRITE)
-        func(path)
-    except PermissionError:
-        if path.endswith("index.lock"):
-            os.remove(path)
+# Reads DOCGEN_LLM_* settings, so it comes after .env is loaded. The model
+# client itself is created on the first call and shared by every thread in
+# llm_pool, so HTTP connections to the model server are reused.
+import llm_provider
+
+class PromptTemplate:
+    """The part of LangChain's PromptTemplate used here (.template and .format).
+
+    Importing langchain.prompts costs most of a second at startup for what
+    is plain str.format; the rendered prompts are identical.
+    """
+
+    def __init__(self, input_variables, template):
+        self.input_variables = input_variables
+        self.template = template
 
-llm = OllamaLLM(model="gemma:2b")
+    def format(self, **kwargs):
+        return self.template.format(**kwargs)
 
 # Optimized prompt template
 prompt_template = PromptTemplate(
@@ -42,6 +57,43 @@ Provide:
 4. Overall functionality"""
 )
 
+# Several small files in one call; the model must answer per FILE section
+batch_prompt_template = PromptTemplate(
+    input_variables=["files"],
+    template="""Summarize each of the following files separately.
+
+{files}
+
+For every file, start a section with its exact header line ("### FILE: <path>")
+and briefly describe its purpose, key functions/classes and dependencies."""
+)
+
+# Map step for files too large for one prompt
+chunk_prompt_template = PromptTemplate(
+    input_variables=["code", "part", "parts"],
+    template="""This is part {part} of {parts} of a source file:
+
+```
+{code}
+```
+
+Summarize the functions, classes and logic in this part."""
+)
+
+# Reduce step combining the chunk summaries
+reduce_prompt_template = PromptTemplate(
+    input_variables=["summaries"],
+    template="""The following are summaries of consecutive parts of one source file:
+
+{summaries}
+
+Combine them into one summary providing:
+1. Purpose
+2. Key functions/classes
+3. Dependencies
+4. Overall functionality"""
+)
+
 def clean_mermaid_text(text):
     if not text:
         return "classDiagram\n    class Empty"
@@ -50,100 +102,24 @@ def clean_mermaid_text(text):
     text = text.replace('\r\n', '\n').replace('\r', '\n')
     return text.strip()
 
-def get_type_hint(arg):
-    """Returns the type hint as a string if present, else empty string."""
-    if hasattr(arg, 'annotation') and arg.annotation:
-        return ast.unparse(arg.annotation)
-    return ""
+def metadata_from_index(index):
+    """Docs-diagram metadata (classes, functions, imports, inherits) per file.
 
-def extract_metadata(repo_dir):
+    imports lists only modules of the repo itself, resolved to their files,
+    so the diagram shows no stdlib or third-party import edges.
+    """
+    deps = module_graph.file_dependencies(index)
     metadata = {}
-    for root, _, files in os.walk(repo_dir):
-        if any(skip in root for skip in ['.git', '__pycache__', 'node_modules', '.venv', 'venv']):
-            continue
-        for file in files:
-            if file.endswith('.py'):
-                path = os.path.join(root, file)
-                rel_path = os.path.relpath(path, repo_dir)
-                try:
-                    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                        source = f.read()
-                    if not source.strip():
-                        continue
-                    tree = ast.parse(source)
-                    file_info = {
-                        'classes': [],
-                        'functions': [],
-                        'imports': [],
-                        'inherits': []
-                    }
-                    # Extract imports
-                    for n in ast.walk(tree):
-                        if isinstance(n, ast.Import):
-                            for alias in n.names:
-                                file_info['imports'].append(alias.name.split('.')[0])
-                        elif isinstance(n, ast.ImportFrom) and n.module:
-                            file_info['imports'].append(n.module.split('.')[0])
-                    # Extract classes and their members
-                    for n in ast.iter_child_nodes(tree):
-                        if isinstance(n, ast.ClassDef):
-                            class_info = {
-                                'name': n.name,
-                                'methods': [],
-                                'properties': [],
-                                'inherits': [b.id for b in n.bases if isinstance(b, ast.Name)]
-                            }
-                            # Inheritance
-                            if class_info['inherits']:
-                                file_info['inherits'].append((n.name, class_info['inherits']))
-                            for body_item in n.body:
-                                if isinstance(body_item, ast.FunctionDef):
-                                    args = []
-                                    for a in body_item.args.args[1:]:  # skip 'self'
-                                        t = get_type_hint(a)
-                                        if t:
-                                            args.append(f"{a.arg}: {t}")
-                                        else:
-                                            args.append(a.arg)
-                                    # Return type
-                                    ret_type = ""
-                                    if body_item.returns:
-                                        ret_type = ast.unparse(body_item.returns)
-                                    class_info['methods'].append({
-                                        'name': body_item.name,
-                                        'args': args,
-                                        'ret': ret_type,
-                                        'private': body_item.name.startswith('_')
-                                    })
-                                elif isinstance(body_item, ast.Assign):
-                                    for target in body_item.targets:
-                                        if isinstance(target, ast.Name):
-                                            class_info['properties'].append({
-                                                'name': target.id,
-                                                'private': target.id.startswith('_')
-                                            })
-                            file_info['classes'].append(class_info)
-                        elif isinstance(n, ast.FunctionDef):
-                            args = []
-                            for a in n.args.args:
-                                t = get_type_hint(a)
-                                if t:
-                                    args.append(f"{a.arg}: {t}")
-                                else:
-                                    args.append(a.arg)
-                            ret_type = ""
-                            if n.returns:
-                                ret_type = ast.unparse(n.returns)
-                            file_info['functions'].append({
-                                'name': n.name,
-                                'args': args,
-                                'ret': ret_type
-                            })
-                    metadata[rel_path] = file_info
-                except Exception as e:
-                    print(f"⚠️ Could not parse {rel_path}: {str(e)}")
+    for rel_path, entry in index.items():
+        info = symbol_index.to_metadata(entry)
+        info['imports'] = sorted({index[p]['module'].rpartition('.')[2] for p in deps[rel_path][0]})
+        metadata[rel_path] = info
     return metadata
 
+def extract_metadata(repo_dir, reuse=None):
+    """Parse every source file under repo_dir; index entries present in reuse are taken as-is."""
+    return metadata_from_index(symbol_index.build_index(repo_dir, reuse))
+
 def generate_mermaid_class_diagram(metadata):
     lines = ["classDiagram"]
     # Classes and their methods/properties
@@ -181,6 +157,34 @@ def generate_mermaid_class_diagram(metadata):
             lines.append(f'{file_base} ..> {imp} : imports')
     return "\n".join(lines)
 # 🚀 Main documentation generation
+def _invoke(prompt, kind):
+    """One model call, timed and counted under kind (file, batch, chunk, reduce)."""
+    with telemetry.span("llm_call", level=logging.DEBUG, kind=kind):
+        started = time.perf_counter()
+        try:
+            response = llm_provider.get_llm().invoke(prompt)
+        except Exception:
+            telemetry.LLM_ERRORS.inc(kind=kind)
+            raise
+        finally:
+            telemetry.LLM_SECONDS.observe(time.perf_counter() - started, kind=kind)
+    telemetry.LLM_PROMPT_TOKENS.observe(batching.estimate_tokens(prompt), kind=kind)
+    telemetry.LLM_RESPONSE_TOKENS.observe(batching.estimate_tokens(response or ""), kind=kind)
+    return response
+
+def _summarize_chunked(code):
+    """Map-reduce summary for files larger than one prompt's token budget."""
+    chunks = batching.chunk_code(code)
+    partials = []
+    for part, chunk in enumerate(chunks, start=1):
+        prompt = chunk_prompt_template.format(code=chunk, part=part, parts=len(chunks))
+        partial = _invoke(prompt, "chunk")
+        if partial and partial.strip():
+            partials.append(f"Part {part}:\n{partial.strip()}")
+    if not partials:
+        return ""
+    return _invoke(reduce_prompt_template.format(summaries="\n\n".join(partials)), "reduce")
+
 def analyze_file(file_path, repo_name):
     try:
         with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
@@ -192,12 +196,23 @@ def analyze_file(file_path, repo_name):
         if len(code.strip()) < 20:
             return file_path, "📄 File too short to analyze meaningfully"
 
-        analysis_code = code[:1500] if len(code) > 1500 else code
+        chunked = batching.estimate_tokens(code) > batching.TOKEN_BUDGET
+        template = chunk_prompt_template.template + reduce_prompt_template.template if chunked else prompt_template.template
+
+        # Identical code under the same prompt and model never hits the LLM twice
+        summaries = llm_cache.get_cache()
+        key = llm_cache.cache_key(code, template, llm_provider.get_llm().model_id)
+        cached = summaries.get(key)
+        if cached is not None:
+            return file_path, cached
 
-        prompt = prompt_template.format(code=analysis_code)
-        explanation = llm.invoke(prompt)
+        if chunked:
+            explanation = _summarize_chunked(code)
+        else:
+            explanation = _invoke(prompt_template.format(code=code), "file")
 
         if explanation and len(explanation.strip()) > 10:
+            summaries.put(key, explanation.strip())
             return file_path, explanation.strip()
         else:
             return file_path, "🤖 AI analysis returned empty result"
@@ -205,86 +220,264 @@ def analyze_file(file_path, repo_name):
     except Exception as e:
         return file_path, f"❌ Error: {str(e)}"
 
-def generate_docs(repo_url):
-    repo_name = "D:/temp_repo"
-
-    # Clean up existing repo
-    if os.path.exists(repo_name):
-        time.sleep(1)
-        shutil.rmtree(repo_name, onerror=handle_remove_readonly)
-
-    # Handle GitHub token if available
-    github_token = os.getenv("GITHUB_TOKEN")
-    clone_url = f"https://{github_token}@{urlparse(repo_url).netloc}{urlparse(repo_url).path}" if github_token else repo_url
+def analyze_batch(file_paths, repo_name):
+    """Summarize several small files with one LLM call.
+
+    Returns [(file_path, result), ...] in input order. Files the model leaves
+    out of its answer fall back to analyze_file.
+    """
+    if len(file_paths) == 1:
+        return [analyze_file(file_paths[0], repo_name)]
+
+    results = {}
+    pending = []
+    summaries = llm_cache.get_cache()
+    for file_path in file_paths:
+        try:
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                code = f.read()
+        except Exception as e:
+            results[file_path] = f"❌ Error: {str(e)}"
+            continue
+        if not code.strip():
+            results[file_path] = None
+        elif len(code.strip()) < 20:
+            results[file_path] = "📄 File too short to analyze meaningfully"
+        else:
+            key = llm_cache.cache_key(code, batch_prompt_template.template, llm_provider.get_llm().model_id)
+            cached = summaries.get(key)
+            if cached is not None:
+                results[file_path] = cached
+            else:
+                name = os.path.relpath(file_path, repo_name).replace(os.sep, "/")
+                pending.append((file_path, name, code, key))
+
+    if len(pending) > 1:
+        try:
+            body = batching.format_batch([(name, code) for _, name, code, _ in pending])
+            response = _invoke(batch_prompt_template.format(files=body), "batch")
+            sections = batching.parse_batch(response, [name for _, name, _, _ in pending])
+        except Exception as e:
+            print(f"⚠️ Batch analysis failed, analyzing files one by one: {e}")
+            sections = {}
+        for file_path, name, _, key in pending:
+            explanation = sections.get(name)
+            if explanation and len(explanation) > 10:
+                summaries.put(key, explanation)
+                results[file_path] = explanation
+    for file_path, _, _, _ in pending:
+        if file_path not in results:
+            results[file_path] = analyze_file(file_path, repo_name)[1]
+
+    return [(file_path, results[file_path]) for file_path in file_paths]
+
+def route_file(file_path, rel_path, index):
+    """Static summary of a file if the router gives it one; None sends it to the LLM."""
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            code = f.read()
+    except OSError:
+        return None
+    if len(code.strip()) < 20:
+        return None
+    return static_summary.get_router().route(rel_path, code, index.get(rel_path))
+
+IMPORTANT_EXTS = [".py", ".js", ".ts", ".jsx", ".tsx", ".html", ".json"]
+# Checked out for docs runs: the documented files plus everything the symbol index parses
+CHECKOUT_EXTS = sorted(set(IMPORTANT_EXTS) | set(symbol_index.SOURCE_EXTS))
+MAX_FILE_SIZE = 50000
+
+def scan_files(repo_dir, paths=None):
+    """[(path, size)] of the files worth documenting under repo_dir.
+
+    paths are repo-relative paths already read from the git index, if any.
+    """
+    found = file_scan.scan(repo_dir, IMPORTANT_EXTS, MAX_FILE_SIZE, paths=paths)
+    return [(os.path.join(repo_dir, rel_path), size) for rel_path, size in found]
+
+def generate_docs(repo_url, clone_mode=None, incremental=False, progress=None):
+    """Clone, summarize and diagram a repo.
+
+    progress, if given, is called with event dicts ({"stage": ...}) as the
+    run advances, including one "file" event per analyzed file.
+    """
+    docs = {}
+    records = {}
+    for record in iter_docs(repo_url, clone_mode, incremental, progress):
+        if record["type"] == "file":
+            docs[record["path"]] = record["doc"]
+        else:
+            records[record["type"]] = record
+    if "error" in records:
+        return {"status": "error", "message": records["error"]["message"]}
+    docs = dict(sorted(docs.items()))
+    docs["__MERMAID__"] = records["mermaid"]["mermaid_code"]
+    return {"status": "success", "docs": docs, "files_processed": records["done"]["files_processed"],
+            "commit": records["done"]["commit"], "diagram_id": records["mermaid"]["diagram_id"]}
+
+def iter_docs(repo_url, clone_mode=None, incremental=False, progress=None):
+    """generate_docs as a stream of records, each yielded as soon as it is known.
+
+    Records are {"type": "file", "path", "doc"} per documented file, then
+    {"type": "mermaid", "mermaid_code", "diagram_id"}, then {"type": "done",
+    "files_processed", "commit"}; a failed checkout yields a single
+    {"type": "error", "message"}.
+    """
+    progress = progress or (lambda event: None)
+    with telemetry.span("docs", repo_url=repo_url, incremental=incremental):
+        # A private workspace per run; it and its checkout are removed on exit
+        with workspace.allocate("docs") as ws:
+            yield from _iter_docs_in(ws, repo_url, clone_mode, incremental, progress)
+
+def _iter_docs_in(ws, repo_url, clone_mode, incremental, progress):
+    # Check out from the shared mirror cache (clones only on first use)
+    try:
+        print(f"🔄 Preparing repository: {repo_url}")
+        progress({"stage": "clone"})
+        strategy = strategy_for("docs", CHECKOUT_EXTS, MAX_FILE_SIZE, mode=clone_mode)
+        with telemetry.span("clone", mode=strategy.mode):
+            repo_name = ws.checkout(repo_url, strategy)
+        print("✅ Repository checked out successfully")
+    except Exception as e:
+        yield {"type": "error", "message": f"❌ Git clone failed: {str(e)}"}
+        return
 
-    # Clone repository
+    # Incremental runs reuse everything recorded for files whose blob is unchanged
+    state = doc_state.load(repo_url) if incremental else None
     try:
-        print(f"🔄 Cloning repository: {repo_url}")
-        Repo.clone_from(clone_url, repo_name)
-        print("✅ Repository cloned successfully")
+        head = repo_cache.head_sha(repo_name)
+        blobs = repo_cache.blob_shas(repo_name)
     except Exception as e:
-        return {"status": "error", "message": f"❌ Git clone failed: {str(e)}"}
+        print(f"⚠️ Could not read git index, documenting from scratch: {e}")
+        head, blobs, state = None, {}, None
+
+    if state and head and state.get("commit") == head:
+        print(f"✅ {head[:10]} already documented, nothing to do")
+        for rel_path, doc in sorted(state["docs"].items()):
+            yield {"type": "file", "path": rel_path, "doc": doc}
+        diagram_id = diagram_store.get_store().put(repo_url, head, "docs", state["mermaid"])
+        yield {"type": "mermaid", "mermaid_code": state["mermaid"], "diagram_id": diagram_id}
+        yield {"type": "done", "files_processed": 0, "commit": head}
+        return
 
     docs = {}
-    important_exts = [".py", ".js", ".ts", ".jsx", ".tsx", ".html", ".json"]
 
     print("🔍 Scanning files...")
-    files_to_process = []
-
-    for root, dirs, files in os.walk(repo_name):
-        dirs[:] = [d for d in dirs if d not in {".git", "node_modules", "__pycache__", ".venv", "venv", "dist", "build", ".next", "coverage", ".pytest_cache"}]
-        for file in files:
-            if any(file.endswith(ext) for ext in important_exts):
-                path = os.path.join(root, file)
-                try:
-                    if os.path.getsize(path) <= 50000:
-                        files_to_process.append(path)
-                except:
-                    continue
-
-    print(f"🔄 Processing {len(files_to_process)} files using {cpu_count()} cores...")
-    with Pool(cpu_count()) as pool:
-        results = pool.starmap(analyze_file, [(file, repo_name) for file in files_to_process])
-
-    for index, (file_path, result) in enumerate(results, start=1):
-        if result is None:
-            print(f"Skipping empty file: {file_path}")
-            continue  # Skip empty files
-        rel_path = os.path.relpath(file_path, repo_name)
-        docs[rel_path] = result
-        print(f"{index}/{len(files_to_process)}")
+    with telemetry.span("scan") as scan:
+        sizes = dict(scan_files(repo_name, list(blobs) if blobs else None))
+        files_to_process = list(sizes)
+        scan.fields["files"] = len(files_to_process)
+
+    rel_paths = {path: os.path.relpath(path, repo_name) for path in files_to_process}
+    changed = doc_state.changed_files(state, blobs, rel_paths.values())
+    if state:
+        for path, rel_path in rel_paths.items():
+            if rel_path not in changed and rel_path in state["docs"]:
+                docs[rel_path] = state["docs"][rel_path]
+        files_to_process = [path for path in files_to_process if rel_paths[path] in changed]
+        print(f"♻️ Incremental run: {len(files_to_process)} changed, {len(docs)} reused")
+        for rel_path, doc in sorted(docs.items()):
+            yield {"type": "file", "path": rel_path, "doc": doc}
+
+    # One parse per file, shared by the static summaries and everything derived from the symbol index
+    index = {}
+    index_error = None
+    try:
+        reuse = None
+        if state:
+            # The index covers files the docs scan skips (e.g. over MAX_FILE_SIZE), so entries
+            # are matched on their own recorded blob, not on the docs change set
+            indexed = state.get("index_blobs", {})
+            reuse = {p: entry for p, entry in state.get("index", {}).items()
+                     if p in blobs and indexed.get(p) == blobs[p]}
+        index = symbol_index.build_index(repo_name, reuse, blob_shas=blobs)
+    except Exception as e:
+        print(f"⚠️ Symbol index failed, all files go to the LLM: {e}")
+        index_error = e
+
+    progress({"stage": "analyze", "total": len(files_to_process), "reused": len(docs)})
+    count = 0
+
+    # Manifests, re-export and declaration-only files get a static summary
+    llm_files = []
+    with telemetry.span("route", files=len(files_to_process)) as route:
+        for file_path in files_to_process:
+            rel_path = rel_paths[file_path]
+            summary = route_file(file_path, rel_path, index)
+            if summary is None:
+                llm_files.append(file_path)
+                continue
+            count += 1
+            progress({"stage": "file", "index": count, "total": len(files_to_process),
+                      "path": rel_path, "skipped": False, "static": True})
+            telemetry.FILES.inc(result="static")
+            docs[rel_path] = summary
+            yield {"type": "file", "path": rel_path, "doc": summary}
+        route.fields["static"] = len(files_to_process) - len(llm_files)
+    if len(llm_files) < len(files_to_process):
+        print(f"⚡ {len(files_to_process) - len(llm_files)} files summarized statically, {len(llm_files)} left for the LLM")
+
+    pool = llm_pool.get_pool()
+    print(f"🔄 Processing {len(llm_files)} files with {pool.concurrency} concurrent LLM calls...")
+    # Small files share prompts; everything else is one unit (chunked if large)
+    units = batching.plan_units([(path, sizes[path]) for path in llm_files])
+    print(f"📦 {len(llm_files)} files packed into {len(units)} LLM work units")
+    llm_done = 0
+    with telemetry.span("analyze", files=len(llm_files), units=len(units)):
+        for unit_results in pool.map_unordered(analyze_batch, [(unit, repo_name) for unit in units]):
+            for file_path, result in unit_results:
+                count += 1
+                llm_done += 1
+                rel_path = os.path.relpath(file_path, repo_name)
+                progress({"stage": "file", "index": count, "total": len(files_to_process),
+                          "path": rel_path, "skipped": result is None})
+                # LLM progress; statically summarized files were reported above
+                print(f"{llm_done}/{len(llm_files)}")
+                if result is None:
+                    telemetry.FILES.inc(result="skipped")
+                    print(f"Skipping empty file: {file_path}")
+                    continue  # Skip empty files
+                telemetry.FILES.inc(result="failed" if result.startswith("❌") else "processed")
+                docs[rel_path] = result
+                yield {"type": "file", "path": rel_path, "doc": result}
 
     # Generate Mermaid diagram
     print("📊 Generating project structure diagram...")
+    progress({"stage": "diagram"})
     try:
-        metadata = extract_metadata(repo_name)
-        if metadata:
-            mermaid_code = generate_mermaid_class_diagram(metadata)
-            cleaned_mermaid = clean_mermaid_text(mermaid_code)
-            docs["__MERMAID__"] = cleaned_mermaid
+        if index_error is not None:
+            raise index_error
+        with telemetry.span("diagram", kind="docs"):
+            metadata = metadata_from_index(index)
+            mermaid_code = clean_mermaid_text(generate_mermaid_class_diagram(metadata)) if metadata else None
+        if mermaid_code:
             print("✅ Mermaid diagram generated successfully")
-            with open("diagram.mmd", "w", encoding="utf-8") as f:
-                f.write(cleaned_mermaid)
-            print("📝 Mermaid diagram saved to diagram.mmd")
         else:
-            docs["__MERMAID__"] = "graph TD\n    A[No analyzable Python files found]"
+            mermaid_code = "graph TD\n    A[No analyzable source files found]"
     except Exception as e:
         print(f"❌ Mermaid generation failed: {e}")
-        docs["__MERMAID__"] = f"graph TD\n    A[Diagram generation failed: {str(e)[:50]}]"
-
-    # Cleanup
-    try:
-        shutil.rmtree(repo_name, onerror=handle_remove_readonly)
-        print("🧹 Temporary files cleaned up")
-    except Exception as e:
-        print(f"⚠️ Cleanup warning: {e}")
+        mermaid_code = f"graph TD\n    A[Diagram generation failed: {str(e)[:50]}]"
+
+    # Record what was documented so the next incremental run can diff against it
+    if head:
+        doc_state.save(repo_url, {
+            "commit": head,
+            "files": {p: blobs[p] for p, d in docs.items() if p in blobs and not d.startswith("❌")},
+            "docs": dict(sorted(docs.items())),
+            "index": metadata_model.index_rows(index),
+            "index_blobs": {p: blobs[p] for p in index if p in blobs},
+            "mermaid": mermaid_code,
+        })
+
+    diagram_id = diagram_store.get_store().put(repo_url, head, "docs", mermaid_code)
+    yield {"type": "mermaid", "mermaid_code": mermaid_code, "diagram_id": diagram_id}
 
     print(f"✅ Documentation generation completed! Processed {len(files_to_process)} files.")
-    return {"status": "success", "docs": docs, "files_processed": len(files_to_process)}
+    yield {"type": "done", "files_processed": len(files_to_process), "commit": head}
 
 # Ensure the message is printed only once
 if __name__ == "__main__":
-    print("🧠 Ollama + Gemma 2B Enabled")
+    print(f"🧠 LLM provider: {llm_provider.PROVIDER} ({llm_provider.MODEL})")
     #test_url = "https://github.com/juliotrigo/pycalculator"
     #result = generate_docs(test_url)
     #print(result)
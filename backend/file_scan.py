@@ -0,0 +1,247 @@
+import os
+import re
+import stat
+from concurrent.futures import ThreadPoolExecutor
+import repo_cache
+
+# The one place that decides which files of a checkout get analyzed.
+# Files are listed from the git index when the directory is a git checkout
+# (tracked files plus untracked ones not ignored by .gitignore); otherwise the
+# tree is walked with os.scandir, honoring .gitignore files along the way.
+# Either way, directories named in EXCLUDE_DIRS and paths matching the
+# gitignore-style DOCGEN_SCAN_EXCLUDE patterns are dropped, and only regular
+# files are returned, never symlinks.
+EXCLUDE_DIRS = frozenset(filter(None, os.getenv(
+    "DOCGEN_SCAN_EXCLUDE_DIRS",
+    ".git,node_modules,__pycache__,.venv,venv,dist,build,.next,coverage,"
+    ".pytest_cache,.tox,.mypy_cache,.eggs",
+).split(",")))
+EXCLUDE_PATTERNS = [p.strip() for p in os.getenv("DOCGEN_SCAN_EXCLUDE", "").split(",") if p.strip()]
+# Directory walks and stat calls fan out to threads for large trees
+SCAN_WORKERS = int(os.getenv("DOCGEN_SCAN_WORKERS", "8"))
+PARALLEL_MIN_FILES = 2000
+
+
+def _glob_regex(pattern):
+    """Regex for one gitignore glob, matched against a path relative to its base."""
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            parts.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 1:]:
+            end = pattern.index("]", i + 1)
+            parts.append("[" + pattern[i + 1:end].replace("!", "^", 1) + "]")
+            i = end + 1
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(parts)
+
+
+def compile_rules(lines):
+    """gitignore lines -> [(regex, negated, dir_only)], in file order.
+
+    Each regex also matches everything below the path, so files listed from
+    the git index are excluded along with their ignored directories.
+    """
+    rules = []
+    for line in lines:
+        line = line.rstrip("\n").rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        line = line.replace("\\", "")
+        dir_only = line.endswith("/")
+        line = line.strip("/") if dir_only else line
+        if not line:
+            continue
+        # Patterns with an inner slash are relative to their base; others match at any depth
+        anchored = "/" in line
+        body = _glob_regex(line.lstrip("/"))
+        prefix = "" if anchored else "(?:.*/)?"
+        rules.append((re.compile(f"{prefix}{body}(/.*)?$"), negated, dir_only))
+    return rules
+
+
+def _read_gitignore(path):
+    try:
+        with open(os.path.join(path, ".gitignore"), encoding="utf-8", errors="ignore") as f:
+            return compile_rules(f)
+    except OSError:
+        return []
+
+
+def _ignored(scopes, rel_path, is_dir):
+    """Check rel_path against (base, rules) scopes, innermost .gitignore last."""
+    ignored = False
+    for base, rules in scopes:
+        sub = rel_path[len(base) + 1:] if base else rel_path
+        for regex, negated, dir_only in rules:
+            match = regex.match(sub)
+            # Directory-only rules match a file only through one of its parents
+            if match and (is_dir or not dir_only or match.group(1)):
+                ignored = not negated
+    return ignored
+
+
+def _wanted(name, extensions):
+    return extensions is None or name.endswith(extensions)
+
+
+def _walk(repo_dir, start, scopes, extensions, max_size):
+    """Files under repo_dir/start via os.scandir, pruning excluded and ignored directories."""
+    found = []
+    stack = [(start, scopes)]
+    while stack:
+        rel_dir, scopes = stack.pop()
+        path = os.path.join(repo_dir, rel_dir) if rel_dir else repo_dir
+        rules = _read_gitignore(path)
+        if rules:
+            scopes = scopes + [(rel_dir, rules)]
+        try:
+            entries = list(os.scandir(path))
+        except OSError:
+            continue
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in EXCLUDE_DIRS and not _ignored(scopes, rel_path, True):
+                    stack.append((rel_path, scopes))
+            elif entry.is_file(follow_symlinks=False) and _wanted(entry.name, extensions):
+                if _ignored(scopes, rel_path, False):
+                    continue
+                try:
+                    size = entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+                if max_size is None or size <= max_size:
+                    found.append((rel_path, size))
+    return found
+
+
+def _walk_tree(repo_dir, scopes, extensions, max_size):
+    """Walk the top level here and each top-level directory on its own thread."""
+    found = []
+    rules = _read_gitignore(repo_dir)
+    if rules:
+        scopes = scopes + [("", rules)]
+    subdirs = []
+    for entry in os.scandir(repo_dir):
+        if entry.is_dir(follow_symlinks=False):
+            if entry.name not in EXCLUDE_DIRS and not _ignored(scopes, entry.name, True):
+                subdirs.append(entry.name)
+        elif entry.is_file(follow_symlinks=False) and _wanted(entry.name, extensions):
+            if _ignored(scopes, entry.name, False):
+                continue
+            try:
+                size = entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+            if max_size is None or size <= max_size:
+                found.append((entry.name, size))
+    if len(subdirs) > 1 and SCAN_WORKERS > 1:
+        with ThreadPoolExecutor(max_workers=min(SCAN_WORKERS, len(subdirs))) as executor:
+            for files in executor.map(lambda d: _walk(repo_dir, d, scopes, extensions, max_size), subdirs):
+                found.extend(files)
+    else:
+        for d in subdirs:
+            found.extend(_walk(repo_dir, d, scopes, extensions, max_size))
+    return found
+
+
+def _stat_chunk(repo_dir, rel_paths, max_size):
+    found = []
+    for rel_path in rel_paths:
+        try:
+            st = os.lstat(os.path.join(repo_dir, rel_path))
+        except OSError:
+            # Outside a sparse checkout, or deleted since the index was written
+            continue
+        if stat.S_ISREG(st.st_mode) and (max_size is None or st.st_size <= max_size):
+            found.append((rel_path, st.st_size))
+    return found
+
+
+def _from_index(repo_dir, paths, scopes, extensions, max_size):
+    """Filter listed paths by name first, so only candidates are stat'ed."""
+    candidates = []
+    for rel_path in paths:
+        rel_path = rel_path.replace(os.sep, "/")
+        parts = rel_path.split("/")
+        if not _wanted(parts[-1], extensions) or any(p in EXCLUDE_DIRS for p in parts[:-1]):
+            continue
+        if scopes and _ignored(scopes, rel_path, False):
+            continue
+        candidates.append(rel_path)
+    if len(candidates) < PARALLEL_MIN_FILES or SCAN_WORKERS <= 1:
+        return _stat_chunk(repo_dir, candidates, max_size)
+    size = -(-len(candidates) // SCAN_WORKERS)
+    chunks = [candidates[i:i + size] for i in range(0, len(candidates), size)]
+    found = []
+    with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+        for files in executor.map(lambda c: _stat_chunk(repo_dir, c, max_size), chunks):
+            found.extend(files)
+    return found
+
+
+def scan(repo_dir, extensions=None, max_size=None, excludes=(), paths=None):
+    """Sorted [(relative path, size)] of regular files under repo_dir.
+
+    extensions is a tuple of suffixes to keep (all files when None) and
+    max_size drops larger files. excludes are gitignore-style patterns on
+    top of DOCGEN_SCAN_EXCLUDE. paths, when the caller already listed the
+    git index (e.g. the keys of repo_cache.blob_shas), saves running git
+    again. Relative paths use os separators.
+    """
+    extensions = tuple(extensions) if extensions is not None else None
+    rules = compile_rules(EXCLUDE_PATTERNS + list(excludes))
+    scopes = [("", rules)] if rules else []
+    if paths is None:
+        try:
+            paths = repo_cache.list_files(repo_dir)
+        except Exception:
+            paths = None
+    if paths is not None:
+        found = _from_index(repo_dir, paths, scopes, extensions, max_size)
+    else:
+        found = _walk_tree(repo_dir, scopes, extensions, max_size)
+    if os.sep != "/":
+        found = [(rel_path.replace("/", os.sep), size) for rel_path, size in found]
+    return sorted(found)
+
+
+def disk_usage(path, limit=None, skip=(".git",)):
+    """Bytes in regular files under path, stopping early once past limit."""
+    total = 0
+    stack = [path]
+    while stack:
+        try:
+            entries = list(os.scandir(stack.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name in skip:
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                else:
+                    total += entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+            if limit and total > limit:
+                return total
+    return total
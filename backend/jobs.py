@@ -0,0 +1,178 @@
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import repo_cache
+
+# Documentation jobs run on a small bounded pool; submissions beyond
+# MAX_PENDING queued jobs are rejected instead of piling up.
+MAX_WORKERS = int(os.getenv("DOCGEN_JOB_WORKERS", "4"))
+MAX_PENDING = int(os.getenv("DOCGEN_JOB_MAX_PENDING", "32"))
+JOB_TTL = float(os.getenv("DOCGEN_JOB_TTL", "3600"))
+
+TERMINAL = ("done", "failed")
+
+
+class QueueFull(Exception):
+    pass
+
+
+class EventLog:
+    """A status plus the progress events emitted so far; readers can follow it live."""
+
+    def __init__(self):
+        self.status = "queued"
+        self.events = []
+        self.created = time.time()
+        self.finished = None
+        self._cond = threading.Condition()
+
+    def _append(self, event):
+        self.events.append(dict(event, seq=len(self.events), ts=time.time()))
+        self._cond.notify_all()
+
+    def emit(self, event):
+        with self._cond:
+            self._append(event)
+
+    def set_status(self, status, **fields):
+        with self._cond:
+            self.status = status
+            if status in TERMINAL:
+                self.finished = time.time()
+            self._append(dict(fields, stage="status", status=status))
+
+    def iter_events(self, start=0, timeout=15):
+        """Yield events from index start on, blocking until the status is terminal.
+
+        Yields None on idle timeouts so streaming callers can send keep-alives.
+        """
+        index = start
+        while True:
+            with self._cond:
+                if index >= len(self.events) and self.status not in TERMINAL:
+                    self._cond.wait(timeout)
+                pending = self.events[index:]
+                done = self.status in TERMINAL
+            if not pending:
+                if done:
+                    return
+                yield None
+            for event in pending:
+                yield event
+            index += len(pending)
+
+
+class Job(EventLog):
+    """One documentation run plus the progress events it has emitted."""
+
+    def __init__(self, key, repo_url, commit, options):
+        super().__init__()
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.repo_url = repo_url
+        self.commit = commit
+        self.options = options
+        self.result = None
+        self.error = None
+
+    def progress(self):
+        for event in reversed(self.events):
+            if event["stage"] == "file":
+                return {"done": event["index"], "total": event["total"]}
+        return None
+
+    def to_dict(self, include_result=True):
+        data = {
+            "job_id": self.id,
+            "repo_url": self.repo_url,
+            "commit": self.commit,
+            "status": self.status,
+            "progress": self.progress(),
+            "created": self.created,
+            "finished": self.finished,
+        }
+        if self.error:
+            data["error"] = self.error
+        if include_result and self.result is not None:
+            data["result"] = self.result
+        return data
+
+
+class JobManager:
+    def __init__(self, max_workers=MAX_WORKERS, max_pending=MAX_PENDING, ttl=JOB_TTL):
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="docgen-job")
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._active = {}
+
+    def submit(self, repo_url, **options):
+        """Queue a docs job, or return the live job already running for this repo+commit.
+
+        Returns (job, deduplicated).
+        """
+        try:
+            commit = repo_cache.remote_head(repo_url)
+        except Exception as e:
+            print(f"⚠️ Could not resolve remote HEAD for {repo_url}: {e}")
+            commit = None
+        key = (repo_cache.normalize_url(repo_url), commit)
+        with self._lock:
+            self._prune()
+            job = self._active.get(key)
+            if job is not None:
+                return job, True
+            pending = sum(1 for j in self._active.values() if j.status == "queued")
+            if pending >= self.max_pending:
+                raise QueueFull(f"{pending} jobs already queued")
+            job = Job(key, repo_url, commit, options)
+            self._jobs[job.id] = job
+            self._active[key] = job
+        job.set_status("queued")
+        self._executor.submit(self._run, job)
+        return job, False
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job):
+        from docgen_utils import generate_docs
+        job.set_status("running")
+        try:
+            result = generate_docs(job.repo_url, progress=job.emit, **job.options)
+            if result.get("status") == "success":
+                job.result = result
+                job.commit = result.get("commit") or job.commit
+                job.set_status("done")
+            else:
+                job.error = result.get("message", "Documentation generation failed")
+                job.set_status("failed", error=job.error)
+        except Exception as e:
+            job.error = str(e)
+            job.set_status("failed", error=job.error)
+        finally:
+            with self._lock:
+                if self._active.get(job.key) is job:
+                    del self._active[job.key]
+
+    def _prune(self):
+        now = time.time()
+        expired = [j.id for j in self._jobs.values() if j.finished and now - j.finished > self.ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+_manager = None
+_manager_guard = threading.Lock()
+
+
+def get_manager():
+    global _manager
+    with _manager_guard:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
@@ -0,0 +1,839 @@
+import os
+import re
+
+# Structural index of JavaScript and TypeScript files without a JS runtime.
+# A small tokenizer understands comments, strings, template literals and
+# regex literals well enough to keep braces balanced (JSX text is tolerated,
+# not parsed), and a parser picks out the declarations the diagrams use:
+# imports and re-exports, require() calls, classes with their fields and
+# methods, and top-level functions, including `const f = (...) => ...`.
+# Entries have the same shape as symbol_index's Python entries, so the call
+# resolver, module graph and diagram builders work on them unchanged.
+VERSION = 2
+EXTENSIONS = (".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx")
+
+# Imports of these are assets, not modules, and never become dependencies
+ASSET_EXTS = {
+    ".css", ".scss", ".sass", ".less", ".styl", ".svg", ".png", ".jpg", ".jpeg", ".gif",
+    ".webp", ".ico", ".bmp", ".avif", ".json", ".html", ".md", ".txt", ".woff", ".woff2",
+    ".ttf", ".otf", ".eot", ".mp3", ".mp4", ".webm", ".wav", ".wasm", ".graphql", ".gql",
+}
+# A "/" after these words starts a regex literal, not a division
+_EXPR_KEYWORDS = {
+    "return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw",
+    "case", "do", "else", "yield", "await",
+}
+_MODIFIERS = {
+    "static", "async", "get", "set", "public", "private", "protected", "readonly",
+    "abstract", "override", "declare", "accessor",
+}
+# Top-level statements starting with these declare something rather than run code
+_DECLARATIONS = {
+    "import", "export", "const", "let", "var", "function", "class", "interface", "type",
+    "enum", "declare", "async", "abstract", "namespace", "module", "default",
+}
+
+_TOKEN = re.compile(r"""
+    (?P<space>[ \t\r\f\v\u00a0\ufeff\u2028\u2029]+)
+  | (?P<newline>\n)
+  | (?P<comment>//[^\n]*|/\*[\s\S]*?(?:\*/|\Z))
+  | (?P<name>[A-Za-z_$\u0080-\uffff][\w$\u0080-\uffff]*)
+  | (?P<private>\#[A-Za-z_$][\w$]*)
+  | (?P<num>\d[\w.]*|\.\d\w*)
+  | (?P<str>'(?:[^'\\\n]|\\[\s\S])*(?:'|(?=\n)|\Z)|"(?:[^"\\\n]|\\[\s\S])*(?:"|(?=\n)|\Z))
+""", re.VERBOSE)
+# Longest first; ">>" is left as two tokens so nested generics close cleanly
+_PUNCT = re.compile(r"\.\.\.|===|!==|\*\*=|<<=|&&=|\|\|=|\?\?=|=>|==|!=|<=|>=|&&|\|\||\?\?|\?\.(?!\d)"
+                    r"|\+\+|--|\+=|-=|\*=|%=|&=|\|=|\^=|\*\*|<<|[{}()\[\];,<>=!+\-*%&|^~?:.@#]")
+
+_EOF = ("eof", "", 0)
+
+
+# ---------- Tokenizer ----------
+
+def _skip_string(source, i, quote):
+    n = len(source)
+    while i < n:
+        c = source[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == quote or c == "\n":
+            return i + 1 if c == quote else i
+        i += 1
+    return n
+
+
+def _skip_template(source, i):
+    """Index just past the template literal whose body starts at i."""
+    n = len(source)
+    while i < n:
+        c = source[i]
+        if c == "\\":
+            i += 2
+        elif c == "`":
+            return i + 1
+        elif c == "$" and source.startswith("${", i):
+            i = _skip_substitution(source, i + 2)
+        else:
+            i += 1
+    return n
+
+
+def _skip_substitution(source, i):
+    """Index just past the `}` closing a ${...} that starts at i."""
+    n = len(source)
+    depth = 0
+    while i < n:
+        c = source[i]
+        if c in "'\"":
+            i = _skip_string(source, i + 1, c)
+            continue
+        if c == "`":
+            i = _skip_template(source, i + 1)
+            continue
+        if source.startswith("//", i):
+            end = source.find("\n", i)
+            i = n if end < 0 else end
+            continue
+        if source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+            continue
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            if not depth:
+                return i + 1
+            depth -= 1
+        i += 1
+    return n
+
+
+def _regex_end(source, i):
+    """End of a regex literal starting at i, or None if it is not one."""
+    n = len(source)
+    j = i + 1
+    in_class = False
+    while j < n:
+        c = source[j]
+        if c == "\n":
+            return None
+        if c == "\\":
+            j += 2
+            continue
+        if in_class:
+            in_class = c != "]"
+        elif c == "[":
+            in_class = True
+        elif c == "/":
+            j += 1
+            while j < n and (source[j].isalnum() or source[j] == "_"):
+                j += 1
+            return j
+        j += 1
+    return None
+
+
+def _regex_allowed(prev):
+    if prev is None:
+        return True
+    kind, value, _ = prev
+    if kind == "punct":
+        # "<" before "/" is a JSX closing tag
+        return value not in (")", "]", "}", "++", "--", "<")
+    return kind == "name" and value in _EXPR_KEYWORDS
+
+
+def tokenize(source):
+    """[(kind, value, line)]; kinds are name, private, num, str, regex and punct.
+
+    Comments and whitespace are dropped; template literals become one str
+    token with an empty value.
+    """
+    tokens = []
+    i, n, line = 0, len(source), 1
+    prev = None
+    while i < n:
+        c = source[i]
+        start = i
+        if c == "`":
+            i = _skip_template(source, i + 1)
+            tok = ("str", "", line)
+        elif c == "/" and _regex_allowed(prev) and source[i + 1:i + 2] not in ("/", "*"):
+            end = _regex_end(source, i)
+            if end is None:
+                i += 1
+                tok = ("punct", "/", line)
+            else:
+                i = end
+                tok = ("regex", source[start:end], line)
+        else:
+            m = _TOKEN.match(source, i)
+            if m:
+                kind = m.lastgroup
+                i = m.end()
+                if kind == "newline":
+                    line += 1
+                    continue
+                if kind in ("space", "comment"):
+                    line += source.count("\n", start, i)
+                    continue
+                value = m.group()
+                if kind == "str":
+                    value = value[1:-1] if len(value) > 1 and value[-1] == value[0] else value[1:]
+                tok = (kind, value, line)
+            else:
+                m = _PUNCT.match(source, i)
+                if m:
+                    i = m.end()
+                    tok = ("punct", m.group(), line)
+                elif c == "/":
+                    i += 2 if source.startswith("/=", i) else 1
+                    tok = ("punct", source[start:i], line)
+                else:
+                    i += 1
+                    continue
+        line += source.count("\n", start, i)
+        tokens.append(tok)
+        prev = tok
+    return tokens
+
+
+# ---------- Module names and import specifiers ----------
+
+def module_name(rel_path):
+    """Dotted module name for a repo-relative JS/TS path; index files name their directory."""
+    parts = os.path.splitext(rel_path)[0].replace(os.sep, "/").split("/")
+    if parts[-1] == "index":
+        parts = parts[:-1]
+    return ".".join(p.replace(".", "_") for p in parts)
+
+
+def specifier_module(spec):
+    """(module, level) for an import specifier, like a Python relative import.
+
+    "./a/b" is ("a.b", 1) and "../a" is ("a", 2). "@/x" and "~/x" are root
+    aliases and come back absolute. Returns None for asset imports.
+    """
+    spec = spec.split("?")[0].split("#")[0]
+    if spec.startswith("node:"):
+        spec = spec[5:]
+    level = 0
+    if spec in (".", "..") or spec.startswith(("./", "../")):
+        level = 1
+        parts = []
+        for part in spec.split("/"):
+            if part == "..":
+                level += 1
+            elif part and part != ".":
+                parts.append(part)
+    elif spec.startswith(("@/", "~/")):
+        parts = [p for p in spec[2:].split("/") if p]
+    elif spec.startswith("@") and "/" in spec:
+        scope, _, rest = spec.partition("/")
+        name, _, rest = rest.partition("/")
+        parts = [f"{scope}/{name}"] + [p for p in rest.split("/") if p]
+    else:
+        parts = [p for p in spec.split("/") if p]
+    if parts:
+        stem, ext = os.path.splitext(parts[-1])
+        if ext in ASSET_EXTS:
+            return None
+        if ext in EXTENSIONS:
+            parts[-1] = stem
+        if level and parts[-1] == "index":
+            parts.pop()
+    return ".".join(p.replace(".", "_") for p in parts), level
+
+
+# ---------- Parser ----------
+
+class _Parser:
+    def __init__(self, tokens):
+        self.toks = tokens
+        self.classes = []
+        self.functions = []
+        self.imports = []
+        self.calls = []
+        self.assigns = []
+
+    def at(self, k):
+        return self.toks[k] if 0 <= k < len(self.toks) else _EOF
+
+    def value(self, k):
+        return self.at(k)[1]
+
+    def is_punct(self, k, value):
+        tok = self.at(k)
+        return tok[0] == "punct" and tok[1] == value
+
+    def is_name(self, k, value=None):
+        tok = self.at(k)
+        return tok[0] == "name" and (value is None or tok[1] == value)
+
+    def skip_balanced(self, k):
+        """Index after the bracket group opening at k."""
+        depth = 0
+        n = len(self.toks)
+        while k < n:
+            kind, value, _ = self.toks[k]
+            if kind == "punct":
+                if value in "([{":
+                    depth += 1
+                elif value in ")]}":
+                    depth -= 1
+                    if depth <= 0:
+                        return k + 1
+            k += 1
+        return n
+
+    def skip_angle(self, k):
+        """Index after the type argument list <...> opening at k."""
+        depth = 0
+        n = len(self.toks)
+        while k < n:
+            kind, value, _ = self.toks[k]
+            if kind == "punct":
+                if value == "<":
+                    depth += 1
+                elif value == ">":
+                    depth -= 1
+                    if depth <= 0:
+                        return k + 1
+                elif value in "([{":
+                    k = self.skip_balanced(k)
+                    continue
+                elif value in (";", ")", "]", "}"):
+                    return k
+            k += 1
+        return n
+
+    # ----- imports -----
+
+    def add_import(self, spec, name, alias=None):
+        target = specifier_module(spec)
+        if target is not None:
+            module, level = target
+            self.imports.append({'module': module, 'name': name, 'alias': alias, 'level': level})
+
+    def parse_import(self, k):
+        """`import ...` statement at k; returns the index after it."""
+        k += 1
+        if self.at(k)[0] == "str":
+            self.add_import(self.value(k), "*")
+            return k + 1
+        if self.is_name(k, "type") and not (self.is_punct(k + 1, ",") or self.is_name(k + 1, "from")):
+            k += 1
+        bindings = []
+        n = len(self.toks)
+        while k < n and not self.is_name(k, "from") and not self.is_punct(k, ";"):
+            if self.is_punct(k, "*") and self.is_name(k + 1, "as"):
+                bindings.append((None, self.value(k + 2)))
+                k += 3
+            elif self.is_punct(k, "{"):
+                end = self.skip_balanced(k)
+                bindings.extend(self.named_bindings(k + 1, end - 1))
+                k = end
+            elif self.is_name(k):
+                # Default import; assume the default export carries the local name
+                bindings.append((self.value(k), None))
+                k += 1
+            else:
+                k += 1
+        if not self.is_name(k, "from") or self.at(k + 1)[0] != "str":
+            return k
+        spec = self.value(k + 1)
+        for name, alias in bindings or [("*", None)]:
+            self.add_import(spec, name, alias)
+        return k + 2
+
+    def named_bindings(self, k, end):
+        """[(name, alias)] from `a, b as c, type d` between braces."""
+        bindings = []
+        while k < end:
+            if self.is_name(k, "type") and self.is_name(k + 1) and not self.is_name(k + 1, "as"):
+                k += 1
+            if self.at(k)[0] in ("name", "str"):
+                name = self.value(k)
+                alias = None
+                if self.is_name(k + 1, "as") or self.is_punct(k + 1, ":"):
+                    alias = self.value(k + 2)
+                    k += 2
+                bindings.append((name, alias if alias != name else None))
+            k += 1
+            while k < end and not self.is_punct(k - 1, ","):
+                k += 1
+        return bindings
+
+    def parse_export_from(self, k):
+        """`export * from`, `export * as ns from` and `export {...} from` at k."""
+        j = k + 1
+        if self.is_name(j, "type"):
+            j += 1
+        if self.is_punct(j, "*"):
+            bindings = [(None, self.value(j + 2))] if self.is_name(j + 1, "as") else [("*", None)]
+            j += 3 if self.is_name(j + 1, "as") else 1
+        elif self.is_punct(j, "{"):
+            end = self.skip_balanced(j)
+            bindings = self.named_bindings(j + 1, end - 1)
+            j = end
+        else:
+            return k + 1
+        if self.is_name(j, "from") and self.at(j + 1)[0] == "str":
+            for name, alias in bindings or [("*", None)]:
+                self.add_import(self.value(j + 1), name, alias)
+            return j + 2
+        return j
+
+    def parse_require(self, k):
+        """require("x") at k, bound by `const x =` or `const {a, b} =` when it is."""
+        spec = self.value(k + 2)
+        if self.is_punct(k - 1, "=") and self.is_name(k - 2):
+            self.add_import(spec, None, self.value(k - 2))
+        elif self.is_punct(k - 1, "=") and self.is_punct(k - 2, "}"):
+            start = k - 2
+            while start > 0 and not self.is_punct(start, "{"):
+                start -= 1
+            for name, alias in self.named_bindings(start + 1, k - 2) or [("*", None)]:
+                self.add_import(spec, name, alias)
+        else:
+            self.add_import(spec, "*")
+        return k + 4
+
+    # ----- functions -----
+
+    def render(self, start, end):
+        """Source-like text for tokens[start:end], e.g. a parameter or a type."""
+        out = []
+        prev = prev_kind = None
+        for kind, value, _ in self.toks[start:end]:
+            text = f'"{value}"' if kind == "str" else value
+            if out and (prev in (",", ":", "=>", "|", "&") or value in ("=>", "|", "&")
+                        or (kind == "name" and prev_kind in ("name", "num"))):
+                out.append(" ")
+            out.append(text)
+            prev, prev_kind = value, kind
+        return "".join(out)
+
+    def parse_params(self, k):
+        """(["name: Type", ...], index after ")") for the parameter list opening at k."""
+        end = self.skip_balanced(k)
+        args = []
+        start = k + 1
+        depth = 0
+        for j in range(k + 1, end):
+            kind, value, _ = self.toks[j]
+            if kind == "punct" and value in "([{<":
+                depth += 1
+            elif kind == "punct" and value in ")]}>":
+                depth -= 1
+            if depth < 0 or (depth == 0 and self.is_punct(j, ",")):
+                arg = self.render_param(start, j)
+                if arg:
+                    args.append(arg)
+                start = j + 1
+        return args, end
+
+    def render_param(self, start, end):
+        while start < end and (self.value(start) in _MODIFIERS or self.is_punct(start, "@")):
+            start += 2 if self.is_punct(start, "@") else 1
+        stop = start
+        depth = 0
+        while stop < end:
+            kind, value, _ = self.toks[stop]
+            if kind == "punct" and value in "([{<":
+                depth += 1
+            elif kind == "punct" and value in ")]}>":
+                depth -= 1
+            elif depth == 0 and kind == "punct" and value == "=":
+                break
+            stop += 1
+        if stop == start or self.is_name(start, "this"):
+            return ""
+        text = self.render(start, stop)
+        return text.replace("?:", ":")
+
+    def parse_return(self, k):
+        """(type, index) for an optional `: Type` at k, stopping before a body or =>."""
+        if not self.is_punct(k, ":"):
+            return "", k
+        start = j = k + 1
+        n = len(self.toks)
+        while j < n:
+            kind, value, _ = self.toks[j]
+            if kind == "punct":
+                if value in ("{", "=>", ";") and j > start and self.value(j - 1) not in ("|", "&", ":", "<", ",", "=>"):
+                    break
+                if value in "([{":
+                    j = self.skip_balanced(j)
+                    continue
+                if value == "<":
+                    j = self.skip_angle(j)
+                    continue
+                if value in (")", "]", "}"):
+                    break
+            j += 1
+        return self.render(start, j), j
+
+    def arrow_at(self, k):
+        """(args, ret) if an arrow function or function expression starts at k, else None."""
+        if self.is_name(k, "async"):
+            k += 1
+        if self.is_name(k, "function"):
+            k += 1
+            if self.is_punct(k, "*"):
+                k += 1
+            if self.is_name(k):
+                k += 1
+            if self.is_punct(k, "("):
+                args, j = self.parse_params(k)
+                return args, self.parse_return(j)[0]
+            return None
+        if self.is_punct(k, "<"):
+            k = self.skip_angle(k)
+        if self.is_name(k) and self.is_punct(k + 1, "=>"):
+            return [self.value(k)], ""
+        if self.is_punct(k, "("):
+            args, j = self.parse_params(k)
+            ret, j = self.parse_return(j)
+            if self.is_punct(j, "=>"):
+                return args, ret
+        return None
+
+    def parse_function(self, k):
+        """`function name(...)` at k; returns the index after the signature."""
+        j = k + 1
+        if self.is_punct(j, "*"):
+            j += 1
+        if not self.is_name(j):
+            return j
+        name = self.value(j)
+        j += 1
+        if self.is_punct(j, "<"):
+            j = self.skip_angle(j)
+        if not self.is_punct(j, "("):
+            return j
+        args, j = self.parse_params(j)
+        ret, j = self.parse_return(j)
+        self.functions.append({'name': name, 'args': args, 'ret': ret})
+        return j
+
+    def parse_variable(self, k):
+        """`const name = <function>` at k, also through one wrapper call like memo(...)."""
+        j = k + 1
+        if not self.is_name(j):
+            return j
+        name = self.value(j)
+        j += 1
+        if self.is_punct(j, ":"):
+            while j < len(self.toks) and not self.is_punct(j, "=") and not self.is_punct(j, ";"):
+                j = self.skip_balanced(j) if self.value(j) in ("(", "[", "{") else j + 1
+        if not self.is_punct(j, "="):
+            return j
+        j += 1
+        found = self.arrow_at(j)
+        if found is None and self.is_name(j):
+            w = j + 1
+            while self.is_punct(w, ".") and self.is_name(w + 1):
+                w += 2
+            if self.is_punct(w, "<"):
+                w = self.skip_angle(w)
+            if self.is_punct(w, "("):
+                found = self.arrow_at(w + 1)
+        if found is not None:
+            self.functions.append({'name': name, 'args': found[0], 'ret': found[1]})
+        elif not self.is_name(j, "require"):
+            self.assigns.append(name)
+        return j
+
+    # ----- classes -----
+
+    def parse_class(self, k, top_level, name=None):
+        """Class declaration or expression at k; returns the index after its body."""
+        j = k + 1
+        if self.is_name(j) and self.value(j) not in ("extends", "implements"):
+            name = self.value(j)
+            j += 1
+        if self.is_punct(j, "<"):
+            j = self.skip_angle(j)
+        bases = []
+        n = len(self.toks)
+        while j < n and not self.is_punct(j, "{"):
+            if (self.is_name(j, "extends") and self.is_name(j + 1)
+                    and not self.is_punct(j + 2, ".") and not self.is_punct(j + 2, "(")):
+                # Only bare names, as for Python bases
+                bases.append(self.value(j + 1))
+            if self.value(j) in ("(", "[", "<") and self.at(j)[0] == "punct":
+                j = self.skip_angle(j) if self.value(j) == "<" else self.skip_balanced(j)
+                continue
+            if self.value(j) in (";", "}", ")"):
+                return j
+            j += 1
+        end = self.skip_balanced(j)
+        record = {
+            'name': name,
+            'top_level': top_level,
+            'bases': bases,
+            'methods': [],
+            'properties': [],
+            'attrs': [],
+        }
+        if name:
+            self.classes.append(record)
+        self.parse_members(record, j + 1, end - 1)
+        return end
+
+    def parse_members(self, record, k, end):
+        methods = record['methods']
+        while k < end:
+            if self.is_punct(k, ";") or self.is_punct(k, ","):
+                k += 1
+                continue
+            while self.is_punct(k, "@"):
+                k += 2
+                while self.is_punct(k, ".") and self.is_name(k + 1):
+                    k += 2
+                if self.is_punct(k, "("):
+                    k = self.skip_balanced(k)
+            private = False
+            while self.is_modifier(k):
+                private = private or self.value(k) in ("private", "protected")
+                k += 1
+            if self.is_name(k, "static") and self.is_punct(k + 1, "{"):
+                k = self.skip_balanced(k + 1)
+                continue
+            if self.is_punct(k, "*"):
+                k += 1
+            kind, name, _ = self.at(k)
+            if kind == "punct" and name == "[":
+                k = self.skip_balanced(k)
+                name = "[computed]"
+            elif kind in ("name", "private", "str", "num"):
+                k += 1
+            else:
+                k += 1
+                continue
+            private = private or name.startswith(("#", "_"))
+            name = name.lstrip("#")
+            if self.is_punct(k, "?") or self.is_punct(k, "!"):
+                k += 1
+            if self.is_punct(k, "<"):
+                k = self.skip_angle(k)
+            if self.is_punct(k, "("):
+                args, k = self.parse_params(k)
+                ret, k = self.parse_return(k)
+                if name == "constructor":
+                    self.param_properties(record, k)
+                if self.is_punct(k, "{"):
+                    body_end = self.skip_balanced(k)
+                    self.scan_body(record, name, k + 1, body_end - 1)
+                    k = body_end
+                if name not in {m['name'] for m in methods}:
+                    methods.append({'name': name, 'args': args, 'ret': ret, 'private': private})
+                continue
+            # Field, possibly holding an arrow function (e.g. a bound event handler)
+            value_start = None
+            if self.is_punct(k, ":"):
+                k += 1
+                while k < end and not self.is_punct(k, "=") and not self.member_ends(k, end):
+                    k = self.skip_balanced(k) if self.value(k) in ("(", "[", "{") and self.at(k)[0] == "punct" else k + 1
+            if self.is_punct(k, "="):
+                value_start = k + 1
+                k += 1
+                while k < end and not self.member_ends(k, end):
+                    k = self.skip_balanced(k) if self.value(k) in ("(", "[", "{") and self.at(k)[0] == "punct" else k + 1
+            found = self.arrow_at(value_start) if value_start is not None else None
+            if found is not None:
+                self.scan_body(record, name, value_start, k)
+                if name not in {m['name'] for m in methods}:
+                    methods.append({'name': name, 'args': found[0], 'ret': found[1], 'private': private})
+            else:
+                record['properties'].append({'name': name, 'private': private})
+
+    def is_modifier(self, k):
+        """A modifier keyword, as opposed to a member that is named e.g. `get` or `static`."""
+        if not self.is_name(k) or self.value(k) not in _MODIFIERS:
+            return False
+        kind, value, _ = self.at(k + 1)
+        return kind in ("name", "private", "str", "num") or (kind == "punct" and value in ("[", "*"))
+
+    def member_ends(self, k, end):
+        """Whether a class field ends before token k (";" or a new line starting a member)."""
+        if k >= end or self.is_punct(k, ";"):
+            return True
+        kind, value, line = self.at(k)
+        prev_kind, prev_value, prev_line = self.at(k - 1)
+        if line == prev_line:
+            return False
+        complete = prev_kind in ("name", "private", "num", "str", "regex") or prev_value in (")", "]", "}")
+        return complete and (kind in ("name", "private", "str") or value in ("@", "*", "#"))
+
+    def param_properties(self, record, k):
+        """TypeScript `constructor(private api: Api)` declares attributes too."""
+        j = k - 1
+        while j > 0 and not self.is_name(j, "constructor"):
+            j -= 1
+        for i in range(j + 2, k):
+            if self.value(i) in ("private", "protected", "public", "readonly") and self.at(i)[0] == "name":
+                nxt = i + 1
+                while self.value(nxt) in ("private", "protected", "public", "readonly"):
+                    nxt += 1
+                if self.is_name(nxt) and nxt < k and self.value(nxt) not in record['attrs']:
+                    record['attrs'].append(self.value(nxt))
+
+    def scan_body(self, record, method, k, end):
+        """Calls with a dotted receiver, nested classes, and this.x = ... in constructors."""
+        attrs = record['attrs']
+        while k < end:
+            kind, value, _ = self.toks[k]
+            if kind == "name":
+                if value == "class" and not self.is_punct(k - 1, ".") and (
+                        self.is_name(k + 1) or self.is_punct(k + 1, "{")):
+                    k = self.parse_class(k, False)
+                    continue
+                if (value == "this" and method == "constructor" and self.is_punct(k + 1, ".")
+                        and self.at(k + 2)[0] in ("name", "private") and self.is_punct(k + 3, "=")):
+                    attr = self.value(k + 2).lstrip("#")
+                    if attr not in attrs:
+                        attrs.append(attr)
+            elif kind == "punct" and value == "(" and self.is_name(k - 1) and self.value(k - 2) in (".", "?."):
+                receiver = self.receiver(k - 3)
+                if receiver and record['name']:
+                    self.calls.append((record['name'], method, receiver, self.value(k - 1)))
+            k += 1
+
+    def receiver(self, k):
+        """Dotted name ending at token k, or None if it is not a plain name chain."""
+        parts = []
+        while True:
+            kind, value, _ = self.at(k)
+            if kind != "name":
+                return None
+            parts.append(value)
+            if self.value(k - 1) in (".", "?.") and self.at(k - 1)[0] == "punct":
+                k -= 2
+                continue
+            return ".".join(reversed(parts))
+
+    # ----- file -----
+
+    def parse(self):
+        toks = self.toks
+        n = len(toks)
+        depth = 0
+        k = 0
+        while k < n:
+            kind, value, line = toks[k]
+            if kind == "punct":
+                if value in "([{":
+                    depth += 1
+                elif value in ")]}":
+                    depth = max(0, depth - 1)
+                k += 1
+                continue
+            if kind != "name" or self.is_punct(k - 1, ".") or self.is_punct(k - 1, "?."):
+                k += 1
+                continue
+            if value == "import":
+                if self.is_punct(k + 1, "(") and self.at(k + 2)[0] == "str":
+                    self.add_import(self.value(k + 2), "*")
+                    k += 3
+                elif depth == 0 and not self.is_punct(k + 1, "(") and not self.is_punct(k + 1, "."):
+                    k = self.parse_import(k)
+                else:
+                    k += 1
+            elif value == "require" and self.is_punct(k + 1, "(") and self.at(k + 2)[0] == "str" \
+                    and self.is_punct(k + 3, ")"):
+                k = self.parse_require(k)
+            elif value == "export" and depth == 0 and (self.is_punct(k + 1, "*") or self.is_punct(k + 1, "{")
+                                                       or self.is_name(k + 1, "type")):
+                k = self.parse_export_from(k)
+            elif value == "class" and (self.is_name(k + 1) or self.is_punct(k + 1, "{")):
+                name = self.value(k - 2) if self.is_punct(k - 1, "=") and self.is_name(k - 2) else None
+                k = self.parse_class(k, depth == 0, name)
+            elif value == "function" and depth == 0 and self.statement_start(k):
+                k = self.parse_function(k)
+            elif value in ("const", "let", "var") and depth == 0:
+                k = self.parse_variable(k)
+            else:
+                k += 1
+
+    def opens_block(self, k):
+        """Whether the "{" at k opens code (a function body or control block), not an object or type."""
+        kind, value, _ = self.at(k - 1)
+        if kind == "punct" and value in (")", "=>"):
+            return True
+        if kind == "name" and value in ("else", "try", "finally", "do"):
+            return True
+        # A return type annotation between ")" and the body: `f(): Promise<T> {`
+        j = k - 1
+        while j > 0 and k - j < 32:
+            kind, value, _ = self.toks[j]
+            if kind == "punct" and value in (";", "{", "}", "=", "=>"):
+                return False
+            if kind == "punct" and value == ")" and self.is_punct(j + 1, ":"):
+                return True
+            j -= 1
+        return False
+
+    def logic_lines(self):
+        """Number of source lines holding executable code.
+
+        Counts lines inside function bodies and control blocks, and top-level
+        expression statements; imports, exports, declarations, object literals
+        and type definitions do not count.
+        """
+        lines = set()
+        blocks = []
+        nesting = 0
+        in_statement = False
+        for k, (kind, value, line) in enumerate(self.toks):
+            code = bool(blocks) and blocks[-1]
+            if kind == "punct" and value == "{":
+                blocks.append(code or self.opens_block(k))
+            elif kind == "punct" and value == "}":
+                if blocks:
+                    blocks.pop()
+            elif kind == "punct" and value in "([":
+                nesting += 1
+            elif kind == "punct" and value in ")]":
+                nesting = max(0, nesting - 1)
+            if code:
+                if value != "}":
+                    lines.add(line)
+                continue
+            if not blocks and not nesting:
+                if kind == "punct" and value == ";":
+                    in_statement = False
+                    continue
+                prev_kind, prev_value, prev_line = self.at(k - 1)
+                if prev_kind == "eof" or prev_value == ";" or (
+                        line != prev_line and value not in (".", "?.") and self.statement_start(k)):
+                    in_statement = kind == "name" and value not in _DECLARATIONS
+            if in_statement:
+                lines.add(line)
+        return len(lines)
+
+    def statement_start(self, k):
+        kind, value, line = self.at(k - 1)
+        if kind == "eof" or value in (";", "}", "{", "export", "default", "async", "declare"):
+            return True
+        return line != self.at(k)[2] and value not in ("=", "(", ",", ":", "?", "||", "&&", "??", "=>")
+
+
+def index_source(source, rel_path):
+    """Index entry for one JS/TS file, shaped like symbol_index.index_source."""
+    parser = _Parser(tokenize(source))
+    parser.parse()
+    return {
+        'path': rel_path,
+        'module': module_name(rel_path),
+        'classes': parser.classes,
+        'functions': parser.functions,
+        'imports': parser.imports,
+        'calls': parser.calls,
+        'doc': "",
+        'assigns': parser.assigns,
+        'logic_lines': parser.logic_lines(),
+    }
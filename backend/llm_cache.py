@@ -0,0 +1,125 @@
+import os
+import time
+import sqlite3
+import hashlib
+import tempfile
+import threading
+import telemetry
+
+# Content-addressed store of LLM summaries. The same code, prompt and model
+# always produce a cache hit, whichever repo, fork or run the file came from.
+CACHE_PATH = os.getenv("DOCGEN_LLM_CACHE_PATH", os.path.join(tempfile.gettempdir(), "docgen_llm_cache.sqlite3"))
+MAX_BYTES = int(os.getenv("DOCGEN_LLM_CACHE_MAX_BYTES", str(256 * 1024 ** 2)))
+# Reads write at most this often: last_used is only refreshed once it is
+# older than this, and hit/miss counts are flushed on that cadence (or with
+# the next put), so a hit is normally a single SELECT with no commit.
+TOUCH_INTERVAL = 60
+
+
+def cache_key(code, template, model):
+    h = hashlib.sha256()
+    for part in (model, template, code):
+        h.update(part.encode("utf-8", errors="ignore"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class SummaryCache:
+    """SQLite-backed summary cache with LRU eviction by total size.
+
+    Hit/miss counters and the total size are stored in the database so they
+    add up across worker processes sharing the same file.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_bytes=MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            "key TEXT PRIMARY KEY, summary TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS summaries_last_used ON summaries(last_used)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self._conn.execute("INSERT OR IGNORE INTO stats VALUES ('hits', 0), ('misses', 0), ('evictions', 0)")
+        # Running byte total, so eviction never scans the table; computed once
+        # for databases created before it was kept
+        self._conn.execute("INSERT OR IGNORE INTO stats SELECT 'bytes', COALESCE(SUM(size), 0) FROM summaries")
+        self._conn.commit()
+        self._pending = {"hits": 0, "misses": 0}
+        self._flushed_at = time.time()
+
+    def _bump(self, name, n=1):
+        self._conn.execute("UPDATE stats SET value = value + ? WHERE name = ?", (n, name))
+
+    def _flush(self):
+        """Write pending hit/miss counts (the caller commits)."""
+        for name, n in self._pending.items():
+            if n:
+                self._bump(name, n)
+                self._pending[name] = 0
+        self._flushed_at = time.time()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT summary, last_used FROM summaries WHERE key = ?", (key,)).fetchone()
+            self._pending["hits" if row else "misses"] += 1
+            now = time.time()
+            touch = row is not None and now - row[1] > TOUCH_INTERVAL
+            if touch:
+                self._conn.execute("UPDATE summaries SET last_used = ? WHERE key = ?", (now, key))
+            if touch or now - self._flushed_at > TOUCH_INTERVAL:
+                self._flush()
+                self._conn.commit()
+        telemetry.CACHE_REQUESTS.inc(cache="llm", result="hit" if row else "miss")
+        return row[0] if row else None
+
+    def put(self, key, summary):
+        size = len(summary.encode("utf-8"))
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM summaries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?)", (key, summary, size, time.time())
+            )
+            self._bump("bytes", size - (old[0] if old else 0))
+            self._flush()
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT value FROM stats WHERE name = 'bytes'").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        # Trim to 90% of the budget so eviction doesn't run on every insert.
+        target = self.max_bytes * 0.9
+        for key, size in self._conn.execute("SELECT key, size FROM summaries ORDER BY last_used").fetchall():
+            if total <= target:
+                break
+            self._conn.execute("DELETE FROM summaries WHERE key = ?", (key,))
+            self._bump("bytes", -size)
+            total -= size
+            evicted += 1
+        self._bump("evictions", evicted)
+
+    def stats(self):
+        with self._lock:
+            self._flush()
+            self._conn.commit()
+            stats = dict(self._conn.execute("SELECT name, value FROM stats").fetchall())
+            stats["entries"] = self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+        return stats
+
+
+_cache = None
+_cache_guard = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    with _cache_guard:
+        if _cache is None:
+            _cache = SummaryCache()
+        return _cache
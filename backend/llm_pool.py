@@ -0,0 +1,159 @@
+import os
+import time
+import queue
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import telemetry
+
+# One executor per process for all LLM work. CONCURRENCY should match what the
+# model server can actually run in parallel (OLLAMA_NUM_PARALLEL for Ollama),
+# not the CPU count. At most MAX_QUEUE further calls wait in line; beyond that
+# submitters block, which throttles every request sharing the pool.
+CONCURRENCY = int(os.getenv("DOCGEN_LLM_CONCURRENCY", "2"))
+MAX_QUEUE = int(os.getenv("DOCGEN_LLM_MAX_QUEUE", "64"))
+LATENCY_WINDOW = 1000
+
+
+class LLMPool:
+    """Bounded thread pool for model calls with latency and queue-depth stats."""
+
+    def __init__(self, concurrency=CONCURRENCY, max_queue=MAX_QUEUE):
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="docgen-llm")
+        self._slots = threading.BoundedSemaphore(concurrency + max_queue)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._calls = 0
+        self._errors = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._waits = deque(maxlen=LATENCY_WINDOW)
+
+    def _timed(self, submitted, fn, args):
+        started = time.perf_counter()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._waits.append(started - submitted)
+        try:
+            return fn(*args)
+        except Exception:
+            with self._lock:
+                self._errors += 1
+            raise
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._calls += 1
+                self._latencies.append(time.perf_counter() - started)
+
+    def submit(self, fn, *args):
+        """Schedule fn(*args); blocks while the pool is at capacity."""
+        self._slots.acquire()
+        with self._lock:
+            self._queued += 1
+        try:
+            # Carry the caller's trace into the worker thread
+            context = contextvars.copy_context()
+            future = self._executor.submit(context.run, self._timed, time.perf_counter(), fn, args)
+        except Exception:
+            with self._lock:
+                self._queued -= 1
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def map_unordered(self, fn, arg_tuples):
+        """Yield fn(*args) for each tuple as soon as it finishes, in completion order.
+
+        Submission happens on a feeder thread so results stream back while
+        later items are still waiting for capacity, and one slow call never
+        holds back results that are already done. Closing the generator stops
+        submission and cancels queued calls.
+        """
+        done = queue.Queue()
+        submitted = []
+        stopped = threading.Event()
+
+        def feed():
+            try:
+                for args in arg_tuples:
+                    if stopped.is_set():
+                        break
+                    future = self.submit(fn, *args)
+                    if stopped.is_set():
+                        future.cancel()
+                        break
+                    submitted.append(future)
+                    future.add_done_callback(done.put)
+            finally:
+                done.put(None)
+
+        # submit() copies the current context into each call; run the feeder
+        # in the caller's, so calls keep its trace
+        context = contextvars.copy_context()
+        threading.Thread(target=context.run, args=(feed,), daemon=True, name="docgen-llm-feed").start()
+        try:
+            total = None
+            received = 0
+            while total is None or received < total:
+                future = done.get()
+                if future is None:
+                    # Everything is submitted; wait for the rest to finish
+                    total = len(submitted)
+                    continue
+                received += 1
+                yield future.result()
+        finally:
+            # Closed early (e.g. a streaming client went away): submit nothing
+            # more and drop whatever has not started yet
+            stopped.set()
+            for future in list(submitted):
+                future.cancel()
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            waits = sorted(self._waits)
+            data = {
+                "concurrency": self.concurrency,
+                "max_queue": self.max_queue,
+                "queue_depth": self._queued,
+                "in_flight": self._running,
+                "calls": self._calls,
+                "errors": self._errors,
+            }
+        data["latency_seconds"] = _summary(latencies)
+        data["queue_wait_seconds"] = _summary(waits)
+        return data
+
+
+def _summary(values):
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "avg": sum(values) / len(values),
+        "p50": values[len(values) // 2],
+        "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+        "max": values[-1],
+    }
+
+
+_pool = None
+_pool_guard = threading.Lock()
+
+telemetry.Gauge("docgen_llm_queue_depth", "Model calls waiting for a pool slot", lambda: get_pool()._queued)
+telemetry.Gauge("docgen_llm_in_flight", "Model calls currently running", lambda: get_pool()._running)
+
+
+def get_pool():
+    global _pool
+    with _pool_guard:
+        if _pool is None:
+            _pool = LLMPool()
+        return _pool
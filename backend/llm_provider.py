@@ -0,0 +1,226 @@
+import os
+import json
+import time
+import random
+import hashlib
+import threading
+import telemetry
+from batching import FILE_HEADER
+
+# Which model answers summary prompts, chosen by DOCGEN_LLM_PROVIDER:
+#   ollama - a local Ollama server (the default)
+#   openai - any server speaking the OpenAI chat completions API
+#            (llama.cpp, vLLM, LM Studio, ...)
+#   stub   - in-process and deterministic, for load tests and offline runs
+# The client is built on first use, so importing this module costs nothing.
+PROVIDER = os.getenv("DOCGEN_LLM_PROVIDER", "ollama")
+MODEL = os.getenv("DOCGEN_LLM_MODEL", "gemma:2b")
+BASE_URL = os.getenv("DOCGEN_LLM_BASE_URL")
+API_KEY = os.getenv("DOCGEN_LLM_API_KEY")
+TIMEOUT = float(os.getenv("DOCGEN_LLM_TIMEOUT", "120"))
+RETRIES = int(os.getenv("DOCGEN_LLM_RETRIES", "2"))
+BACKOFF = float(os.getenv("DOCGEN_LLM_BACKOFF", "1.0"))
+# After this many consecutive failed calls the circuit opens and calls fail
+# fast for BREAKER_COOLDOWN seconds, then a single trial call is let through.
+BREAKER_THRESHOLD = int(os.getenv("DOCGEN_LLM_BREAKER_THRESHOLD", "5"))
+BREAKER_COOLDOWN = float(os.getenv("DOCGEN_LLM_BREAKER_COOLDOWN", "30"))
+STUB_LATENCY = float(os.getenv("DOCGEN_LLM_STUB_LATENCY", "0"))
+
+
+class LLMError(Exception):
+    pass
+
+
+class CircuitOpenError(LLMError):
+    pass
+
+
+class OllamaProvider:
+    name = "ollama"
+
+    def __init__(self, model=MODEL, base_url=BASE_URL, timeout=TIMEOUT):
+        from langchain_ollama import OllamaLLM
+        kwargs = {"base_url": base_url} if base_url else {}
+        self.model = model
+        self._llm = OllamaLLM(model=model, client_kwargs={"timeout": timeout}, **kwargs)
+
+    def invoke(self, prompt):
+        return self._llm.invoke(prompt)
+
+
+class OpenAICompatibleProvider:
+    name = "openai"
+
+    def __init__(self, model=MODEL, base_url=BASE_URL, timeout=TIMEOUT, api_key=API_KEY):
+        self.model = model
+        self.url = (base_url or "http://localhost:8080/v1").rstrip("/") + "/chat/completions"
+        self.timeout = timeout
+        self.api_key = api_key
+
+    def invoke(self, prompt):
+        body = json.dumps({
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0,
+        }).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        import urllib.request
+        request = urllib.request.Request(self.url, data=body, headers=headers, method="POST")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            data = json.load(response)
+        try:
+            return data["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            raise LLMError(f"Unexpected response from {self.url}: {str(data)[:200]}")
+
+
+class StubProvider:
+    """Deterministic answers derived from the prompt; answers every FILE section of a batch."""
+    name = "stub"
+
+    def __init__(self, model="stub", latency=STUB_LATENCY, jitter=0.0, seed=0):
+        self.model = model
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def invoke(self, prompt):
+        with self._lock:
+            self.calls += 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+        names = [line[len(FILE_HEADER):].strip() for line in prompt.splitlines() if line.startswith(FILE_HEADER)]
+        if names:
+            return "\n\n".join(f"{FILE_HEADER}{name}\n{self._summary(name)}" for name in names)
+        return self._summary(prompt)
+
+    @staticmethod
+    def _summary(text):
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+        return f"Stub summary {digest}: {len(text)} characters of input."
+
+
+PROVIDERS = {"ollama": OllamaProvider, "openai": OpenAICompatibleProvider, "stub": StubProvider}
+
+
+class ResilientLLM:
+    """Retries with exponential backoff and a circuit breaker around a provider.
+
+    Per-call timeouts are enforced by the provider's HTTP client, so one hung
+    request fails after TIMEOUT seconds instead of holding a pool slot forever.
+    """
+
+    def __init__(self, provider, retries=RETRIES, backoff=BACKOFF,
+                 breaker_threshold=BREAKER_THRESHOLD, breaker_cooldown=BREAKER_COOLDOWN):
+        self.provider = provider
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    @property
+    def model_id(self):
+        """Identifies the model in summary cache keys; stub answers never mix with real ones."""
+        if self.provider.name == "ollama":
+            return self.provider.model
+        return f"{self.provider.name}:{self.provider.model}"
+
+    def _admit(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < self.breaker_cooldown or self._trial_running:
+                raise CircuitOpenError(f"{self.provider.name} circuit open after {self._failures} failures")
+            # Half-open: let one call through to probe the model
+            self._trial_running = True
+
+    def _record(self, ok):
+        with self._lock:
+            self._trial_running = False
+            if ok:
+                self._failures = 0
+                self._opened_at = None
+                return
+            self._failures += 1
+            if self._failures >= self.breaker_threshold:
+                if self._opened_at is None:
+                    print(f"⚠️ LLM circuit opened after {self._failures} consecutive failures")
+                self._opened_at = time.monotonic()
+
+    def invoke(self, prompt):
+        self._admit()
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.provider.invoke(prompt)
+            except Exception as e:
+                self._record(False)
+                if attempt == self.retries or self.is_open():
+                    raise
+                telemetry.LLM_RETRIES.inc(provider=self.provider.name)
+                delay = self.backoff * (2 ** attempt) * (0.5 + random.random())
+                print(f"⚠️ LLM call failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+            else:
+                self._record(True)
+                return response
+
+    def is_open(self):
+        with self._lock:
+            return self._opened_at is not None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "provider": self.provider.name,
+                "model": self.provider.model,
+                "circuit_open": self._opened_at is not None,
+                "consecutive_failures": self._failures,
+            }
+
+
+def make_llm(provider=None, **options):
+    """Build a client for a provider name (default DOCGEN_LLM_PROVIDER)."""
+    name = provider or PROVIDER
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown LLM provider: {name} (expected one of {', '.join(PROVIDERS)})")
+    return ResilientLLM(PROVIDERS[name](**options))
+
+
+_llm = None
+_llm_guard = threading.Lock()
+
+
+def get_llm():
+    global _llm
+    with _llm_guard:
+        if _llm is None:
+            _llm = make_llm()
+            print(f"🧠 LLM provider: {_llm.provider.name} ({_llm.provider.model})")
+        return _llm
+
+
+def set_llm(llm):
+    """Replace the shared client, e.g. with make_llm("stub") for tests and benchmarks."""
+    global _llm
+    with _llm_guard:
+        _llm = llm
+
+
+def stats():
+    with _llm_guard:
+        if _llm is None:
+            return {"provider": PROVIDER, "model": MODEL, "initialized": False}
+    return dict(_llm.stats(), initialized=True)
+
+
+telemetry.Gauge("docgen_llm_circuit_open", "1 while the model circuit breaker is open",
+                lambda: int(_llm.is_open()) if _llm else 0)
@@ -1,9 +1,23 @@
-from fastapi import FastAPI
+import json
+import time
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from typing import List, Optional
 from pydantic import BaseModel
-from docgen_utils import generate_docs
-from mermaid_gen import generate_mermaid_from_repo, generate_simplified_mermaid_from_repo
-from fastapi.responses import FileResponse
+from docgen_utils import generate_docs, iter_docs
+from mermaid_gen import generate_mermaid_from_repo, generate_simplified_mermaid_from_repo, generate_module_graph_from_repo
+from fastapi.responses import Response, StreamingResponse
+import llm_cache
+import parse_cache
+import llm_pool
+import jobs
+import batch
+import diagram_store
+import diagram_engine
+import telemetry
+import llm_provider
+import static_summary
+import metadata_model
 
 app = FastAPI()
 
@@ -16,30 +30,222 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def observe_requests(request: Request, call_next):
+    """Request latency histogram plus one structured log line per request."""
+    with telemetry.span("request", method=request.method, path=request.url.path) as span:
+        response = await call_next(request)
+        route = request.scope.get("route")
+        route = route.path if route else "unmatched"
+        span.fields.update(route=route, http_status=response.status_code)
+    telemetry.HTTP_SECONDS.observe(time.perf_counter() - span.started, method=request.method,
+                                   route=route, status=response.status_code)
+    return response
+
+def _json(data):
+    """JSON response encoded in one json.dumps pass.
+
+    Large results (the docs of a whole repo) skip FastAPI's jsonable_encoder,
+    which walks and copies every value before encoding.
+    """
+    return Response(content=metadata_model.dumps(data), media_type="application/json")
+
 class DocRequest(BaseModel):
     repo_url: str
+    clone_mode: Optional[str] = None
+    incremental: bool = False
 
 @app.post("/generate-docs")
 def generate_doc(data: DocRequest):
-    return generate_docs(data.repo_url)
+    return _json(generate_docs(data.repo_url, data.clone_mode, data.incremental))
+
+@app.post("/generate-docs/stream")
+def generate_doc_stream(data: DocRequest):
+    """NDJSON stream: one record per file summary as it completes, then the diagram."""
+    def records():
+        try:
+            for record in iter_docs(data.repo_url, data.clone_mode, data.incremental):
+                yield json.dumps(record) + "\n"
+        except Exception as e:
+            yield json.dumps({"type": "error", "message": f"❌ Documentation failed: {e}"}) + "\n"
+
+    return StreamingResponse(records(), media_type="application/x-ndjson")
+
+@app.post("/jobs")
+def submit_job(data: DocRequest):
+    """Queue a documentation job; duplicate repo+commit submissions share one job."""
+    try:
+        job, deduplicated = jobs.get_manager().submit(
+            data.repo_url, clone_mode=data.clone_mode, incremental=data.incremental
+        )
+    except jobs.QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return {"job_id": job.id, "status": job.status, "deduplicated": deduplicated}
+
+def _get_job(job_id):
+    job = jobs.get_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    return _json(_get_job(job_id).to_dict())
+
+@app.get("/jobs/{job_id}/events")
+def stream_job_events(job_id: str):
+    """Server-Sent Events stream of job progress, ending when the job finishes."""
+    job = _get_job(job_id)
+
+    def event_stream():
+        for event in job.iter_events():
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"data: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+class BatchRequest(BaseModel):
+    repo_urls: List[str] = []
+    manifest: Optional[str] = None
+    clone_mode: Optional[str] = None
+    incremental: bool = False
+
+@app.post("/batches")
+def submit_batch(data: BatchRequest):
+    """Document many repos; repo_urls and/or an org manifest (JSON or one URL per line)."""
+    try:
+        urls = list(data.repo_urls)
+        if data.manifest:
+            urls += batch.parse_manifest(data.manifest)
+        batch_job = batch.get_manager().submit(urls, clone_mode=data.clone_mode, incremental=data.incremental)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except jobs.QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return batch_job.to_dict()
+
+def _get_batch(batch_id):
+    batch_job = batch.get_manager().get(batch_id)
+    if batch_job is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return batch_job
+
+@app.get("/batches/{batch_id}")
+def get_batch(batch_id: str):
+    """Status of every repo in the batch, without the documentation itself."""
+    return _json(_get_batch(batch_id).to_dict())
+
+@app.get("/batches/{batch_id}/repos/{index}")
+def get_batch_repo(batch_id: str, index: int):
+    """One repo of a batch, with its generate-docs result once it is done."""
+    batch_job = _get_batch(batch_id)
+    if not 0 <= index < len(batch_job.repos):
+        raise HTTPException(status_code=404, detail="Repository not in batch")
+    return _json(batch_job.repos[index].to_dict(include_result=True))
+
+@app.get("/batches/{batch_id}/events")
+def stream_batch_events(batch_id: str):
+    """Server-Sent Events stream of per-repo status changes, ending when all repos finish."""
+    batch_job = _get_batch(batch_id)
+
+    def event_stream():
+        for event in batch_job.iter_events():
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"data: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 class MermaidRequest(BaseModel):
     repo_url: str
+    clone_mode: Optional[str] = None
+    lod: str = "auto"
+    package: Optional[str] = None
+    page: int = 1
+    page_size: int = diagram_engine.DEFAULT_PAGE_SIZE
 
 @app.post("/generate-mermaid")
 def generate_mermaid(data: MermaidRequest):
-    code = generate_mermaid_from_repo(data.repo_url)
-    return {"mermaid_code": code}
+    """One page of the class diagram; lod is auto, packages, classes or full."""
+    try:
+        return generate_mermaid_from_repo(
+            data.repo_url, clone_mode=data.clone_mode, lod=data.lod,
+            package=data.package, page=data.page, page_size=max(1, data.page_size),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/diagram/{model_id}")
+def get_diagram_page(model_id: str, lod: str = "auto", package: Optional[str] = None,
+                     page: int = 1, page_size: int = diagram_engine.DEFAULT_PAGE_SIZE):
+    """Re-render a stored class model at another page, package or level of detail."""
+    entry = diagram_store.get_store().get(model_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Diagram model not found")
+    try:
+        result = diagram_engine.render(json.loads(entry[0]), lod, package, page, max(1, page_size))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    result["model_id"] = model_id
+    return result
 
 @app.post("/generate-simplified-mermaid")
 def generate_simplified_mermaid_endpoint(data: MermaidRequest):
     """Endpoint to generate a simplified Mermaid diagram."""
-    mermaid_code = generate_simplified_mermaid_from_repo(data.repo_url)
-    with open("diagram.mmd", "w", encoding="utf-8") as f:
-        f.write(mermaid_code)
-    return {"mermaid_code": mermaid_code}
+    return generate_simplified_mermaid_from_repo(data.repo_url, data.clone_mode)
+
+class ModuleGraphRequest(BaseModel):
+    repo_url: str
+    clone_mode: Optional[str] = None
+    include_stdlib: bool = False
+    include_third_party: bool = True
+    depth: Optional[int] = None
+
+@app.post("/generate-module-graph")
+def generate_module_graph(data: ModuleGraphRequest):
+    """Module dependency graph; depth collapses modules to their top package levels."""
+    return generate_module_graph_from_repo(
+        data.repo_url, data.clone_mode, data.include_stdlib, data.include_third_party, data.depth
+    )
 
 @app.get("/get-mermaid-diagram")
-def get_mermaid_diagram():
-    """Endpoint to serve the contents of diagram.mmd."""
-    return FileResponse("diagram.mmd", media_type="text/plain")
\ No newline at end of file
+def get_mermaid_diagram(request: Request, id: Optional[str] = None):
+    """Serve a stored diagram by id (the most recent one without an id).
+
+    Ids are keyed by repo+commit+kind+content, so a diagram fetched by id
+    never changes and can be cached; ETag/If-None-Match short-circuits to 304.
+    """
+    store = diagram_store.get_store()
+    did = id or store.latest_id
+    entry = store.get(did) if did else None
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Diagram not found")
+    code, etag = entry
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "public, max-age=86400, immutable" if id else "no-cache",
+    }
+    if etag in [t.strip() for t in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=code, media_type="text/plain", headers=headers)
+
+@app.get("/cache-stats")
+def cache_stats():
+    """Hit/miss counters and size of the LLM summary and parse caches."""
+    return {"llm_summaries": llm_cache.get_cache().stats(), "parse": parse_cache.get_cache().stats()}
+
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus metrics: stage durations, file and cache counters, model latency and tokens."""
+    return Response(content=telemetry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/llm-stats")
+def llm_stats():
+    """Concurrency, queue depth and per-call latency of the shared LLM pool, plus provider state
+    and how many files the router kept away from the model."""
+    return dict(llm_pool.get_pool().stats(), provider=llm_provider.stats(),
+                routing=static_summary.get_router().stats())
@@ -1,82 +1,39 @@
-import os
-import sys
-import tempfile
-import shutil
-import requests
-import ast
-from git import Repo
-from PIL import Image
-import io
-import matplotlib.pyplot as plt
-import base64
+import re
+import json
+import repo_cache
+import workspace
+import diagram_store
+import symbol_index
+import call_resolver
+import diagram_engine
+import module_graph
+import telemetry
+from clone_strategy import strategy_for
 
-def clone_repo(git_url):
-    temp_dir = tempfile.mkdtemp(prefix="cloned_repo_")
-    print(f"Cloning repository {git_url} to {temp_dir} ...")
-    Repo.clone_from(git_url, temp_dir)
+def clone_repo(git_url, ws, clone_mode=None):
+    strategy = strategy_for("mermaid", symbol_index.SOURCE_EXTS, mode=clone_mode)
+    with telemetry.span("clone", mode=strategy.mode):
+        temp_dir = ws.checkout(git_url, strategy)
+    print(f"Checked out repository {git_url} to {temp_dir}")
     return temp_dir
 
-def find_python_files(directory):
-    py_files = []
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if file.endswith('.py'):
-                py_files.append(os.path.join(root, file))
-    return py_files
+def project_name_for(git_url):
+    name = repo_cache.normalize_url(git_url).rstrip("/").rsplit("/", 1)[-1]
+    return re.sub(r"\W+", "_", name) or "PROJECT"
 
-def extract_classes_and_calls(py_files):
-    """Extract class details and cross-class method calls."""
+def extract_classes_and_calls(index):
+    """Extract class details and cross-class method calls from a symbol index."""
     classes = {}
-    inheritance = []
-    method_calls = set()
-    for py_file in py_files:
-        with open(py_file, encoding="utf-8") as f:
-            try:
-                tree = ast.parse(f.read(), filename=py_file)
-            except Exception:
-                continue
-        # Collect class info
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                class_name = node.name
-                bases = [base.id for base in node.bases if isinstance(base, ast.Name)]
-                attrs = set()
-                methods = set()
-                for body_item in node.body:
-                    if isinstance(body_item, ast.FunctionDef):
-                        methods.add(body_item.name)
-                        # Find attributes in __init__
-                        if body_item.name == "__init__":
-                            for stmt in ast.walk(body_item):
-                                if isinstance(stmt, ast.Assign):
-                                    for target in stmt.targets:
-                                        if (isinstance(target, ast.Attribute) and
-                                            isinstance(target.value, ast.Name) and
-                                            target.value.id == "self"):
-                                            attrs.add(target.attr)
-                classes[class_name] = {
-                    "bases": bases,
-                    "attrs": attrs,
-                    "methods": methods,
-                }
-        # Find cross-class method calls
-        class_names = set(classes.keys())
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                src_class = node.name
-                for body_item in node.body:
-                    if isinstance(body_item, ast.FunctionDef):
-                        src_method = body_item.name
-                        for child in ast.walk(body_item):
-                            if isinstance(child, ast.Call):
-                                # Look for OtherClass.method() style calls
-                                if isinstance(child.func, ast.Attribute):
-                                    if isinstance(child.func.value, ast.Name):
-                                        tgt_class = child.func.value.id
-                                        tgt_method = child.func.attr
-                                        # Only connect if tgt_class is a class in the project
-                                        if tgt_class in class_names and tgt_class != src_class:
-                                            method_calls.add((src_class, src_method, tgt_class, tgt_method))
+    for entry in index.values():
+        for cls in entry['classes']:
+            classes[cls['name']] = {
+                "bases": cls['bases'],
+                "attrs": set(cls['attrs']),
+                "methods": {m['name'] for m in cls['methods']},
+            }
+    # Calls are resolved against every class in the project, not just the
+    # ones parsed before the calling file
+    method_calls = call_resolver.resolve_calls(index)
     return classes, method_calls
 
 def generate_mermaid_class_diagram(classes, method_calls, project_name, direction="TD"):
@@ -94,8 +51,8 @@ def generate_mermaid_class_diagram(classes, method_calls, project_name, directio
         for base in cinfo['bases']:
             if base in classes:
                 diagram.append(f"{base} <|-- {cname}")
-    # Method call arrows between classes
-    for src_class, src_method, tgt_class, tgt_method in method_calls:
+    # Method call arrows between classes (sorted so identical input gives identical output)
+    for src_class, src_method, tgt_class, tgt_method in sorted(method_calls):
         label = f"{src_class} : {src_method}() --> {tgt_class} : {tgt_method}()"
         diagram.append(label)
     # Connect isolated classes to PROJECT
@@ -112,57 +69,77 @@ def generate_mermaid_class_diagram(classes, method_calls, project_name, directio
     diagram.append(f"class {project_name}")
     return "\n".join(diagram)
 
-def generate_mermaid_from_repo(git_url, max_lines=20):
-    temp_dir = clone_repo(git_url)
-    try:
-        py_files = find_python_files(temp_dir)
-        project_name = os.path.basename(os.path.normpath(temp_dir))
-        classes, method_calls = extract_classes_and_calls(py_files)
+def generate_mermaid_from_repo(git_url, clone_mode=None, lod="auto", package=None, page=1,
+                               page_size=diagram_engine.DEFAULT_PAGE_SIZE):
+    """Class/call diagram for a repo, one page at a chosen level of detail.
+
+    The complete diagram and the class model behind it are kept in
+    diagram_store; further pages, packages and detail levels are rendered
+    from the model via /diagram/{model_id} without checking the repo out again.
+    """
+    if lod not in diagram_engine.LODS:
+        raise ValueError(f"Unknown level of detail: {lod}")
+    with workspace.allocate("mermaid") as ws:
+        temp_dir = clone_repo(git_url, ws, clone_mode)
+        index = symbol_index.build_index(temp_dir, blob_shas=repo_cache.blob_shas(temp_dir))
+        project_name = project_name_for(git_url)
+        classes, method_calls = extract_classes_and_calls(index)
+        if not classes:
+            return {"mermaid_code": "No classes found in any source file. Diagram will be empty.", "diagram_id": None}
+        commit = repo_cache.head_sha(temp_dir)
+
+    store = diagram_store.get_store()
+    with telemetry.span("diagram", kind="classes", classes=len(classes)):
         mermaid_code = generate_mermaid_class_diagram(classes, method_calls, project_name, direction="TD")
-        if not mermaid_code.strip():
-            return "No classes found in any Python file. Diagram will be empty."
-        
-        # Save the full Mermaid code to diagram.mmd
-        diagram_path = os.path.join(os.getcwd(), "diagram.mmd")
-        with open(diagram_path, "w", encoding="utf-8") as f:
-            f.write(mermaid_code)
-        
-        # Limit the number of lines for the image if too large
-        lines = mermaid_code.splitlines()
-        if len(lines) > max_lines:
-            limited_code = '\n'.join(lines[:max_lines])
-            limited_code += '\n%% Diagram truncated. View full code in diagram.mmd.'
-            return limited_code
-        return mermaid_code
-    finally:
-        try:
-            shutil.rmtree(temp_dir)
-        except Exception as e:
-            print(f"Warning: Could not delete temp directory: {e}")
+        model = diagram_engine.build_model(index, method_calls, project_name)
+        result = diagram_engine.render(model, lod, package, page, page_size)
+    did = store.put(git_url, commit, "classes", mermaid_code)
+    model_id = store.put(git_url, commit, "model", json.dumps(model, separators=(",", ":")), latest=False)
+    result.update(diagram_id=did, model_id=model_id)
+    return result
 
-def generate_simplified_mermaid_from_repo(git_url):
-    temp_dir = clone_repo(git_url)
-    try:
-        py_files = find_python_files(temp_dir)
-        print(f"Found {len(py_files)} Python files in the repository.")
-        project_name = os.path.basename(os.path.normpath(temp_dir))
-        classes, _ = extract_classes_and_calls(py_files)  # Ignore method calls for simplicity
+def generate_simplified_mermaid_from_repo(git_url, clone_mode=None):
+    """Classes, attributes and inheritance only; returns {"mermaid_code", "diagram_id"}."""
+    with workspace.allocate("mermaid") as ws:
+        temp_dir = clone_repo(git_url, ws, clone_mode)
+        index = symbol_index.build_index(temp_dir, blob_shas=repo_cache.blob_shas(temp_dir))
+        print(f"Indexed {len(index)} source files in the repository.")
+        classes, _ = extract_classes_and_calls(index)  # Ignore method calls for simplicity
         print(f"Extracted {len(classes)} classes from the repository.")
-        diagram = ["classDiagram"]
-        for cname, cinfo in classes.items():
-            diagram.append(f"class {cname} {{")
-            for attr in sorted(cinfo['attrs']):
-                diagram.append(f"  +{attr}")
-            diagram.append("}")
-        for cname, cinfo in classes.items():
-            for base in cinfo['bases']:
-                if base in classes:
-                    diagram.append(f"{base} <|-- {cname}")
-        print("Generated simplified Mermaid diagram:")
-        print("\n".join(diagram))
-        return "\n".join(diagram)
-    finally:
-        try:
-            shutil.rmtree(temp_dir)
-        except Exception as e:
-            print(f"Warning: Could not delete temp directory: {e}")
+        with telemetry.span("diagram", kind="simplified", classes=len(classes)):
+            diagram = ["classDiagram"]
+            for cname, cinfo in classes.items():
+                diagram.append(f"class {cname} {{")
+                for attr in sorted(cinfo['attrs']):
+                    diagram.append(f"  +{attr}")
+                diagram.append("}")
+            for cname, cinfo in classes.items():
+                for base in cinfo['bases']:
+                    if base in classes:
+                        diagram.append(f"{base} <|-- {cname}")
+            mermaid_code = "\n".join(diagram)
+        print(f"Generated simplified Mermaid diagram ({len(diagram)} lines)")
+        did = diagram_store.get_store().put(git_url, repo_cache.head_sha(temp_dir), "simplified", mermaid_code)
+        return {"mermaid_code": mermaid_code, "diagram_id": did}
+
+def generate_module_graph_from_repo(git_url, clone_mode=None, include_stdlib=False,
+                                    include_third_party=True, depth=None):
+    """Module dependency graph with cycles grouped and transitive edges removed."""
+    with workspace.allocate("mermaid") as ws:
+        temp_dir = clone_repo(git_url, ws, clone_mode)
+        index = symbol_index.build_index(temp_dir, blob_shas=repo_cache.blob_shas(temp_dir))
+        commit = repo_cache.head_sha(temp_dir)
+    with telemetry.span("diagram", kind="modules"):
+        graph = module_graph.build_graph(index, include_stdlib, include_third_party, depth)
+        mermaid_code = module_graph.render_mermaid(graph)
+    print(f"Module graph: {len(graph['nodes'])} nodes, {len(graph['reduced'])} of "
+          f"{graph['total_edges']} edges kept, {len(graph['cycles'])} cycles")
+    kind = f"modules:{int(include_stdlib)}:{int(include_third_party)}:{depth or 0}"
+    did = diagram_store.get_store().put(git_url, commit, kind, mermaid_code)
+    return {
+        "mermaid_code": mermaid_code,
+        "diagram_id": did,
+        "modules": sum(1 for kind in graph["nodes"].values() if kind == "module"),
+        "edges": len(graph["reduced"]),
+        "cycles": graph["cycles"],
+    }
@@ -0,0 +1,233 @@
+import sys
+import json
+
+# Compact in-memory form of symbol index entries. Each file, class, method,
+# function, property and import is a __slots__ record instead of a dict, its
+# lists are tuples, and every name in it is interned, so the thousands of
+# repeats of "self", "__init__", "str" or "os" across a large repo share one
+# string. Records are read-only mappings (entry['classes'], cls.get('bases')),
+# so code written against the dict entries works on them unchanged.
+#
+# On disk and between processes an entry is a "row": nested JSON arrays in
+# __slots__ order, which json encodes and decodes far faster than the same
+# data as objects and which stores no key names.
+intern = sys.intern
+
+
+def _names(values):
+    return tuple(intern(v) for v in values)
+
+
+def _opt(value):
+    return intern(value) if value is not None else None
+
+
+class _Record:
+    """Read-only mapping view over __slots__."""
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def keys(self):
+        return self.__slots__
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.row() == other.row()
+
+    def __repr__(self):
+        return f"{type(self).__name__}{self.row()!r}"
+
+    def to_dict(self):
+        return {name: _plain(getattr(self, name)) for name in self.__slots__}
+
+
+def _plain(value):
+    if isinstance(value, _Record):
+        return value.to_dict()
+    if isinstance(value, tuple):
+        return [_plain(v) for v in value]
+    return value
+
+
+class Method(_Record):
+    __slots__ = ("name", "args", "ret", "private")
+
+    def __init__(self, name, args, ret, private):
+        self.name = intern(name)
+        self.args = _names(args)
+        self.ret = intern(ret)
+        self.private = private
+
+    def row(self):
+        return (self.name, self.args, self.ret, self.private)
+
+
+class Function(_Record):
+    __slots__ = ("name", "args", "ret")
+
+    def __init__(self, name, args, ret):
+        self.name = intern(name)
+        self.args = _names(args)
+        self.ret = intern(ret)
+
+    def row(self):
+        return (self.name, self.args, self.ret)
+
+
+class Property(_Record):
+    __slots__ = ("name", "private")
+
+    def __init__(self, name, private):
+        self.name = intern(name)
+        self.private = private
+
+    def row(self):
+        return (self.name, self.private)
+
+
+class Import(_Record):
+    __slots__ = ("module", "name", "alias", "level")
+
+    def __init__(self, module, name, alias, level):
+        self.module = intern(module)
+        self.name = _opt(name)
+        self.alias = _opt(alias)
+        self.level = level
+
+    def row(self):
+        return (self.module, self.name, self.alias, self.level)
+
+
+class ClassInfo(_Record):
+    __slots__ = ("name", "top_level", "bases", "methods", "properties", "attrs")
+
+    def __init__(self, name, top_level, bases, methods, properties, attrs):
+        self.name = intern(name)
+        self.top_level = top_level
+        self.bases = _names(bases)
+        self.methods = methods
+        self.properties = properties
+        self.attrs = _names(attrs)
+
+    def row(self):
+        return (self.name, self.top_level, self.bases, tuple(m.row() for m in self.methods),
+                tuple(p.row() for p in self.properties), self.attrs)
+
+    @classmethod
+    def from_row(cls, row):
+        name, top_level, bases, methods, properties, attrs = row
+        return cls(name, top_level, bases, tuple(Method(*m) for m in methods),
+                   tuple(Property(*p) for p in properties), attrs)
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d['name'], d['top_level'], d['bases'],
+                   tuple(Method(m['name'], m['args'], m['ret'], m['private']) for m in d['methods']),
+                   tuple(Property(p['name'], p['private']) for p in d['properties']), d['attrs'])
+
+
+class FileEntry(_Record):
+    """One source file's symbol index entry."""
+    __slots__ = ("path", "module", "classes", "functions", "imports", "calls", "doc", "assigns", "logic_lines")
+
+    def __init__(self, path, module, classes, functions, imports, calls, doc="", assigns=(), logic_lines=None):
+        self.path = path
+        self.module = intern(module)
+        self.classes = classes
+        self.functions = functions
+        self.imports = imports
+        # (class, method, receiver, attribute) per cross-object call
+        self.calls = calls
+        self.doc = doc
+        self.assigns = _names(assigns)
+        self.logic_lines = logic_lines
+
+    def row(self):
+        return (self.path, self.module, tuple(c.row() for c in self.classes),
+                tuple(f.row() for f in self.functions), tuple(i.row() for i in self.imports),
+                self.calls, self.doc, self.assigns, self.logic_lines)
+
+    @classmethod
+    def from_row(cls, row, path=None, module=None):
+        """Entry from a row; path and module, when given, replace the stored ones."""
+        (row_path, row_module, classes, functions, imports, calls), rest = row[:6], row[6:]
+        return cls(path if path is not None else row_path, module if module is not None else row_module,
+                   tuple(ClassInfo.from_row(c) for c in classes),
+                   tuple(Function(*f) for f in functions),
+                   tuple(Import(*i) for i in imports),
+                   tuple(tuple(intern(part) for part in call) for call in calls), *rest)
+
+    @classmethod
+    def from_dict(cls, d, path=None, module=None):
+        return cls(path if path is not None else d['path'], module if module is not None else d['module'],
+                   tuple(ClassInfo.from_dict(c) for c in d['classes']),
+                   tuple(Function(f['name'], f['args'], f['ret']) for f in d['functions']),
+                   tuple(Import(i['module'], i['name'], i['alias'], i['level']) for i in d['imports']),
+                   tuple(tuple(intern(part) for part in call) for call in d['calls']),
+                   d.get('doc', ""), d.get('assigns', ()), d.get('logic_lines'))
+
+
+def load_entry(data, path=None, module=None):
+    """FileEntry from a row, a dict entry (older caches and state files) or a FileEntry."""
+    if isinstance(data, FileEntry):
+        return data
+    if isinstance(data, dict):
+        return FileEntry.from_dict(data, path, module)
+    return FileEntry.from_row(data, path, module)
+
+
+def index_rows(index):
+    """{relative path: row} for a whole index, ready for json.dumps."""
+    return {rel_path: entry.row() for rel_path, entry in index.items()}
+
+
+def load_index(data):
+    """Index from index_rows output (or the older dict entries)."""
+    return {rel_path: load_entry(value) for rel_path, value in data.items()}
+
+
+def _default(value):
+    if isinstance(value, _Record):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(data):
+    """UTF-8 JSON for plain data (records become objects) in a single C-encoder pass."""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def deep_size(value, seen=None):
+    """Approximate bytes held by value and everything it references, counting shared objects once."""
+    seen = set() if seen is None else seen
+    stack = [value]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif isinstance(obj, _Record):
+            stack.extend(getattr(obj, name) for name in obj.__slots__)
+    return total
@@ -0,0 +1,210 @@
+import sys
+import call_resolver
+
+# Module dependency graph over a symbol index. Imports are resolved to files
+# in the repo; anything else is classified as stdlib or third-party and
+# either hidden or collapsed to one node per top-level package. Cycles are
+# found with Tarjan's SCC algorithm and the condensed DAG is transitively
+# reduced, so only edges that are not implied by a longer path remain.
+STDLIB_MODULES = frozenset(getattr(sys, "stdlib_module_names", sys.builtin_module_names))
+
+
+def _module_table(index):
+    return {entry['module']: rel_path for rel_path, entry in index.items() if entry['module']}
+
+
+def _candidates(entry, imp):
+    """Absolute module names an import may refer to, most specific first."""
+    if imp['level']:
+        base = call_resolver.resolve_relative(entry, imp['module'], imp['level'])
+    else:
+        base = imp['module']
+    names = []
+    if imp['name'] and imp['name'] != "*":
+        names.append(f"{base}.{imp['name']}" if base else imp['name'])
+    if base:
+        names.append(base)
+    return names
+
+
+def _resolve_in_repo(name, entry, modules):
+    """Repo file for an absolute module name, trying the importer's source roots.
+
+    Scripts and src/ layouts import their siblings without the directory
+    prefix, so the prefixes of the importing module are tried deepest first.
+    """
+    prefixes = entry['module'].split(".")[:-1]
+    for depth in range(len(prefixes), -1, -1):
+        root = ".".join(prefixes[:depth])
+        qualified = f"{root}.{name}" if root else name
+        # `import a.b.c` depends on the deepest of a.b.c, a.b, a that exists
+        parts = qualified.split(".")
+        for end in range(len(parts), depth, -1):
+            path = modules.get(".".join(parts[:end]))
+            if path:
+                return path
+    return None
+
+
+def file_dependencies(index):
+    """rel_path -> (set of repo rel_paths, set of external top-level modules)."""
+    modules = _module_table(index)
+    deps = {}
+    for rel_path, entry in index.items():
+        internal, external = set(), set()
+        for imp in entry['imports']:
+            names = _candidates(entry, imp)
+            target = None
+            for name in names:
+                target = _resolve_in_repo(name, entry, modules)
+                if target:
+                    break
+            if target:
+                if target != rel_path:
+                    internal.add(target)
+            elif names and not imp['level']:
+                external.add(names[-1].split(".")[0])
+        deps[rel_path] = (internal, external)
+    return deps
+
+
+def strongly_connected_components(nodes, edges):
+    """Tarjan's algorithm, iterative; components come out sinks first."""
+    index_of, low, on_stack = {}, {}, set()
+    stack, components = [], []
+    counter = 0
+    for root in nodes:
+        if root in index_of:
+            continue
+        work = [(root, iter(edges.get(root, ())))]
+        index_of[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, successors = work[-1]
+            advanced = False
+            for succ in successors:
+                if succ not in index_of:
+                    index_of[succ] = low[succ] = counter
+                    counter += 1
+                    stack.append(succ)
+                    on_stack.add(succ)
+                    work.append((succ, iter(edges.get(succ, ()))))
+                    advanced = True
+                    break
+                if succ in on_stack:
+                    low[node] = min(low[node], index_of[succ])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(sorted(component))
+    return components
+
+
+def transitive_reduction(components, edges):
+    """Edges between components that are not implied by another path.
+
+    components must be in reverse topological order, as Tarjan returns them.
+    Reachability is kept as one integer bitset per component.
+    """
+    comp_of = {node: i for i, comp in enumerate(components) for node in comp}
+    succ = [set() for _ in components]
+    for src, targets in edges.items():
+        for tgt in targets:
+            if comp_of[src] != comp_of[tgt]:
+                succ[comp_of[src]].add(comp_of[tgt])
+    reach = [0] * len(components)
+    reduced = set()
+    for c, targets in enumerate(succ):
+        covered = 0
+        for t in targets:
+            covered |= reach[t]
+        for t in targets:
+            if not covered >> t & 1:
+                reduced.add((c, t))
+            covered |= 1 << t
+        reach[c] = covered
+    return comp_of, reduced
+
+
+def build_graph(index, include_stdlib=False, include_third_party=True, depth=None):
+    """Nodes, reduced edges and cycles of the module dependency graph.
+
+    depth collapses repo modules to their first depth name components;
+    external imports become one node per top-level package.
+    """
+    def repo_node(rel_path):
+        module = index[rel_path]['module'] or rel_path
+        return ".".join(module.split(".")[:depth]) if depth else module
+
+    kinds = {}
+    edges = {}
+    for rel_path, (internal, external) in file_dependencies(index).items():
+        src = repo_node(rel_path)
+        kinds[src] = "module"
+        targets = edges.setdefault(src, set())
+        for path in internal:
+            targets.add(repo_node(path))
+        for top in external:
+            kind = "stdlib" if top in STDLIB_MODULES else "third-party"
+            if (kind == "stdlib" and include_stdlib) or (kind == "third-party" and include_third_party):
+                kinds.setdefault(top, kind)
+                targets.add(top)
+        targets.discard(src)
+
+    nodes = sorted(kinds)
+    components = strongly_connected_components(nodes, {n: sorted(t) for n, t in edges.items()})
+    comp_of, reduced = transitive_reduction(components, edges)
+    total_edges = sum(len(t) for t in edges.values())
+    return {
+        "nodes": {n: kinds[n] for n in nodes},
+        "components": components,
+        "comp_of": comp_of,
+        "reduced": reduced,
+        "edges": edges,
+        "cycles": [comp for comp in components if len(comp) > 1],
+        "total_edges": total_edges,
+    }
+
+
+def render_mermaid(graph, direction="LR"):
+    """Compact flowchart: cycles as subgraphs, external packages as rounded nodes."""
+    ids = {name: f"m{i}" for i, name in enumerate(graph["nodes"])}
+    comp_ids = {}
+    lines = [f"graph {direction}"]
+
+    def node_line(name, indent="    "):
+        if graph["nodes"][name] == "module":
+            return f'{indent}{ids[name]}["{name}"]'
+        return f'{indent}{ids[name]}(["{name}"])'
+
+    for i, comp in enumerate(graph["components"]):
+        if len(comp) == 1:
+            comp_ids[i] = ids[comp[0]]
+            lines.append(node_line(comp[0]))
+        else:
+            comp_ids[i] = f"cycle{len(comp_ids)}"
+            lines.append(f'    subgraph {comp_ids[i]}["cycle of {len(comp)} modules"]')
+            lines.extend(node_line(name, "        ") for name in comp)
+            lines.append("    end")
+    for comp in graph["cycles"]:
+        members = set(comp)
+        for src in comp:
+            for tgt in sorted(graph["edges"].get(src, ())):
+                if tgt in members:
+                    lines.append(f"    {ids[src]} --> {ids[tgt]}")
+    for src, tgt in sorted(graph["reduced"]):
+        lines.append(f"    {comp_ids[src]} --> {comp_ids[tgt]}")
+    return "\n".join(lines)
@@ -0,0 +1,96 @@
+import os
+import json
+import zlib
+import sqlite3
+import hashlib
+import tempfile
+import threading
+import telemetry
+
+# Symbol-index entries, as metadata_model rows, keyed by git blob SHA, so a file's content is parsed
+# once no matter which commit, branch or fork it shows up in.
+CACHE_PATH = os.getenv("DOCGEN_PARSE_CACHE_PATH", os.path.join(tempfile.gettempdir(), "docgen_parse_cache.sqlite3"))
+
+# Entries stored for files that were empty or failed to parse
+_NO_ENTRY = b""
+
+
+def git_blob_sha(data):
+    """SHA git would assign to a blob with these bytes."""
+    h = hashlib.sha1(b"blob %d\0" % len(data))
+    h.update(data)
+    return h.hexdigest()
+
+
+def _encode(entry):
+    if entry is None:
+        return _NO_ENTRY
+    # Path-dependent fields are re-attached on load; the content is what's cached.
+    row = ("", "") + entry.row()[2:]
+    return zlib.compress(json.dumps(row, separators=(",", ":")).encode("utf-8"))
+
+
+def _decode(data):
+    """The stored metadata_model row (a dict for entries cached by older versions)."""
+    if data == _NO_ENTRY:
+        return None
+    return json.loads(zlib.decompress(data))
+
+
+class ParseCache:
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, data BLOB NOT NULL)")
+        self._conn.commit()
+
+    def get_many(self, keys):
+        """Map of key -> stored row (None for a file with no entry) for every key present.
+
+        A key that is missing from the result was not cached; one that maps to
+        None was cached as unparsable.
+        """
+        found = {}
+        keys = list(keys)
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                for key, data in self._conn.execute(
+                        f"SELECT key, data FROM entries WHERE key IN ({placeholders})", batch):
+                    found[key] = _decode(data)
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        telemetry.CACHE_REQUESTS.inc(len(found), cache="parse", result="hit")
+        telemetry.CACHE_REQUESTS.inc(len(keys) - len(found), cache="parse", result="miss")
+        return found
+
+    def put_many(self, items):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?)", [(key, _encode(entry)) for key, entry in items]
+            )
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM entries").fetchone()
+            return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+
+_cache = None
+_cache_guard = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    with _cache_guard:
+        if _cache is None:
+            _cache = ParseCache()
+        return _cache
@@ -0,0 +1,401 @@
+import os
+import re
+import stat
+import json
+import time
+import shutil
+import base64
+import hashlib
+import tempfile
+import threading
+from urllib.parse import urlparse
+import telemetry
+from clone_strategy import CloneStrategy
+
+# Bare mirrors live here between requests; every endpoint checks out from them
+# instead of cloning the remote again.
+CACHE_DIR = os.getenv("DOCGEN_REPO_CACHE_DIR", os.path.join(tempfile.gettempdir(), "docgen_repo_cache"))
+MAX_REPOS = int(os.getenv("DOCGEN_REPO_CACHE_MAX_REPOS", "50"))
+MAX_BYTES = int(os.getenv("DOCGEN_REPO_CACHE_MAX_BYTES", str(10 * 1024 ** 3)))
+# Mirrors fetched more recently than this are reused as-is, so hitting the docs
+# and both diagram endpoints for one repo costs a single network round trip.
+FETCH_TTL = float(os.getenv("DOCGEN_REPO_CACHE_FETCH_TTL", "60"))
+
+STATE_FILE = "docgen-cache.json"
+
+
+def handle_remove_readonly(func, path, exc):
+    try:
+        os.chmod(path, stat.S_IWRITE)
+        func(path)
+    except PermissionError:
+        if path.endswith("index.lock"):
+            os.remove(path)
+
+
+# scp-style SSH remotes: [user@]host:path, e.g. git@github.com:owner/repo.git
+_SCP_URL = re.compile(r"^(?:[^@/:]+@)?(?P<host>[^@/:]+):(?P<path>(?!//).*)$")
+
+
+def normalize_url(repo_url):
+    """Canonical form of a repo URL used as the cache key.
+
+    Credentials are dropped, so the same repo maps to one mirror whoever asks
+    for it; clones and fetches use remote_url, which keeps them.
+    """
+    repo_url = repo_url.strip()
+    if os.path.exists(repo_url):
+        return os.path.abspath(repo_url)
+    scp = _SCP_URL.match(repo_url) if "://" not in repo_url else None
+    if scp:
+        repo_url = f"ssh://{scp.group('host')}/{scp.group('path').lstrip('/')}"
+    parsed = urlparse(repo_url)
+    if not parsed.scheme:
+        parsed = urlparse("https://" + repo_url)
+    host = (parsed.hostname or "").lower()
+    if parsed.port:
+        host = f"{host}:{parsed.port}"
+    path = parsed.path.rstrip("/")
+    if path.endswith(".git"):
+        path = path[:-4]
+    return f"{parsed.scheme.lower()}://{host}{path}"
+
+
+def remote_url(repo_url):
+    """URL to clone and fetch from: the one given, credentials and all."""
+    repo_url = repo_url.strip()
+    if os.path.exists(repo_url):
+        return os.path.abspath(repo_url)
+    if "://" not in repo_url and not _SCP_URL.match(repo_url):
+        return "https://" + repo_url
+    return repo_url
+
+
+def auth_env():
+    """Git environment carrying GITHUB_TOKEN as an HTTP header.
+
+    The token is passed per command instead of being embedded in the remote URL,
+    so it never lands in the mirror config, and lazy blob fetches from partial
+    clones authenticate the same way as the initial clone.
+    """
+    github_token = os.getenv("GITHUB_TOKEN")
+    if not github_token:
+        return {}
+    basic = base64.b64encode(f"x-access-token:{github_token}".encode("utf-8")).decode("ascii")
+    return {
+        "GIT_CONFIG_COUNT": "1",
+        "GIT_CONFIG_KEY_0": "http.extraHeader",
+        "GIT_CONFIG_VALUE_0": f"Authorization: Basic {basic}",
+    }
+
+
+def _gitpython():
+    # Imported on first use: GitPython costs ~80ms of startup in every
+    # process, including ones that never touch a repository.
+    import git
+    return git
+
+
+def _git(path=None):
+    # Plain Git rather than Repo: once sparse worktrees enable worktreeConfig,
+    # core.bare moves to config.worktree and Repo no longer detects the mirror as bare.
+    git = _gitpython().Git(path)
+    git.update_environment(**auth_env())
+    return git
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class RepoCache:
+    """LRU cache of bare mirrors handing out detached worktrees.
+
+    Locks are per repo and per process; concurrent requests for different
+    repos never wait on each other.
+    """
+
+    def __init__(self, root=CACHE_DIR, max_repos=MAX_REPOS, max_bytes=MAX_BYTES, fetch_ttl=FETCH_TTL):
+        self.root = root
+        self.max_repos = max_repos
+        self.max_bytes = max_bytes
+        self.fetch_ttl = fetch_ttl
+        self._guard = threading.Lock()
+        self._locks = {}
+        self._active = {}
+        self._checkouts = {}
+        os.makedirs(self.root, exist_ok=True)
+
+    def _key(self, url):
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", url.rsplit("/", 1)[-1])[:40]
+        return f"{name}-{hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]}"
+
+    def _lock(self, key):
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _read_state(self, mirror):
+        try:
+            with open(os.path.join(mirror, STATE_FILE), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_state(self, mirror, state):
+        with open(os.path.join(mirror, STATE_FILE), "w", encoding="utf-8") as f:
+            json.dump(state, f)
+
+    def ensure_mirror(self, repo_url, strategy=None):
+        """Clone or incrementally fetch the mirror; returns (mirror path, HEAD sha)."""
+        strategy = strategy or CloneStrategy()
+        url = normalize_url(repo_url)
+        remote = remote_url(repo_url)
+        key = self._key(url)
+        mirror = os.path.join(self.root, key)
+        with self._lock(key):
+            state = self._read_state(mirror)
+            now = time.time()
+            cached = os.path.isdir(mirror) and bool(state)
+            telemetry.CACHE_REQUESTS.inc(cache="repo", result="hit" if cached else "miss")
+            if not cached:
+                if os.path.exists(mirror):
+                    shutil.rmtree(mirror, onerror=handle_remove_readonly)
+                print(f"🔄 Mirroring repository: {url} ({strategy.mode})")
+                _gitpython().Repo.clone_from(remote, mirror, env=auth_env(), mirror=True, **strategy.clone_kwargs())
+                git = _git(mirror)
+                state = {"url": url, "mode": strategy.mode, "filter": strategy.blob_filter, "fetched_at": now}
+            else:
+                git = _git(mirror)
+                # The mirror is shared by every URL form of the repo; fetch (and
+                # lazily fetch blobs) with this caller's URL and credentials
+                git.remote("set-url", "origin", remote)
+                shallow = os.path.exists(os.path.join(mirror, "shallow"))
+                depth_args = [f"--depth={strategy.depth}"] if shallow else []
+                # Sized checkouts tell oversized files apart by which blobs are
+                # missing, which only holds if the tip came with their filter
+                partial = _partial_filter(git)
+                sized = strategy.skip_oversized and partial
+                refilter = sized and state.get("filter") != strategy.blob_filter
+                if shallow and not strategy.depth:
+                    # A full-history request against a shallow mirror: deepen it once.
+                    print(f"🔄 Unshallowing mirror: {url}")
+                    git.fetch("--prune", "--unshallow", "origin")
+                    state["fetched_at"] = now
+                    state["mode"] = strategy.mode
+                    state["filter"] = partial
+                    state.pop("size", None)
+                elif refilter:
+                    print(f"🔄 Refetching mirror with {strategy.blob_filter}: {url}")
+                    git.fetch("--prune", "--refetch", f"--filter={strategy.blob_filter}", *depth_args, "origin")
+                    state["fetched_at"] = now
+                    state["filter"] = strategy.blob_filter
+                    state.pop("size", None)
+                elif now - state.get("fetched_at", 0) > self.fetch_ttl:
+                    print(f"🔄 Fetching updates: {url}")
+                    if sized:
+                        git.fetch("--prune", f"--filter={strategy.blob_filter}", *depth_args, "origin")
+                        state["filter"] = strategy.blob_filter
+                    else:
+                        before = git.rev_parse("HEAD")
+                        git.fetch("--prune", *depth_args, "origin")
+                        if git.rev_parse("HEAD") != before:
+                            state["filter"] = partial
+                    state["fetched_at"] = now
+                    state.pop("size", None)
+            sha = git.rev_parse("HEAD")
+            state["last_used"] = now
+            if "size" not in state:
+                state["size"] = _dir_size(mirror)
+            self._write_state(mirror, state)
+        self.evict(keep=key)
+        return mirror, sha
+
+    def checkout(self, repo_url, dest=None, strategy=None):
+        """Materialize HEAD of repo_url as a worktree at dest (a temp dir by default).
+
+        Strategies with sparse patterns only check out matching files; on a
+        partial mirror that is also all the blobs that get downloaded.
+        """
+        strategy = strategy or CloneStrategy()
+        mirror, sha = self.ensure_mirror(repo_url, strategy)
+        key = os.path.basename(mirror)
+        if dest is None:
+            dest = tempfile.mkdtemp(prefix="docgen_checkout_")
+        elif os.path.exists(dest) and os.listdir(dest):
+            raise FileExistsError(f"Checkout destination is not empty: {dest}")
+        # git runs inside the mirror, so relative destinations must be resolved here
+        dest = os.path.abspath(dest)
+        with self._lock(key):
+            if strategy.sparse_patterns:
+                patterns = list(strategy.sparse_patterns)
+                if strategy.skip_oversized:
+                    oversized = oversized_paths(mirror, sha, strategy.blob_filter)
+                    patterns += ["!/" + _escape_pattern(p) for p in oversized]
+                _git(mirror).worktree("add", "--no-checkout", "--detach", dest, sha)
+                try:
+                    worktree = _git(dest)
+                    with tempfile.TemporaryFile("w+", encoding="utf-8") as f:
+                        # On stdin, so any number of excluded paths fits
+                        f.write("\n".join(patterns) + "\n")
+                        f.seek(0)
+                        worktree.execute(["git", "sparse-checkout", "set", "--no-cone", "--stdin"], istream=f)
+                    worktree.read_tree("-mu", "HEAD")
+                except Exception:
+                    _git(mirror).worktree("remove", "--force", dest)
+                    raise
+            else:
+                _git(mirror).worktree("add", "--detach", dest, sha)
+            with self._guard:
+                self._active[key] = self._active.get(key, 0) + 1
+                self._checkouts[os.path.abspath(dest)] = key
+        return dest
+
+    def release(self, dest):
+        """Remove a worktree handed out by checkout()."""
+        dest = os.path.abspath(dest)
+        with self._guard:
+            key = self._checkouts.pop(dest, None)
+        if key is None:
+            shutil.rmtree(dest, onerror=handle_remove_readonly)
+            return
+        mirror = os.path.join(self.root, key)
+        with self._lock(key):
+            try:
+                _git(mirror).worktree("remove", "--force", dest)
+            except Exception:
+                if os.path.exists(dest):
+                    shutil.rmtree(dest, onerror=handle_remove_readonly)
+                _git(mirror).worktree("prune")
+            with self._guard:
+                self._active[key] -= 1
+                if not self._active[key]:
+                    del self._active[key]
+
+    def evict(self, keep=None):
+        """Drop least recently used mirrors until count and size budgets hold."""
+        entries = []
+        for key in os.listdir(self.root):
+            mirror = os.path.join(self.root, key)
+            if os.path.isdir(mirror):
+                state = self._read_state(mirror)
+                entries.append((state.get("last_used", 0), state.get("size", 0), key))
+        entries.sort()
+        count = len(entries)
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if count <= self.max_repos and total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            lock = self._lock(key)
+            if not lock.acquire(blocking=False):
+                continue
+            try:
+                with self._guard:
+                    if self._active.get(key):
+                        continue
+                print(f"🧹 Evicting cached mirror: {key}")
+                shutil.rmtree(os.path.join(self.root, key), onerror=handle_remove_readonly)
+                count -= 1
+                total -= size
+            finally:
+                lock.release()
+
+
+def _partial_filter(git):
+    """Filter the mirror was cloned with, or None for a complete mirror."""
+    try:
+        return git.config("--get", "remote.origin.partialclonefilter") or None
+    except _gitpython().GitCommandError:
+        return None
+
+
+def oversized_paths(mirror, sha, blob_filter):
+    """Paths at commit sha whose blobs blob_filter (blob:limit=N) leaves out.
+
+    Blobs the mirror has are measured by rev-list's own filter, which also
+    catches large blobs fetched lazily for an earlier checkout; blobs it lacks
+    were left on the server by that filter when ensure_mirror fetched the tip
+    with it. Nothing is downloaded, whereas ls-tree -l would fetch every
+    missing blob to report its size.
+    """
+    git = _git(mirror)
+    listing = git.rev_list("--objects", "--missing=print", "--no-walk", f"--filter={blob_filter}",
+                           "--filter-print-omitted", sha)
+    missing = {line[1:] for line in listing.splitlines() if line[:1] in ("?", "~")}
+    if not missing:
+        return []
+    paths = []
+    for entry in git.ls_tree("-r", "-z", sha).split("\0"):
+        if entry:
+            info, path = entry.split("\t", 1)
+            if info.split()[2] in missing:
+                paths.append(path)
+    return paths
+
+
+def _escape_pattern(path):
+    """A path as a literal gitignore-style pattern."""
+    return re.sub(r"([\\*?\[])", r"\\\1", path)
+
+
+def remote_head(repo_url):
+    """HEAD commit of the remote, resolved without touching the mirror."""
+    output = _git().ls_remote(remote_url(repo_url), "HEAD")
+    return output.split()[0] if output else None
+
+
+def head_sha(path):
+    """Commit checked out in a worktree."""
+    return _gitpython().Git(path).rev_parse("HEAD")
+
+
+def blob_shas(path):
+    """Map of relative file path (os separators) to git blob SHA for a worktree.
+
+    Read from the index, so it covers files outside a sparse checkout too and
+    costs no file reads.
+    """
+    shas = {}
+    for entry in _gitpython().Git(path).ls_files("-s", "-z").split("\0"):
+        if not entry:
+            continue
+        info, rel_path = entry.split("\t", 1)
+        shas[os.path.normpath(rel_path)] = info.split()[1]
+    return shas
+
+
+def list_files(path):
+    """Relative paths (os separators) of tracked files plus untracked ones .gitignore keeps.
+
+    Tracked files outside a sparse checkout are listed too; they are not on disk.
+    """
+    output = _gitpython().Git(path).ls_files("-z", "--cached", "--others", "--exclude-standard")
+    return [os.path.normpath(p) for p in output.split("\0") if p]
+
+
+_cache = None
+_cache_guard = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    with _cache_guard:
+        if _cache is None:
+            _cache = RepoCache()
+        return _cache
+
+
+def checkout(repo_url, dest=None, strategy=None):
+    return get_cache().checkout(repo_url, dest, strategy)
+
+
+def release(dest):
+    get_cache().release(dest)
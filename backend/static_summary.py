@@ -0,0 +1,292 @@
+import os
+import json
+import threading
+import batching
+import telemetry
+from call_resolver import PACKAGE_FILES
+
+# Deterministic summaries for files the LLM has nothing to explain in:
+# package manifests and other JSON, package initializers that only re-export,
+# and modules that only declare constants, classes or signatures. They are
+# built from the file's symbol index entry (the same data extract_metadata
+# returns) or from its JSON keys, in microseconds and without a model call.
+#
+# The router sends a code file to the static tier when its executable logic
+# is at most DOCGEN_STATIC_MAX_LOGIC_LINES lines, or at most
+# DOCGEN_STATIC_MAX_LOGIC_RATIO of its lines; anything with real logic goes to
+# the LLM. Files whose JSON does not parse, or with no index entry, go there too.
+ENABLED = os.getenv("DOCGEN_STATIC_SUMMARIES", "1") not in ("0", "false", "no")
+MAX_LOGIC_LINES = int(os.getenv("DOCGEN_STATIC_MAX_LOGIC_LINES", "0"))
+MAX_LOGIC_RATIO = float(os.getenv("DOCGEN_STATIC_MAX_LOGIC_RATIO", "0"))
+# Kinds that may be summarized statically (all by default)
+KINDS = ("package_json", "lockfile", "json", "reexports", "constants", "declarations")
+ENABLED_KINDS = frozenset(k.strip() for k in os.getenv("DOCGEN_STATIC_KINDS", ",".join(KINDS)).split(",") if k.strip())
+
+MAX_LISTED = 12
+FOOTER = "_Summarized statically from the file structure; no LLM call was made._"
+
+ROUTES = telemetry.Counter("docgen_summary_routes_total", "Files routed to the static or LLM summary tier",
+                           ["route", "kind"])
+TOKENS_SAVED = telemetry.Counter("docgen_static_tokens_saved_total",
+                                 "Estimated prompt tokens not sent to the LLM thanks to static summaries")
+
+# Well-known JSON files and what they configure
+KNOWN_JSON = {
+    "tsconfig.json": "TypeScript compiler configuration",
+    "jsconfig.json": "JavaScript project configuration for editors and bundlers",
+    ".eslintrc.json": "ESLint configuration",
+    ".prettierrc.json": "Prettier configuration",
+    ".babelrc.json": "Babel configuration",
+    "babel.config.json": "Babel configuration",
+    "manifest.json": "Web app manifest",
+    "vercel.json": "Vercel deployment configuration",
+    "firebase.json": "Firebase project configuration",
+    "composer.json": "Composer (PHP) package manifest",
+    "app.json": "App configuration",
+    "angular.json": "Angular workspace configuration",
+    "lerna.json": "Lerna monorepo configuration",
+    "turbo.json": "Turborepo pipeline configuration",
+    "renovate.json": "Renovate dependency update configuration",
+}
+LOCKFILES = {"package-lock.json", "npm-shrinkwrap.json"}
+
+
+def _names(names, limit=MAX_LISTED):
+    names = list(names)
+    shown = ", ".join(f"`{n}`" for n in names[:limit])
+    if len(names) > limit:
+        shown += f" and {len(names) - limit} more"
+    return shown or "none"
+
+
+def _format(purpose, key, deps, overall):
+    return "\n".join([
+        f"1. Purpose: {purpose}",
+        f"2. Key functions/classes: {key}",
+        f"3. Dependencies: {deps}",
+        f"4. Overall functionality: {overall}",
+        "",
+        FOOTER,
+    ])
+
+
+# ---------- JSON ----------
+
+def _shape(value):
+    """Short description of a JSON value's type and size."""
+    if isinstance(value, dict):
+        return f"object, {len(value)} keys"
+    if isinstance(value, list):
+        return f"list of {len(value)}"
+    if isinstance(value, bool) or value is None:
+        return json.dumps(value)
+    if isinstance(value, (int, float)):
+        return "number"
+    return "string"
+
+
+def _package_json(data):
+    name = data.get("name") or "(unnamed)"
+    version = f" {data['version']}" if isinstance(data.get("version"), str) else ""
+    purpose = f"npm package manifest for `{name}`{version}"
+    if isinstance(data.get("description"), str) and data["description"].strip():
+        purpose += f": {data['description'].strip()}"
+    scripts = data.get("scripts") if isinstance(data.get("scripts"), dict) else {}
+    entries = [f"{key} `{data[key]}`" for key in ("main", "module", "types") if isinstance(data.get(key), str)]
+    if isinstance(data.get("bin"), (str, dict)):
+        entries.append("bin " + (f"`{data['bin']}`" if isinstance(data["bin"], str) else _names(data["bin"])))
+    key = f"scripts {_names(scripts)}"
+    if entries:
+        key += "; entry points " + ", ".join(entries)
+    groups = []
+    for field, label in (("dependencies", "runtime"), ("devDependencies", "development"),
+                         ("peerDependencies", "peer")):
+        deps = data.get(field)
+        if isinstance(deps, dict) and deps:
+            groups.append(f"{len(deps)} {label} ({_names(deps)})")
+    overall = "Declares the package's metadata, scripts and dependencies for npm-compatible tools."
+    return _format(purpose, key, "; ".join(groups) or "none", overall)
+
+
+def _lockfile(name, data):
+    packages = data.get("packages") or data.get("dependencies") or data.get("nodes") or {}
+    count = len([p for p in packages if p]) if isinstance(packages, (dict, list)) else 0
+    version = data.get("lockfileVersion") or data.get("version")
+    purpose = f"Dependency lockfile (`{name}`" + (f", format version {version}" if version else "") + ")"
+    overall = "Pins exact resolved versions of the dependency tree so installs are reproducible."
+    return _format(purpose, "none", f"{count} locked packages", overall)
+
+
+def _json_data(name, data):
+    purpose = KNOWN_JSON.get(name, "JSON data file")
+    if isinstance(data, dict):
+        keys = [f"`{k}` ({_shape(v)})" for k, v in list(data.items())[:MAX_LISTED]]
+        if len(data) > MAX_LISTED:
+            keys.append(f"and {len(data) - MAX_LISTED} more")
+        key = "top-level keys " + ", ".join(keys) if keys else "an empty object"
+    elif isinstance(data, list):
+        key = f"a list of {len(data)} entries"
+        if data and isinstance(data[0], dict):
+            key += f" with keys {_names(data[0])}"
+    else:
+        key = f"a single {_shape(data)} value"
+    return _format(purpose, key, "none", "Static data; it contains no executable code.")
+
+
+def summarize_json(rel_path, code):
+    """(kind, summary) for a JSON file, or None if it does not parse."""
+    name = os.path.basename(rel_path)
+    try:
+        data = json.loads(code)
+    except ValueError:
+        return None
+    if name == "package.json" and isinstance(data, dict):
+        return "package_json", _package_json(data)
+    if isinstance(data, dict) and (name in LOCKFILES or name.endswith(".lock.json") or "lockfileVersion" in data):
+        return "lockfile", _lockfile(name, data)
+    return "json", _json_data(name, data)
+
+
+# ---------- Source files ----------
+
+def _dependencies(entry):
+    modules = []
+    for imp in entry['imports']:
+        module = "." * imp['level'] + imp['module'] if imp['level'] else imp['module'].split(".")[0]
+        if module and module not in modules:
+            modules.append(module)
+    return ", ".join(modules) or "none"
+
+
+def _reexports(entry):
+    """{source module: [names]} of a file's imports, in order."""
+    sources = {}
+    for imp in entry['imports']:
+        module = "." * imp['level'] + imp['module'] if imp['level'] else imp['module']
+        name = imp['alias'] or imp['name'] or module
+        sources.setdefault(module or ".", []).append(name)
+    return sources
+
+
+def classify(entry, lines):
+    """Static kind of a source file's index entry, or None when its logic needs the LLM."""
+    logic = entry.get('logic_lines')
+    if logic is None:
+        # Entries indexed before logic was measured
+        return None
+    if logic > MAX_LOGIC_LINES and logic > MAX_LOGIC_RATIO * lines:
+        return None
+    if entry['classes'] or entry['functions']:
+        return "declarations"
+    if [n for n in entry.get('assigns', []) if n != "__all__"]:
+        return "constants"
+    if entry['imports']:
+        return "reexports"
+    return "declarations"
+
+
+def summarize_entry(kind, entry):
+    """Static summary of a source file from its symbol index entry."""
+    module = entry['module'] or os.path.splitext(os.path.basename(entry['path']))[0]
+    doc = f" {entry['doc']}" if entry.get('doc') else ""
+    deps = _dependencies(entry)
+    if kind == "reexports":
+        package = os.path.basename(entry['path']) in PACKAGE_FILES
+        what = "Package initializer" if package else "Module"
+        parts = [f"{_names(names, 6)} from `{source}`" for source, names in _reexports(entry).items()]
+        purpose = f"{what} for `{module}` that re-exports names from other modules.{doc}"
+        return _format(purpose, "re-exports " + "; ".join(parts), deps,
+                       "Gathers the public names of its submodules under one import path; it has no logic of its own.")
+    if kind == "constants":
+        names = [n for n in entry['assigns'] if n != "__all__"]
+        purpose = f"Constants and configuration module `{module}`.{doc}"
+        return _format(purpose, f"defines {len(names)} names: {_names(names)}", deps,
+                       "Declares values for other modules to import; it runs no logic beyond computing them.")
+    classes = []
+    for cls in entry['classes']:
+        if not cls['top_level']:
+            continue
+        bases = f" (extends {', '.join(cls['bases'])})" if cls['bases'] else ""
+        methods = [m['name'] for m in cls['methods'] if not m['private']]
+        classes.append(f"class `{cls['name']}`{bases}" + (f" with {_names(methods, 8)}" if methods else ""))
+    functions = []
+    for func in entry['functions'][:MAX_LISTED]:
+        ret = f" -> {func['ret']}" if func['ret'] else ""
+        functions.append(f"`{func['name']}({', '.join(func['args'])}){ret}`")
+    if len(entry['functions']) > MAX_LISTED:
+        functions.append(f"and {len(entry['functions']) - MAX_LISTED} more functions")
+    key = "; ".join(classes + functions) or "none"
+    purpose = f"Declarations for `{module}`.{doc}"
+    logic = entry['logic_lines']
+    overall = (f"Defines interfaces and signatures with {logic} lines of executable code."
+               if logic else "Defines interfaces and signatures only; there is no executable logic.")
+    return _format(purpose, key, deps, overall)
+
+
+# ---------- Router ----------
+
+class Router:
+    """Decides per file between the static tier and the LLM, and counts the outcome."""
+
+    def __init__(self, enabled=ENABLED, kinds=ENABLED_KINDS):
+        self.enabled = enabled
+        self.kinds = kinds
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._tokens_saved = 0
+
+    def route(self, rel_path, code, entry=None):
+        """Static summary for a file, or None if it should go to the LLM.
+
+        entry is the file's symbol index entry, if it has one.
+        """
+        found = None
+        if self.enabled and code.strip():
+            if rel_path.endswith(".json"):
+                found = summarize_json(rel_path, code)
+            elif entry is not None:
+                kind = classify(entry, code.count("\n") + 1)
+                if kind is not None:
+                    found = kind, summarize_entry(kind, entry)
+        if found is not None and found[0] not in self.kinds:
+            found = None
+        kind = found[0] if found else "llm"
+        self._count("static" if found else "llm", kind, batching.estimate_tokens(code) if found else 0)
+        return found[1] if found else None
+
+    def _count(self, route, kind, tokens):
+        ROUTES.inc(route=route, kind=kind)
+        if tokens:
+            TOKENS_SAVED.inc(tokens)
+        with self._lock:
+            self._routes[kind] = self._routes.get(kind, 0) + 1
+            self._tokens_saved += tokens
+
+    def stats(self):
+        with self._lock:
+            routes = dict(self._routes)
+            tokens_saved = self._tokens_saved
+        llm = routes.pop("llm", 0)
+        static = sum(routes.values())
+        return {
+            "enabled": self.enabled,
+            "max_logic_lines": MAX_LOGIC_LINES,
+            "max_logic_ratio": MAX_LOGIC_RATIO,
+            "static": static,
+            "llm": llm,
+            "static_share": round(static / (static + llm), 3) if static + llm else 0.0,
+            "static_by_kind": routes,
+            "tokens_saved": tokens_saved,
+        }
+
+
+_router = None
+_router_guard = threading.Lock()
+
+
+def get_router():
+    global _router
+    with _router_guard:
+        if _router is None:
+            _router = Router()
+        return _router
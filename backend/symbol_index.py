@@ -0,0 +1,385 @@
+import os
+import ast
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import parse_cache
+import file_scan
+import js_index
+import metadata_model
+import telemetry
+
+# Bump whenever the shape or content of index entries changes; cached entries
+# from other versions are then ignored. JS/TS entries use js_index.VERSION.
+EXTRACTOR_VERSION = 3
+
+# Python is parsed with ast, JavaScript/TypeScript by js_index; both produce
+# the same entry shape. Minified bundles are never worth indexing.
+SOURCE_EXTS = (".py",) + js_index.EXTENSIONS
+SOURCE_EXCLUDES = ["*.min.js", "*.bundle.js"]
+
+# Parsing fans out to a process pool only for repos with at least
+# PARALLEL_MIN_FILES files; below that, pool startup costs more than it saves.
+PARSE_WORKERS = int(os.getenv("DOCGEN_PARSE_WORKERS", "0"))
+PARALLEL_MIN_FILES = int(os.getenv("DOCGEN_PARALLEL_PARSE_MIN_FILES", "200"))
+PARSE_CHUNK_SIZE = 64
+
+
+def get_type_hint(arg):
+    """Returns the type hint as a string if present, else empty string."""
+    if hasattr(arg, 'annotation') and arg.annotation:
+        return ast.unparse(arg.annotation)
+    return ""
+
+
+def _signature(node, skip_self):
+    args = []
+    for a in node.args.args[1:] if skip_self else node.args.args:
+        t = get_type_hint(a)
+        args.append(f"{a.arg}: {t}" if t else a.arg)
+    ret_type = ast.unparse(node.returns) if node.returns else ""
+    return args, ret_type
+
+
+def is_js(rel_path):
+    return rel_path.endswith(js_index.EXTENSIONS)
+
+
+def module_name(rel_path):
+    """Dotted module name for a repo-relative source path."""
+    if is_js(rel_path):
+        return js_index.module_name(rel_path)
+    parts = os.path.splitext(rel_path)[0].replace(os.sep, "/").split("/")
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join(parts)
+
+
+def _body_lines(node):
+    """Lines of a function body, not counting its docstring or a bare pass/..."""
+    body = node.body
+    if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant):
+        body = body[1:]
+    if all(isinstance(s, ast.Pass) or (isinstance(s, ast.Expr) and isinstance(s.value, ast.Constant))
+           for s in body):
+        return 0
+    return body[-1].end_lineno - body[0].lineno + 1
+
+
+_DECLARATIONS = (ast.Import, ast.ImportFrom, ast.Assign, ast.AnnAssign, ast.ClassDef,
+                 ast.FunctionDef, ast.AsyncFunctionDef, ast.Pass)
+
+
+def _declarative(stmt):
+    """Module-level statements that only bind names, like try/except ImportError around imports."""
+    if isinstance(stmt, _DECLARATIONS):
+        return True
+    if isinstance(stmt, ast.Expr):
+        return isinstance(stmt.value, ast.Constant)
+    if isinstance(stmt, ast.Try):
+        handlers = [s for handler in stmt.handlers for s in handler.body]
+        return all(_declarative(s) for s in stmt.body + handlers + stmt.orelse + stmt.finalbody)
+    if isinstance(stmt, ast.If) and not _is_main_guard(stmt):
+        return all(_declarative(s) for s in stmt.body + stmt.orelse)
+    return False
+
+
+def _is_main_guard(stmt):
+    test = stmt.test
+    return (isinstance(test, ast.Compare) and isinstance(test.left, ast.Name)
+            and test.left.id == "__name__")
+
+
+def _module_logic(tree):
+    """(logic lines, assigned names) of the module's top-level statements."""
+    lines = 0
+    assigns = []
+    for stmt in tree.body:
+        if isinstance(stmt, ast.Assign):
+            assigns.extend(t.id for t in stmt.targets if isinstance(t, ast.Name))
+        elif isinstance(stmt, ast.AnnAssign) and isinstance(stmt.target, ast.Name):
+            assigns.append(stmt.target.id)
+        if not _declarative(stmt):
+            lines += stmt.end_lineno - stmt.lineno + 1
+    return lines, assigns
+
+
+def _module_doc(tree):
+    """First paragraph of the module docstring, on one line."""
+    doc = ast.get_docstring(tree) or ""
+    return " ".join(doc.strip().split("\n\n")[0].split())
+
+
+class _Indexer(ast.NodeVisitor):
+    """Collects everything the docs and diagram generators need in one walk."""
+
+    def __init__(self):
+        self.classes = []
+        self.functions = []
+        self.imports = []
+        self.calls = []
+        # Lines inside top-level function and method bodies
+        self.logic_lines = 0
+        # Stack of ("class", record) / ("function", name) frames
+        self._stack = []
+        # Innermost (class record, method name) currently being visited
+        self._method = None
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self.imports.append({'module': alias.name, 'name': None, 'alias': alias.asname, 'level': 0})
+
+    def visit_ImportFrom(self, node):
+        for alias in node.names:
+            self.imports.append({'module': node.module or "", 'name': alias.name,
+                                 'alias': alias.asname, 'level': node.level})
+
+    def visit_ClassDef(self, node):
+        record = {
+            'name': node.name,
+            'top_level': not self._stack,
+            'bases': [b.id for b in node.bases if isinstance(b, ast.Name)],
+            'methods': [],
+            'properties': [],
+            'attrs': [],
+        }
+        for body_item in node.body:
+            if isinstance(body_item, ast.FunctionDef):
+                args, ret_type = _signature(body_item, skip_self=True)
+                record['methods'].append({
+                    'name': body_item.name,
+                    'args': args,
+                    'ret': ret_type,
+                    'private': body_item.name.startswith('_')
+                })
+            elif isinstance(body_item, ast.Assign):
+                for target in body_item.targets:
+                    if isinstance(target, ast.Name):
+                        record['properties'].append({
+                            'name': target.id,
+                            'private': target.id.startswith('_')
+                        })
+        self.classes.append(record)
+        self._stack.append(("class", record))
+        self.generic_visit(node)
+        self._stack.pop()
+
+    def visit_FunctionDef(self, node):
+        parent = self._stack[-1] if self._stack else None
+        outer_method = self._method
+        if parent is None:
+            args, ret_type = _signature(node, skip_self=False)
+            self.functions.append({'name': node.name, 'args': args, 'ret': ret_type})
+        elif parent[0] == "class":
+            self._method = (parent[1], node.name)
+        if parent is None or parent[0] == "class":
+            self.logic_lines += _body_lines(node)
+        self._stack.append(("function", node.name))
+        self.generic_visit(node)
+        self._stack.pop()
+        self._method = outer_method
+
+    def visit_AsyncFunctionDef(self, node):
+        if not self._stack or self._stack[-1][0] == "class":
+            self.logic_lines += _body_lines(node)
+        self._stack.append(("function", node.name))
+        self.generic_visit(node)
+        self._stack.pop()
+
+    def visit_Assign(self, node):
+        if self._method and self._method[1] == "__init__":
+            attrs = self._method[0]['attrs']
+            for target in node.targets:
+                if (isinstance(target, ast.Attribute) and
+                        isinstance(target.value, ast.Name) and
+                        target.value.id == "self" and target.attr not in attrs):
+                    attrs.append(target.attr)
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        # OtherClass.method() / module.OtherClass.method() style calls made
+        # from inside a method; the receiver is kept as a dotted name so it
+        # can be resolved through the file's imports later.
+        if self._method and isinstance(node.func, ast.Attribute):
+            receiver = _dotted_name(node.func.value)
+            if receiver:
+                cls, method = self._method
+                self.calls.append((cls['name'], method, receiver, node.func.attr))
+        self.generic_visit(node)
+
+
+def _dotted_name(node):
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+def index_source(source, rel_path):
+    """Parse one file's source into its index entry."""
+    if is_js(rel_path):
+        return js_index.index_source(source, rel_path)
+    tree = ast.parse(source, filename=rel_path)
+    indexer = _Indexer()
+    indexer.visit(tree)
+    logic_lines, assigns = _module_logic(tree)
+    return {
+        'path': rel_path,
+        'module': module_name(rel_path),
+        'classes': indexer.classes,
+        'functions': indexer.functions,
+        'imports': indexer.imports,
+        'calls': indexer.calls,
+        # Used by static_summary to describe files without the LLM
+        'doc': _module_doc(tree),
+        'assigns': assigns,
+        'logic_lines': logic_lines + indexer.logic_lines,
+    }
+
+
+def index_file(path, rel_path):
+    """Compact index entry (metadata_model.FileEntry) for a file, or None if it is empty or fails to parse."""
+    try:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            source = f.read()
+        if not source.strip():
+            return None
+        return metadata_model.FileEntry.from_dict(index_source(source, rel_path))
+    except Exception as e:
+        print(f"⚠️ Could not parse {rel_path}: {str(e)}")
+        return None
+
+
+def find_source_files(repo_dir, paths=None):
+    """Repo-relative paths of all indexable source files, sorted, as chosen by file_scan."""
+    found = file_scan.scan(repo_dir, SOURCE_EXTS, excludes=SOURCE_EXCLUDES, paths=paths)
+    return [rel_path for rel_path, _ in found]
+
+
+def _available_cpus():
+    # Respect container CPU affinity where the platform exposes it
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _mp_context():
+    # Never fork: the server's other threads may hold locks (SQLite caches,
+    # telemetry logger, LLM pool) that a forked child would inherit locked.
+    # Workers start from a clean interpreter and import _index_chunk by name.
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _index_chunk(repo_dir, rel_paths):
+    """Worker-side: index a chunk of files, returning (rel_path, row) pairs; rows pickle compactly."""
+    results = []
+    for rel_path in rel_paths:
+        entry = index_file(os.path.join(repo_dir, rel_path), rel_path)
+        results.append((rel_path, entry.row() if entry is not None else None))
+    return results
+
+
+def _parse_all(repo_dir, rel_paths, workers):
+    """Yield (rel_path, entry) for rel_paths, in order, fanning out when worthwhile."""
+    if workers is None:
+        workers = PARSE_WORKERS or _available_cpus()
+    if workers <= 1 or len(rel_paths) < PARALLEL_MIN_FILES:
+        for rel_path in rel_paths:
+            yield rel_path, index_file(os.path.join(repo_dir, rel_path), rel_path)
+        return
+    # Chunks keep per-task pickling overhead low; executor.map preserves order,
+    # so the merged index is identical to a serial run.
+    chunk_size = max(1, min(PARSE_CHUNK_SIZE, len(rel_paths) // (workers * 4) or 1))
+    chunks = [rel_paths[i:i + chunk_size] for i in range(0, len(rel_paths), chunk_size)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=_mp_context()) as executor:
+        for results in executor.map(_index_chunk, [repo_dir] * len(chunks), chunks):
+            for rel_path, row in results:
+                yield rel_path, metadata_model.FileEntry.from_row(row) if row is not None else None
+
+
+def _cache_keys(repo_dir, rel_paths, blob_shas):
+    keys = {}
+    for rel_path in rel_paths:
+        sha = blob_shas.get(rel_path) if blob_shas else None
+        if sha is None:
+            try:
+                with open(os.path.join(repo_dir, rel_path), 'rb') as f:
+                    sha = parse_cache.git_blob_sha(f.read())
+            except OSError:
+                continue
+        version = f"js{js_index.VERSION}" if is_js(rel_path) else EXTRACTOR_VERSION
+        keys[rel_path] = f"{version}:{sha}"
+    return keys
+
+
+def build_index(repo_dir, reuse=None, workers=None, blob_shas=None, use_cache=True):
+    """Index every Python and JS/TS file under repo_dir, parsing each exactly once.
+
+    Entries found in reuse (relative path -> entry) are taken as-is, then the
+    on-disk parse cache is consulted by blob SHA (taken from blob_shas when
+    the caller has them from git, hashed from the file otherwise). Remaining
+    files are parsed, on a process pool for large repos (workers, default
+    DOCGEN_PARSE_WORKERS or the CPU count) and serially for small ones.
+    Returns an ordered dict of relative path -> metadata_model.FileEntry,
+    sorted by path.
+    """
+    with telemetry.span("parse") as span:
+        rel_paths = find_source_files(repo_dir, list(blob_shas) if blob_shas else None)
+        to_parse = [p for p in rel_paths if not (reuse and p in reuse)]
+        parsed = {}
+        keys = {}
+        if use_cache and to_parse:
+            cache = parse_cache.get_cache()
+            keys = _cache_keys(repo_dir, to_parse, blob_shas)
+            cached = cache.get_many(set(keys.values()))
+            for rel_path in to_parse:
+                key = keys.get(rel_path)
+                if key in cached:
+                    entry = cached[key]
+                    if entry is not None:
+                        entry = metadata_model.load_entry(entry, rel_path, module_name(rel_path))
+                    parsed[rel_path] = entry
+            to_parse = [p for p in to_parse if p not in parsed]
+        span.fields.update(files=len(rel_paths), parsed=len(to_parse))
+        fresh = dict(_parse_all(repo_dir, to_parse, workers))
+        if use_cache and fresh:
+            cache.put_many([(keys[p], entry) for p, entry in fresh.items() if p in keys])
+        parsed.update(fresh)
+        index = {}
+        for rel_path in rel_paths:
+            entry = metadata_model.load_entry(reuse[rel_path]) if reuse and rel_path in reuse else parsed.get(rel_path)
+            if entry is not None:
+                index[rel_path] = entry
+        return index
+
+
+def to_metadata(entry):
+    """The per-file shape produced by extract_metadata for the docs diagram."""
+    imports = []
+    for imp in entry['imports']:
+        top = imp['module'].split('.')[0]
+        if top and top not in imports:
+            imports.append(top)
+    classes = []
+    inherits = []
+    for cls in entry['classes']:
+        if not cls['top_level']:
+            continue
+        classes.append({
+            'name': cls['name'],
+            'methods': cls['methods'],
+            'properties': cls['properties'],
+            'inherits': cls['bases'],
+        })
+        if cls['bases']:
+            inherits.append((cls['name'], cls['bases']))
+    return {
+        'classes': classes,
+        'functions': entry['functions'],
+        'imports': imports,
+        'inherits': inherits,
+    }
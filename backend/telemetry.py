@@ -0,0 +1,221 @@
+import os
+import json
+import time
+import uuid
+import bisect
+import logging
+import threading
+import contextvars
+
+# Stage spans, counters and histograms for the whole backend. Metrics are
+# rendered in the Prometheus text format by /metrics; every finished span is
+# also logged as one JSON line on the "docgen" logger (stage spans at INFO,
+# per-call spans at DEBUG; set DOCGEN_LOG_LEVEL to choose).
+LOG_LEVEL = os.getenv("DOCGEN_LOG_LEVEL", "INFO").upper()
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+TOKEN_BUCKETS = (16, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+logger = logging.getLogger("docgen")
+
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record):
+        data = {"ts": round(record.created, 3), "level": record.levelname.lower(), "event": record.getMessage()}
+        data.update(getattr(record, "fields", {}))
+        return json.dumps(data, default=str)
+
+
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(_JsonFormatter())
+    logger.addHandler(_handler)
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
+
+
+def log(event, level=logging.INFO, **fields):
+    """Structured log line tagged with the current trace, if any."""
+    if logger.isEnabledFor(level):
+        current = _current.get()
+        if current:
+            fields.setdefault("trace_id", current[0])
+        logger.log(level, event, extra={"fields": fields})
+
+
+# ---------- Metrics ----------
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(self._render_samples(items))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _render_samples(self, items):
+        return [f"{self.name}{_labels(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=SECONDS_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            i = bisect.bisect_left(self.buckets, value)
+            if i < len(self.buckets):
+                state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _render_samples(self, items):
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, [('le', bound)])} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, [('le', '+Inf')])} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Value read from fn() at scrape time; fn returns a number or {label tuple: number}."""
+    kind = "gauge"
+
+    def __init__(self, name, help, fn, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self.fn = fn
+
+    def render(self):
+        try:
+            value = self.fn()
+        except Exception:
+            return []
+        with self._lock:
+            self._values = value if isinstance(value, dict) else {(): value}
+        return super().render()
+
+    def _render_samples(self, items):
+        return [f"{self.name}{_labels(self.labelnames, key)} {value}" for key, value in items]
+
+
+_registry = []
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in list(_registry):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+STAGE_SECONDS = Histogram("docgen_stage_seconds", "Duration of pipeline stages", ["stage", "status"])
+FILES = Counter("docgen_files_total", "Files handled by documentation runs", ["result"])
+CACHE_REQUESTS = Counter("docgen_cache_requests_total", "Cache lookups", ["cache", "result"])
+LLM_SECONDS = Histogram("docgen_llm_call_seconds", "Latency of model calls", ["kind"])
+LLM_ERRORS = Counter("docgen_llm_errors_total", "Model calls that raised", ["kind"])
+LLM_RETRIES = Counter("docgen_llm_retries_total", "Model calls retried after a failure", ["provider"])
+LLM_PROMPT_TOKENS = Histogram("docgen_llm_prompt_tokens", "Estimated prompt tokens per model call",
+                              ["kind"], TOKEN_BUCKETS)
+LLM_RESPONSE_TOKENS = Histogram("docgen_llm_response_tokens", "Estimated response tokens per model call",
+                                ["kind"], TOKEN_BUCKETS)
+HTTP_SECONDS = Histogram("docgen_http_request_seconds", "HTTP request latency until the response starts",
+                         ["method", "route", "status"])
+
+
+# ---------- Spans ----------
+
+# (trace id, span id) of the innermost open span. Spans inside generators
+# stay current across yields, so they are restored with set() rather than
+# ContextVar.reset(), which fails when a generator resumes in another context.
+_current = contextvars.ContextVar("docgen_span", default=None)
+
+
+class span:
+    """Time a stage: `with telemetry.span("parse", files=n):`.
+
+    Records docgen_stage_seconds and logs one JSON line when the stage ends.
+    Nested spans share the trace id of the outermost one.
+    """
+
+    def __init__(self, stage, level=logging.INFO, **fields):
+        self.stage = stage
+        self.level = level
+        self.fields = fields
+
+    def __enter__(self):
+        self.parent = _current.get()
+        self.trace_id = self.parent[0] if self.parent else uuid.uuid4().hex[:16]
+        self.span_id = uuid.uuid4().hex[:8]
+        _current.set((self.trace_id, self.span_id))
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        _current.set(self.parent)
+        if exc_type is None:
+            status = "ok"
+        elif issubclass(exc_type, GeneratorExit):
+            status = "cancelled"
+        else:
+            status = "error"
+        STAGE_SECONDS.observe(elapsed, stage=self.stage, status=status)
+        if logger.isEnabledFor(self.level):
+            fields = {
+                "trace_id": self.trace_id,
+                "span_id": self.span_id,
+                "parent_id": self.parent[1] if self.parent else None,
+                "stage": self.stage,
+                "seconds": round(elapsed, 4),
+                "status": status,
+            }
+            if exc is not None and status == "error":
+                fields["error"] = str(exc)[:200]
+            fields.update(self.fields)
+            logger.log(self.level, "span", extra={"fields": fields})
+        return False
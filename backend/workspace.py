@@ -0,0 +1,138 @@
+import os
+import time
+import shutil
+import atexit
+import tempfile
+import threading
+import repo_cache
+import file_scan
+import telemetry
+from repo_cache import handle_remove_readonly
+
+# Every job gets its own directory under WORKSPACE_ROOT, so concurrent jobs
+# never touch each other's checkouts. DOCGEN_WORKSPACE_TMPFS=1 puts them on
+# /dev/shm where available, keeping checkouts off the disk entirely.
+USE_TMPFS = os.getenv("DOCGEN_WORKSPACE_TMPFS", "0") == "1"
+WORKSPACE_ROOT = os.getenv("DOCGEN_WORKSPACE_ROOT") or (
+    "/dev/shm/docgen_workspaces" if USE_TMPFS and os.path.isdir("/dev/shm")
+    else os.path.join(tempfile.gettempdir(), "docgen_workspaces")
+)
+MAX_WORKSPACES = int(os.getenv("DOCGEN_MAX_WORKSPACES", "8"))
+# Per-workspace size limit in bytes; 0 disables the check.
+QUOTA_BYTES = int(os.getenv("DOCGEN_WORKSPACE_QUOTA_BYTES", str(2 * 1024 ** 3)))
+ACQUIRE_TIMEOUT = float(os.getenv("DOCGEN_WORKSPACE_TIMEOUT", "600"))
+# Leftovers from crashed processes older than this are removed at startup.
+STALE_AFTER = 6 * 3600
+
+
+class WorkspaceError(Exception):
+    pass
+
+
+class Workspace:
+    """A private directory for one job; removed, with its checkout, on close()."""
+
+    def __init__(self, manager, path):
+        self.manager = manager
+        self.path = path
+        self.repo_dir = None
+
+    def checkout(self, repo_url, strategy=None):
+        """Check repo_url out into this workspace and enforce the size quota."""
+        dest = os.path.join(self.path, "repo")
+        repo_cache.checkout(repo_url, dest, strategy)
+        self.repo_dir = dest
+        quota = self.manager.quota_bytes
+        if quota:
+            size = file_scan.disk_usage(dest, limit=quota)
+            if size > quota:
+                raise WorkspaceError(f"Checkout exceeds workspace quota of {quota} bytes")
+        return dest
+
+    def close(self):
+        with telemetry.span("cleanup"):
+            self._close()
+
+    def _close(self):
+        try:
+            if self.repo_dir:
+                try:
+                    repo_cache.release(self.repo_dir)
+                except Exception as e:
+                    print(f"⚠️ Could not release checkout {self.repo_dir}: {e}")
+            shutil.rmtree(self.path, onerror=handle_remove_readonly)
+        except Exception as e:
+            print(f"⚠️ Workspace cleanup warning: {e}")
+        finally:
+            self.manager._release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class WorkspaceManager:
+    def __init__(self, root=WORKSPACE_ROOT, max_workspaces=MAX_WORKSPACES, quota_bytes=QUOTA_BYTES):
+        self.root = root
+        self.quota_bytes = quota_bytes
+        self._slots = threading.BoundedSemaphore(max_workspaces)
+        self._lock = threading.Lock()
+        self._active = set()
+        os.makedirs(self.root, exist_ok=True)
+        self.cleanup_stale()
+        atexit.register(self.close_all)
+
+    def allocate(self, label="job", timeout=ACQUIRE_TIMEOUT):
+        """Reserve a fresh workspace, waiting up to timeout for a free slot."""
+        if not self._slots.acquire(timeout=timeout):
+            raise WorkspaceError("No free workspace slot")
+        try:
+            path = tempfile.mkdtemp(prefix=f"{label}-", dir=self.root)
+        except Exception:
+            self._slots.release()
+            raise
+        ws = Workspace(self, path)
+        with self._lock:
+            self._active.add(ws)
+        return ws
+
+    def _release(self, ws):
+        with self._lock:
+            if ws not in self._active:
+                return
+            self._active.discard(ws)
+        self._slots.release()
+
+    def close_all(self):
+        with self._lock:
+            active = list(self._active)
+        for ws in active:
+            ws.close()
+
+    def cleanup_stale(self):
+        now = time.time()
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            try:
+                if now - os.path.getmtime(path) > STALE_AFTER:
+                    shutil.rmtree(path, onerror=handle_remove_readonly)
+            except OSError:
+                pass
+
+
+_manager = None
+_manager_guard = threading.Lock()
+
+
+def get_manager():
+    global _manager
+    with _manager_guard:
+        if _manager is None:
+            _manager = WorkspaceManager()
+        return _manager
+
+
+def allocate(label="job"):
+    return get_manager().allocate(label)
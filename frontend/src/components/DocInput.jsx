@@ -2,7 +2,7 @@ import axios from 'axios'
 import { useState } from 'react'
 import './DocInput.css'
 
-export default function DocInput({ setDocs, setMermaidCode }) {
+export default function DocInput({ setDocs, setStreaming, setMermaidCode, setDiagramId, setModelId }) {
   const [repoURL, setRepoURL] = useState("")
   const [loadingDocs, setLoadingDocs] = useState(false)
   const [loadingMermaid, setLoadingMermaid] = useState(false)
@@ -10,29 +10,55 @@ export default function DocInput({ setDocs, setMermaidCode }) {
 
   const submit = async () => {
     setLoadingDocs(true)
+    setStreaming(true)
     setDocs({})
     try {
-      const res = await axios.post(
-        'http://localhost:8000/generate-docs',
-        { repo_url: repoURL },
-        {
-          headers: {
-            "Content-Type": "application/json"
-          }
+      // Summaries arrive as NDJSON records, one per file, as they are generated
+      const res = await fetch('http://localhost:8000/generate-docs/stream', {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json"
+        },
+        body: JSON.stringify({ repo_url: repoURL })
+      })
+      if (!res.ok) throw new Error(`HTTP ${res.status}`)
+      const reader = res.body.getReader()
+      const decoder = new TextDecoder()
+      let buffer = ""
+      const handle = (line) => {
+        if (!line.trim()) return
+        const record = JSON.parse(line)
+        if (record.type === "file") {
+          setDocs((prev) => ({ ...prev, [record.path]: record.doc }))
+        } else if (record.type === "mermaid") {
+          setDocs((prev) => ({ ...prev, __MERMAID__: record.mermaid_code }))
+        } else if (record.type === "error") {
+          throw new Error(record.message)
         }
-      )
-      setDocs(res.data?.docs || {})
+      }
+      while (true) {
+        const { done, value } = await reader.read()
+        if (done) break
+        buffer += decoder.decode(value, { stream: true })
+        const lines = buffer.split("\n")
+        buffer = lines.pop()
+        lines.forEach(handle)
+      }
+      handle(buffer)
     } catch (err) {
       console.error("Error:", err)
       alert("❌ Failed to generate docs. Check console for more info.")
     } finally {
       setLoadingDocs(false)
+      setStreaming(false)
     }
   }
 
   const generateMermaid = async () => {
     setLoadingMermaid(true)
     setMermaidCode("")
+    setDiagramId("")
+    setModelId("")
     setGeneratedMermaidCode("")
     try {
       const res = await axios.post(
@@ -46,6 +72,8 @@ export default function DocInput({ setDocs, setMermaidCode }) {
       )
       console.log("Mermaid code received from backend:", res.data?.mermaid_code)
       setMermaidCode(res.data?.mermaid_code || "")
+      setDiagramId(res.data?.diagram_id || "")
+      setModelId(res.data?.model_id || "")
       setGeneratedMermaidCode(res.data?.mermaid_code || "")
     } catch (err) {
       console.error("Error generating Mermaid diagram:", err)
@@ -2,7 +2,7 @@ import { jsPDF } from "jspdf";
 import "./DocOutput.css";
 import MermaidDiagram from "./MermaidDiagram";
 
-function Documentation({ docs }) {
+function Documentation({ docs, streaming }) {
   const cleanText = (text) =>
     text.replace(/[*_#`~✅❌📄🧠]+/gu, "").trim();
 
@@ -40,7 +40,11 @@ function Documentation({ docs }) {
   return (
     <div>
       <h2>Generated Documentation</h2>
-      <button onClick={downloadPDF}>Download PDF</button>
+      {streaming ? (
+        <p className="info-msg">⏳ {Object.keys(docs).length} files documented so far...</p>
+      ) : (
+        <button onClick={downloadPDF}>Download PDF</button>
+      )}
 
       {Object.entries(docs).map(([file, explanation]) => (
         <div key={file} className="doc-card">
@@ -52,24 +56,24 @@ function Documentation({ docs }) {
   );
 }
 
-function MermaidDiagramSection({ mermaidCode }) {
+function MermaidDiagramSection({ mermaidCode, diagramId, modelId }) {
   if (!mermaidCode) return null;
 
   return (
     <div className="doc-card">
       <h3>📊 Class Diagram (Mermaid)</h3>
-      <MermaidDiagram code={mermaidCode} id="mermaid-diagram" />
+      <MermaidDiagram code={mermaidCode} diagramId={diagramId} modelId={modelId} id="mermaid-diagram" />
     </div>
   );
 }
 
-export default function DocOutput({ docs, mermaidCode }) {
+export default function DocOutput({ docs, streaming, mermaidCode, diagramId, modelId }) {
   console.log("Rendering DocOutput with Mermaid code:", mermaidCode);
 
   return (
     <div>
-      <Documentation docs={docs} />
-      <MermaidDiagramSection mermaidCode={mermaidCode} />
+      <Documentation docs={docs} streaming={streaming} />
+      <MermaidDiagramSection mermaidCode={mermaidCode} diagramId={diagramId} modelId={modelId} />
     </div>
   );
 }
\ No newline at end of file
@@ -2,15 +2,47 @@ import { useEffect, useRef, useState } from "react";
 import mermaid from "mermaid";
 import axios from "axios";
 
-export default function MermaidDiagram({ id }) {
+const LODS = ["auto", "packages", "classes", "full"];
+
+export default function MermaidDiagram({ id, code: initialCode, diagramId, modelId }) {
   const container = useRef(null);
-  const [code, setCode] = useState("");
+  const [code, setCode] = useState(initialCode || "");
   const [renderFailed, setRenderFailed] = useState(false);
+  const [view, setView] = useState({ lod: "auto", package: "", page: 1 });
+  const [pageInfo, setPageInfo] = useState(null);
+
+  useEffect(() => {
+    setView({ lod: "auto", package: "", page: 1 });
+  }, [modelId]);
 
   useEffect(() => {
-    // Fetch Mermaid code from backend
+    if (modelId) {
+      // Large diagrams are rendered one page of packages at a time
+      axios
+        .get(`http://localhost:8000/diagram/${modelId}`, {
+          params: { lod: view.lod, page: view.page, ...(view.package ? { package: view.package } : {}) },
+        })
+        .then((response) => {
+          setPageInfo(response.data);
+          setCode(response.data.mermaid_code);
+        })
+        .catch((error) => {
+          console.error("Error fetching diagram page:", error);
+          setRenderFailed(true);
+        });
+      return;
+    }
+    if (!diagramId) {
+      // Nothing was stored (e.g. no classes found); never fall back to the
+      // server's latest diagram, which may belong to another repository
+      setCode(initialCode || "");
+      return;
+    }
+    // Fetch the full Mermaid code for this diagram from backend
     axios
-      .get("http://localhost:8000/get-mermaid-diagram")
+      .get("http://localhost:8000/get-mermaid-diagram", {
+        params: { id: diagramId },
+      })
       .then((response) => {
         setCode(response.data);
       })
@@ -18,7 +50,7 @@ export default function MermaidDiagram({ id }) {
         console.error("Error fetching Mermaid code:", error);
         setRenderFailed(true);
       });
-  }, []);
+  }, [diagramId, modelId, view, initialCode]);
 
   useEffect(() => {
     if (container.current && code) {
@@ -44,6 +76,10 @@ export default function MermaidDiagram({ id }) {
     }
   }, [code, id]);
 
+  if (!diagramId && !modelId) {
+    return <p>{initialCode}</p>;
+  }
+
   if (renderFailed) {
     return (
       <div>
@@ -63,6 +99,28 @@ export default function MermaidDiagram({ id }) {
 
   return (
     <div>
+      {pageInfo && (
+        <div className="diagram-controls">
+          <select value={view.lod} onChange={(e) => setView({ ...view, lod: e.target.value, page: 1 })}>
+            {LODS.map((lod) => (
+              <option key={lod} value={lod}>{lod}</option>
+            ))}
+          </select>
+          <select value={view.package} onChange={(e) => setView({ ...view, package: e.target.value, page: 1 })}>
+            <option value="">All packages</option>
+            {pageInfo.all_packages.map((pkg) => (
+              <option key={pkg.name} value={pkg.name}>{pkg.name} ({pkg.classes})</option>
+            ))}
+          </select>
+          <button disabled={pageInfo.page <= 1} onClick={() => setView({ ...view, page: pageInfo.page - 1 })}>
+            Prev
+          </button>
+          <span> Page {pageInfo.page} of {pageInfo.pages} ({pageInfo.classes} of {pageInfo.total_classes} classes, {pageInfo.lod}) </span>
+          <button disabled={pageInfo.page >= pageInfo.pages} onClick={() => setView({ ...view, page: pageInfo.page + 1 })}>
+            Next
+          </button>
+        </div>
+      )}
       <div ref={container} id={id} />
       <a
         href={`/mermaid-diagram.html?code=${encodeURIComponent(code)}`}
@@ -6,7 +6,10 @@ import './Home.css'
 
 export default function Home() {
   const [docs, setDocs] = useState({})
+  const [streaming, setStreaming] = useState(false)
   const [mermaidCode, setMermaidCode] = useState("")
+  const [diagramId, setDiagramId] = useState("")
+  const [modelId, setModelId] = useState("")
   const navigate = useNavigate()
 
   useEffect(() => {
@@ -18,8 +21,8 @@ export default function Home() {
     <div className="home-wrapper">
       <div className="docgen-container">
         <h1 className="main-heading">AI Documentation Generator 🧠</h1>
-        <DocInput setDocs={setDocs} setMermaidCode={setMermaidCode} />
-        <DocOutput docs={docs} mermaidCode={mermaidCode} />
+        <DocInput setDocs={setDocs} setStreaming={setStreaming} setMermaidCode={setMermaidCode} setDiagramId={setDiagramId} setModelId={setModelId} />
+        <DocOutput docs={docs} streaming={streaming} mermaidCode={mermaidCode} diagramId={diagramId} modelId={modelId} />
       </div>
     </div>
   )